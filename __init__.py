@@ -1,8 +1,14 @@
-import bpy
-from . import skw_panel
-from . import skw_operators
-from . import skw_props
-from . import skw_validate_mesh
+try:
+    import bpy
+except ImportError:
+    # Imported outside Blender, e.g. by the binding worker processes
+    bpy = None
+
+if bpy is not None:
+    from . import skw_panel
+    from . import skw_operators
+    from . import skw_props
+    from . import skw_validate_mesh
 
 
 bl_info = {
@@ -17,7 +23,7 @@ bl_info = {
     'category': 'Mesh'
 }
 
-MODULES = [skw_props, skw_panel, skw_operators, skw_validate_mesh]
+MODULES = [skw_props, skw_panel, skw_operators, skw_validate_mesh] if bpy is not None else []
 
 
 def register():
@@ -0,0 +1,271 @@
+"""
+Benchmark of the transfer stages on synthetic meshes.
+
+Run in background Blender (the add-on does not need to be installed):
+
+    blender -b --factory-startup --python-expr "import sys, importlib; sys.path.insert(0, '<addons dir>'); \\
+        sys.exit(importlib.import_module('ShapeKeyWrap.benchmark').main())" -- \\
+        --shapes GRID GARMENT --sizes 10000 100000 --keys 10 100 --output results.json
+
+Every case generates a source/target pair (see core.synthetic_meshes)
+with random sparse shape keys from a fixed seed, transfers the keys with a
+surface deform method and times the stages with the stage profiler: binding,
+deformation, write-back, empty key removal, smoothing and driver creation.
+A JSON line per case is printed to stdout, --output writes all the results
+to a file. With --baseline, the results are compared to an earlier results
+file and the exit code is 1 if any stage got slower than --threshold allows.
+"""
+import sys
+import json
+import argparse
+import platform
+import traceback
+import bpy
+from .cli import emit
+from .functions import profiling
+from .core.synthetic_meshes import mesh_pair, sparse_shape_keys
+from .functions.surface_deform import transfer_shapekeys_to_objects
+from .functions.transfer_shape_keys import transfer_shape_keys
+from .functions.smooth_shape_keys import smooth_shape_keys
+from .functions.bind_drivers import bind_shape_key_values
+from .skw_props import SURFACE_DEFORM_METHODS
+
+
+SHAPES = ('GRID', 'SPHERE', 'GARMENT')
+
+# Result stages by the name of the profiled stage (smoothing is timed as a whole)
+STAGE_CATEGORIES = {
+    'source': 'bind',
+    'bind': 'bind',
+    'bind_noise': 'bind',
+    'influence': 'bind',
+    'merge': 'bind',
+    'read_keys': 'deform',
+    'deform': 'deform',
+    'evaluate': 'deform',
+    'write': 'write',
+    'empty_check': 'empty',
+    'remove_empty': 'empty',
+    'smooth': 'smooth',
+    'drivers': 'drivers'
+}
+
+
+def create_mesh_object(context: bpy.types.Context, name: str, mesh_data: tuple) -> bpy.types.Object:
+    """
+    Create a mesh object from (co, corner_verts, face_sizes) arrays with foreach_set.
+    """
+    co, corner_verts, face_sizes = mesh_data
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(co))
+    mesh.vertices.foreach_set('co', co.ravel())
+    mesh.loops.add(len(corner_verts))
+    mesh.loops.foreach_set('vertex_index', corner_verts)
+    mesh.polygons.add(len(face_sizes))
+    mesh.polygons.foreach_set('loop_start', (face_sizes.cumsum() - face_sizes).astype(face_sizes.dtype))
+    if not mesh.polygons.bl_rna.properties['loop_total'].is_readonly:
+        mesh.polygons.foreach_set('loop_total', face_sizes)
+    mesh.update(calc_edges=True)
+
+    obj = bpy.data.objects.new(name, mesh)
+    context.scene.collection.objects.link(obj)
+    return obj
+
+
+def add_shape_keys(obj: bpy.types.Object, keys) -> None:
+    obj.shape_key_add(name='Basis', from_mix=False)
+    for index, co in enumerate(keys):
+        sk = obj.shape_key_add(name=f'Key_{index:04d}', from_mix=False)
+        sk.data.foreach_set('co', co.ravel())
+
+
+def stage_seconds(report: dict) -> dict:
+    """
+    Sum the profiled stages of a case into the result stages (see STAGE_CATEGORIES).
+    """
+    seconds = dict.fromkeys(STAGE_CATEGORIES.values(), 0.0)
+    for path, stats in report['stages'].items():
+        # Stages inside smoothing (its own reads and writes) count as smoothing
+        if path.startswith('smooth/'):
+            continue
+        category = STAGE_CATEGORIES.get(path.rsplit('/', 1)[-1])
+        if category is not None:
+            seconds[category] += stats['seconds']
+    return seconds
+
+
+def run_case(
+        shape: str,
+        size: int,
+        key_count: int,
+        method: str,
+        args: argparse.Namespace
+) -> dict:
+    """
+    Generate a case in an empty scene, transfer its shape keys and return the timings.
+    """
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    context = bpy.context
+
+    source_data, target_data = mesh_pair(shape, size)
+    src_obj = create_mesh_object(context, 'Source', source_data)
+    tgt_obj = create_mesh_object(context, 'Target', target_data)
+    add_shape_keys(src_obj, sparse_shape_keys(source_data[0], key_count, seed=args.seed))
+
+    skipped_sks = dict()
+    with profiling.profile_session(case_key(shape, size, key_count, method), trace_memory=args.memory, echo=False):
+        with profiling.stage('transfer', items=key_count):
+            if method == 'SQUEEZY_PIXELS':
+                created_sks = transfer_shapekeys_to_objects(
+                    context=context,
+                    tgt_objs=[tgt_obj],
+                    src_obj=src_obj,
+                    key_block_size=args.key_block_size,
+                    search=args.search,
+                    workers=args.workers,
+                    threads=args.threads,
+                    empty_threshold=args.empty_threshold,
+                    skipped_sks=skipped_sks,
+                    sparse=args.sparse
+                )
+            else:
+                created_sks = transfer_shape_keys(
+                    context=context,
+                    from_obj=src_obj,
+                    to_objs=[tgt_obj],
+                    falloff=4.0,
+                    strength=1.0,
+                    create_drivers=args.drivers,
+                    empty_threshold=args.empty_threshold,
+                    skipped_sks=skipped_sks
+                )
+        if args.drivers and method == 'SQUEEZY_PIXELS':
+            with profiling.stage('drivers', items=len(created_sks[tgt_obj.name])):
+                bind_shape_key_values(context, tgt_obj, src_obj, created_sks[tgt_obj.name])
+        if args.smooth and created_sks[tgt_obj.name]:
+            with profiling.stage('smooth', items=len(created_sks[tgt_obj.name])):
+                smooth_shape_keys(context, tgt_obj, overwrite_shape_keys=True, shape_keys=created_sks[tgt_obj.name])
+    report = profiling.last_report
+
+    return {
+        'case': case_key(shape, size, key_count, method),
+        'shape': shape,
+        'size': size,
+        'keys': key_count,
+        'method': method,
+        'source_vertices': len(src_obj.data.vertices),
+        'target_vertices': len(tgt_obj.data.vertices),
+        'created': len(created_sks[tgt_obj.name]),
+        'skipped': len(skipped_sks.get(tgt_obj.name, [])),
+        'seconds': report['seconds'],
+        'peak_bytes': report['peak_bytes'],
+        'stages': stage_seconds(report),
+        'profile': report['stages']
+    }
+
+
+def case_key(shape: str, size: int, key_count: int, method: str) -> str:
+    return f'{shape}/{size}/{key_count}/{method}'
+
+
+def check_regressions(results: list, baseline: list, threshold: float, min_seconds: float) -> list:
+    """
+    Compare results with baseline results of the same cases.
+
+    A regression is a stage (or the total) that takes longer than the baseline
+    by more than the threshold fraction. Stages faster than min_seconds in both
+    runs are ignored as noise.
+
+    Returns:
+        list: Messages describing the regressions.
+    """
+    baseline = {result['case']: result for result in baseline if 'case' in result}
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.get('case'))
+        if previous is None or result.get('status') != 'ok' or previous.get('status') != 'ok':
+            continue
+        timings = [('total', result['seconds'], previous['seconds'])] + [
+            (name, seconds, previous['stages'].get(name, 0.0)) for name, seconds in result['stages'].items()
+        ]
+        for name, seconds, previous_seconds in timings:
+            if max(seconds, previous_seconds) < min_seconds:
+                continue
+            if seconds > previous_seconds * (1.0 + threshold):
+                regressions.append(
+                    f"{result['case']} {name}: {seconds:.3f} s, baseline {previous_seconds:.3f} s "
+                    f"(+{(seconds / max(previous_seconds, 1e-9) - 1.0) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def parse_args(argv: list) -> argparse.Namespace:
+    methods = [item[0] for item in SURFACE_DEFORM_METHODS]
+    parser = argparse.ArgumentParser(prog='benchmark', description='Benchmark shape key transfer stages.')
+    parser.add_argument('--shapes', nargs='+', choices=SHAPES, default=list(SHAPES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10000, 100000], help='Source vertex counts')
+    parser.add_argument('--keys', nargs='+', type=int, default=[10, 100], help='Shape key counts')
+    parser.add_argument('--methods', nargs='+', choices=methods, default=methods)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--empty-threshold', type=float, default=0.00001)
+    parser.add_argument('--no-smooth', dest='smooth', action='store_false')
+    parser.add_argument('--no-drivers', dest='drivers', action='store_false')
+    parser.add_argument('--key-block-size', type=int, default=32)
+    parser.add_argument('--search', choices=['BVH', 'GRID'], default='BVH')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--sparse', action='store_true')
+    parser.add_argument('--memory', action='store_true', help='Trace stage memory peaks with tracemalloc')
+    parser.add_argument('--output', help='JSON file to write the results to')
+    parser.add_argument('--baseline', help='Results file to check the results against')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Allowed slowdown fraction. Defaults to 0.1')
+    parser.add_argument('--min-seconds', type=float, default=0.05, help='Stages faster than this are not checked')
+    return parser.parse_args(argv)
+
+
+def main(argv: list | None = None) -> int:
+    """
+    Run the benchmark cases given after '--' on the Blender command line.
+
+    Returns:
+        int: Exit code, 1 if a case failed or a regression was found.
+    """
+    if argv is None:
+        argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    args = parse_args(argv)
+
+    results = []
+    for shape in args.shapes:
+        for size in args.sizes:
+            for key_count in args.keys:
+                for method in args.methods:
+                    try:
+                        result = run_case(shape, size, key_count, method, args)
+                        result['status'] = 'ok'
+                    except Exception as ex:
+                        traceback.print_exc(file=sys.stderr)
+                        result = {
+                            'case': case_key(shape, size, key_count, method),
+                            'status': 'error',
+                            'error': str(ex)
+                        }
+                    emit({key: value for key, value in result.items() if key != 'profile'})
+                    results.append(result)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'blender': bpy.app.version_string,
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'results': results
+            }, f, indent=2)
+
+    failed = any(result['status'] != 'ok' for result in results)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = check_regressions(results, baseline, args.threshold, args.min_seconds)
+        emit({'status': 'regression' if regressions else 'ok', 'regressions': regressions})
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
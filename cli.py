@@ -0,0 +1,278 @@
+"""
+Headless batch transfer driven by a job manifest.
+
+Run in background Blender with the add-on installed (enabled or not). The
+module is imported with importlib under the name of the add-on folder, which
+need not be an identifier (e.g. ShapeKeyWrap-main when installed from a GitHub zip):
+
+    blender -b --python-expr "import sys, importlib; \\
+        sys.exit(importlib.import_module('ShapeKeyWrap.cli').main())" -- jobs.json
+
+The manifest is a JSON (or TOML, Blender 4.1+ with Python 3.11) file with a
+list of jobs and optional defaults shared by all the jobs:
+
+    {
+        "defaults": {"method": "SQUEEZY_PIXELS", "overwrite": true},
+        "jobs": [
+            {
+                "file": "//character.blend",
+                "source": "Body",
+                "targets": ["Shirt", "Pants"],
+                "shape_key_pattern": "^mouth",
+                "empty_threshold": 0.00001,
+                "smooth": {"factor": 0.5, "iterations": 5},
+                "output": "//character_wrapped.blend"
+            }
+        ]
+    }
+
+Every job prints one JSON line with its result and stage timings to stdout.
+The exit code is 1 if any job failed.
+"""
+import os
+import re
+import sys
+import json
+import time
+import traceback
+import bpy
+from .functions.surface_deform import transfer_shapekeys_to_objects
+from .functions.transfer_shape_keys import transfer_shape_keys
+from .functions.smooth_shape_keys import smooth_shape_keys
+from .functions.bind_drivers import bind_shape_key_values
+
+
+JOB_DEFAULTS = {
+    'file': None,
+    'source': None,
+    'targets': None,
+    'shape_keys': None,
+    'shape_key_pattern': None,
+    'method': 'SQUEEZY_PIXELS',
+    'overwrite': False,
+    'empty_threshold': None,
+    'drivers': False,
+    'smooth': None,
+    # Squeezy Pixels method
+    'key_block_size': 32,
+    'search': 'BVH',
+    'workers': 1,
+    'threads': 1,
+    'sparse': False,
+    'binding_dir': None,
+    # Blender method
+    'falloff': 4.0,
+    'strength': 1.0,
+    'bind_noise': None,
+    'merge_targets': False,
+    'keep_bound_modifiers': False,
+    # Output
+    'save': False,
+    'output': None
+}
+
+SMOOTH_DEFAULTS = {
+    'factor': 0.5,
+    'iterations': 5,
+    'scale': 1.0,
+    'smooth_type': 'SIMPLE'
+}
+
+
+class JobError(Exception):
+    pass
+
+
+def load_manifest(filepath: str) -> list:
+    """
+    Read the jobs of a JSON or TOML manifest with the defaults applied.
+    """
+    if filepath.lower().endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            raise JobError('TOML manifests need Blender 4.1+ (Python 3.11)')
+        with open(filepath, 'rb') as f:
+            manifest = tomllib.load(f)
+    else:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    defaults = manifest.get('defaults', {})
+    jobs = list()
+    for index, job in enumerate(manifest.get('jobs', [])):
+        job = {**JOB_DEFAULTS, **defaults, **job}
+        unknown = set(job) - set(JOB_DEFAULTS)
+        if unknown:
+            raise JobError(f'Job {index}: unknown keys {sorted(unknown)}')
+        jobs.append(job)
+    return jobs
+
+
+def get_mesh_object(name: str) -> bpy.types.Object:
+    obj = bpy.data.objects.get(name)
+    if obj is None:
+        raise JobError(f'Object {name} not found')
+    if obj.type != 'MESH':
+        raise JobError(f'Object {name} is not a mesh')
+    return obj
+
+
+def job_shape_keys(job: dict, src_obj: bpy.types.Object) -> list | None:
+    """
+    Names of the source shape keys selected by the job (None for all of them).
+    """
+    if src_obj.data.shape_keys is None or len(src_obj.data.shape_keys.key_blocks) <= 1:
+        raise JobError(f'{src_obj.name} has no shape keys to transfer')
+    if job['shape_keys'] is None and job['shape_key_pattern'] is None:
+        return None
+
+    sk_names = [sk.name for sk in src_obj.data.shape_keys.key_blocks[1:]]
+    if job['shape_keys'] is not None:
+        sk_names = [name for name in sk_names if name in job['shape_keys']]
+    if job['shape_key_pattern'] is not None:
+        pattern = re.compile(job['shape_key_pattern'])
+        sk_names = [name for name in sk_names if pattern.search(name)]
+    return sk_names
+
+
+def transfer_job(context: bpy.types.Context, job: dict) -> tuple:
+    """
+    Run one transfer job.
+
+    Returns:
+        tuple: Names of the created and of the skipped shape keys by target name and stage timings in seconds.
+    """
+    timings = dict()
+
+    def stage(name: str, start: float) -> float:
+        now = time.perf_counter()
+        timings[name] = timings.get(name, 0.0) + now - start
+        return now
+
+    start = time.perf_counter()
+    if job['file']:
+        bpy.ops.wm.open_mainfile(filepath=bpy.path.abspath(job['file']))
+        context = bpy.context
+        start = stage('open', start)
+
+    if not job['source'] or not job['targets']:
+        raise JobError('Job needs a source and at least one target')
+    src_obj = get_mesh_object(job['source'])
+    tgt_objs = [get_mesh_object(name) for name in job['targets'] if name != job['source']]
+    shape_keys = job_shape_keys(job, src_obj)
+    skipped_sks = dict()
+
+    src_values = {sk.name: sk.value for sk in src_obj.data.shape_keys.key_blocks}
+    if job['method'] == 'SQUEEZY_PIXELS':
+        created_sks = transfer_shapekeys_to_objects(
+            context=context,
+            tgt_objs=tgt_objs,
+            src_obj=src_obj,
+            shape_keys=shape_keys,
+            overwrite_shape_keys=job['overwrite'],
+            key_block_size=job['key_block_size'],
+            binding_dir=job['binding_dir'],
+            search=job['search'],
+            workers=job['workers'],
+            threads=job['threads'],
+            empty_threshold=job['empty_threshold'],
+            skipped_sks=skipped_sks,
+            sparse=job['sparse']
+        )
+        start = stage('transfer', start)
+        if job['drivers']:
+            for obj in tgt_objs:
+                bind_shape_key_values(context, obj, src_obj, created_sks[obj.name])
+            start = stage('drivers', start)
+    elif job['method'] == 'BLENDER':
+        created_sks = transfer_shape_keys(
+            context=context,
+            from_obj=src_obj,
+            to_objs=tgt_objs,
+            falloff=job['falloff'],
+            strength=job['strength'],
+            overwrite_shape_keys=job['overwrite'],
+            shape_keys=shape_keys,
+            bind_noise=tuple(job['bind_noise']) if job['bind_noise'] else None,
+            create_drivers=job['drivers'],
+            empty_threshold=job['empty_threshold'],
+            skipped_sks=skipped_sks,
+            merge_targets=job['merge_targets'],
+            keep_bound_modifiers=job['keep_bound_modifiers']
+        )
+        start = stage('transfer', start)
+    else:
+        raise JobError(f"Unknown method {job['method']}")
+    for name, value in src_values.items():
+        src_obj.data.shape_keys.key_blocks[name].value = value
+
+    if job['smooth'] is not None:
+        smooth = {**SMOOTH_DEFAULTS, **job['smooth']}
+        for obj in tgt_objs:
+            smooth_shape_keys(context, obj, overwrite_shape_keys=True, shape_keys=created_sks[obj.name], **smooth)
+        start = stage('smooth', start)
+
+    if job['output']:
+        filepath = bpy.path.abspath(job['output'])
+        os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+        bpy.ops.wm.save_as_mainfile(filepath=filepath, copy=True)
+        start = stage('save', start)
+    elif job['save']:
+        bpy.ops.wm.save_mainfile()
+        start = stage('save', start)
+
+    return created_sks, skipped_sks, timings
+
+
+def run_job(context: bpy.types.Context, job: dict) -> dict:
+    """
+    Run one transfer job and return its result with stage timings in seconds.
+    """
+    created_sks, skipped_sks, timings = transfer_job(context, job)
+    return {
+        'created': {name: len(sks) for name, sks in created_sks.items()},
+        'skipped': {name: len(sks) for name, sks in skipped_sks.items()},
+        'timings': timings
+    }
+
+
+def emit(record: dict) -> None:
+    sys.stdout.write(json.dumps(record) + '\n')
+    sys.stdout.flush()
+
+
+def main(argv: list | None = None) -> int:
+    """
+    Run the jobs of the manifest given after '--' on the Blender command line.
+
+    Returns:
+        int: Exit code, 0 if all the jobs succeeded.
+    """
+    if argv is None:
+        argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    if len(argv) != 1:
+        sys.stderr.write('Usage: blender -b --python-expr "..." -- <manifest.json|manifest.toml>\n')
+        return 2
+
+    try:
+        jobs = load_manifest(argv[0])
+    except Exception as ex:
+        emit({'status': 'error', 'error': f'Unable to read the manifest: {ex}'})
+        return 1
+
+    failed = 0
+    for index, job in enumerate(jobs):
+        record = {'job': index, 'file': job['file'], 'source': job['source']}
+        start = time.perf_counter()
+        try:
+            record.update(run_job(bpy.context, job))
+            record['status'] = 'ok'
+        except Exception as ex:
+            failed += 1
+            record['status'] = 'error'
+            record['error'] = str(ex)
+            traceback.print_exc(file=sys.stderr)
+        record['seconds'] = time.perf_counter() - start
+        emit(record)
+    return 1 if failed else 0
@@ -0,0 +1,410 @@
+"""
+Differential accuracy and speed comparison of the surface deform methods.
+
+Transfers the same shape keys from a source to a target with both methods
+(Blender's Surface Deform modifier and Squeezy Pixels) and reports the per
+key error between their results next to the runtime and peak memory of each
+method. Blender's modifier is the reference.
+
+Run in background Blender on an asset or on a generated case (see benchmark.py):
+
+    blender -b --factory-startup --python-expr "import sys, importlib; sys.path.insert(0, '<addons dir>'); \\
+        sys.exit(importlib.import_module('ShapeKeyWrap.compare_methods').main())" -- \\
+        --file character.blend --source Body --target Shirt --budget 0.0005
+
+    ... -- --shape GARMENT --size 50000 --keys 50
+
+A JSON line with the comparison is printed to stdout. With --budget (an
+error in scene units), the fastest method whose worst key p99 error is
+within the budget is recommended and the exit code is 1 if Squeezy Pixels
+exceeds it. Peak memory is the peak traced by tracemalloc, it covers Python
+and NumPy allocations but not the memory Blender allocates evaluating the
+modifier.
+
+With --smooth, the shape keys of the source are smoothed with the NumPy
+corrective smooth engine instead and compared with the Corrective Smooth
+modifier applied as a shape key, for both smooth types, with and without
+Only Smooth and a vertex group (a gradient along X). The exit code is 1 if
+the largest vertex error of any case exceeds --tolerance:
+
+    ... -- --shape GRID --size 10000 --keys 10 --smooth --tolerance 0.0001
+"""
+import sys
+import json
+import argparse
+import traceback
+import numpy as np
+import bpy
+from .cli import emit, get_mesh_object
+from .benchmark import SHAPES, create_mesh_object, add_shape_keys, stage_seconds
+from .functions import profiling
+from .core.shape_key_error import error_statistics, summarize_errors
+from .core.synthetic_meshes import mesh_pair, sparse_shape_keys
+from .functions.surface_deform import transfer_shapekeys_to_objects
+from .functions.transfer_shape_keys import transfer_shape_keys
+from .functions.smooth_shape_keys import read_mesh_adjacency, read_rest_coordinates
+from .functions.restore_details import read_vertex_group_weights
+from .core.corrective_smooth import CorrectiveSmooth
+
+
+REFERENCE_METHOD = 'BLENDER'
+# Number of shape keys compared at once
+COMPARE_BLOCK_SIZE = 32
+SMOOTH_TYPES = ('SIMPLE', 'LENGTH_WEIGHTED')
+# Temporary vertex group of the weighted smoothing cases
+SMOOTH_GROUP_NAME = 'SKW_compare_smooth'
+# Number of distinct weights of the vertex group
+SMOOTH_GROUP_LEVELS = 10
+
+
+def duplicate_target(context: bpy.types.Context, obj: bpy.types.Object, name: str) -> bpy.types.Object:
+    """
+    Copy the target object and its mesh without shape keys, so each method writes into its own object.
+    """
+    copy = obj.copy()
+    copy.data = obj.data.copy()
+    copy.name = name
+    context.scene.collection.objects.link(copy)
+    if copy.data.shape_keys is not None:
+        copy.shape_key_clear()
+    return copy
+
+
+def run_method(
+        context: bpy.types.Context,
+        method: str,
+        src_obj: bpy.types.Object,
+        tgt_obj: bpy.types.Object,
+        shape_keys: list | None,
+        args: argparse.Namespace
+) -> tuple:
+    """
+    Transfer the shape keys with one method in a profiling session.
+
+    Returns:
+        tuple: Names of the created shape keys and the profiler report.
+    """
+    with profiling.profile_session(method, trace_memory=True, echo=False):
+        if method == 'SQUEEZY_PIXELS':
+            created_sks = transfer_shapekeys_to_objects(
+                context=context,
+                tgt_objs=[tgt_obj],
+                src_obj=src_obj,
+                shape_keys=shape_keys,
+                key_block_size=args.key_block_size,
+                search=args.search,
+                threads=args.threads
+            )
+        else:
+            created_sks = transfer_shape_keys(
+                context=context,
+                from_obj=src_obj,
+                to_objs=[tgt_obj],
+                falloff=args.falloff,
+                strength=args.strength,
+                shape_keys=shape_keys
+            )
+    return created_sks[tgt_obj.name], profiling.last_report
+
+
+def read_shape_keys(obj: bpy.types.Object, names: list, out: np.ndarray) -> np.ndarray:
+    """
+    Read shape key coordinates into a (K, N, 3) float32 buffer.
+    """
+    key_blocks = obj.data.shape_keys.key_blocks
+    for i, name in enumerate(names):
+        key_blocks[name].data.foreach_get('co', out[i].ravel())
+    return out[:len(names)]
+
+
+def compare_methods(
+        context: bpy.types.Context,
+        src_obj: bpy.types.Object,
+        tgt_obj: bpy.types.Object,
+        shape_keys: list | None,
+        args: argparse.Namespace
+) -> dict:
+    """
+    Transfer the shape keys with both methods and compare the results key by key.
+
+    Returns:
+        dict: Runtime, peak memory and stage timings of every method, the error of
+            every key and the error summary of Squeezy Pixels against Blender's modifier.
+    """
+    key_blocks = src_obj.data.shape_keys.key_blocks
+    shape_keys = [sk.name for sk in key_blocks[1:] if shape_keys is None or sk.name in shape_keys]
+    src_values = {sk.name: sk.value for sk in key_blocks}
+
+    methods = dict()
+    outputs = dict()
+    try:
+        for method in (REFERENCE_METHOD, 'SQUEEZY_PIXELS'):
+            obj = duplicate_target(context, tgt_obj, f'{tgt_obj.name}_{method}')
+            outputs[method] = obj
+            names, report = run_method(context, method, src_obj, obj, shape_keys, args)
+            if len(names) != len(shape_keys):
+                raise RuntimeError(f'{method} created {len(names)} of {len(shape_keys)} shape keys')
+            methods[method] = {
+                'seconds': report['seconds'],
+                'peak_bytes': report['peak_bytes'],
+                'stages': stage_seconds(report)
+            }
+            for name, value in src_values.items():
+                src_obj.data.shape_keys.key_blocks[name].value = value
+
+        # Both methods name the target keys after the source keys
+        vertex_count = len(tgt_obj.data.vertices)
+        block_size = min(COMPARE_BLOCK_SIZE, max(1, len(shape_keys)))
+        co = np.empty((block_size, vertex_count, 3), dtype=np.float32)
+        reference_co = np.empty_like(co)
+        key_errors = {'max': [], 'rms': [], 'p99': []}
+        for start in range(0, len(shape_keys), block_size):
+            names = shape_keys[start:start + block_size]
+            stats = error_statistics(
+                read_shape_keys(outputs['SQUEEZY_PIXELS'], names, co),
+                read_shape_keys(outputs[REFERENCE_METHOD], names, reference_co),
+                percentile=args.percentile
+            )
+            for key, values in stats.items():
+                key_errors[key].append(values)
+        key_errors = {key: np.concatenate(values) if values else np.empty(0) for key, values in key_errors.items()}
+    finally:
+        for obj in outputs.values():
+            mesh = obj.data
+            bpy.data.objects.remove(obj)
+            bpy.data.meshes.remove(mesh)
+
+    return {
+        'source': src_obj.name,
+        'target': tgt_obj.name,
+        'source_vertices': len(src_obj.data.vertices),
+        'target_vertices': len(tgt_obj.data.vertices),
+        'keys': len(shape_keys),
+        'reference': REFERENCE_METHOD,
+        'methods': methods,
+        'error': summarize_errors(key_errors),
+        'key_errors': {
+            name: {key: float(values[i]) for key, values in key_errors.items()}
+            for i, name in enumerate(shape_keys)
+        }
+    }
+
+
+def recommend_method(comparison: dict, budget: float) -> str:
+    """
+    Fastest method whose worst key p99 error against the reference is within the budget.
+    """
+    methods = comparison['methods']
+    within_budget = [REFERENCE_METHOD]
+    if comparison['error']['p99'] <= budget:
+        within_budget.append('SQUEEZY_PIXELS')
+    return min(within_budget, key=lambda method: methods[method]['seconds'])
+
+
+def add_gradient_vertex_group(obj: bpy.types.Object, name: str) -> bpy.types.VertexGroup:
+    """
+    Add a vertex group with weights rising along X from 0 (outside the group) to 1 in a few steps.
+    """
+    x = read_rest_coordinates(obj.data)[:, 0]
+    span = float(x.max() - x.min()) if len(x) else 0.0
+    levels = np.ones(len(x), dtype=np.int32) * SMOOTH_GROUP_LEVELS
+    if span > 0.0:
+        levels = np.round((x - x.min()) / span * SMOOTH_GROUP_LEVELS).astype(np.int32)
+
+    group = obj.vertex_groups.new(name=name)
+    for level in range(1, SMOOTH_GROUP_LEVELS + 1):
+        indices = np.flatnonzero(levels == level)
+        if len(indices):
+            group.add(indices.tolist(), level / SMOOTH_GROUP_LEVELS, 'REPLACE')
+    return group
+
+
+def smooth_with_modifier(
+        context: bpy.types.Context,
+        obj: bpy.types.Object,
+        modifier: bpy.types.CorrectiveSmoothModifier,
+        names: list,
+        out: np.ndarray
+) -> np.ndarray:
+    """
+    Apply the modifier as a shape key on every shape key in turn and read the results into a (K, N, 3) buffer.
+    """
+    key_blocks = obj.data.shape_keys.key_blocks
+    for i, name in enumerate(names):
+        obj.active_shape_key_index = key_blocks.find(name)
+        with context.temp_override(object=obj):
+            bpy.ops.object.modifier_apply_as_shapekey(keep_modifier=True, modifier=modifier.name, report=False)
+        new_sk = key_blocks[-1]
+        new_sk.data.foreach_get('co', out[i].ravel())
+        obj.shape_key_remove(new_sk)
+    return out
+
+
+def compare_smoothing(
+        context: bpy.types.Context,
+        obj: bpy.types.Object,
+        shape_keys: list | None,
+        args: argparse.Namespace
+) -> dict:
+    """
+    Smooth the shape keys with the NumPy corrective smooth and with the Corrective Smooth modifier and compare them.
+
+    Every combination of smooth type, Only Smooth and vertex group is a case.
+
+    Returns:
+        dict: Error summary and largest vertex error of every case, the worst case error and the tolerance.
+    """
+    key_blocks = obj.data.shape_keys.key_blocks
+    shape_keys = [sk.name for sk in key_blocks[1:] if shape_keys is None or sk.name in shape_keys]
+    vertex_count = len(obj.data.vertices)
+
+    adjacency = read_mesh_adjacency(obj.data)
+    rest_co = read_rest_coordinates(obj.data)
+    # (N, K, 3) is the layout of the engine
+    key_co = np.empty((len(shape_keys), vertex_count, 3), dtype=np.float32)
+    for i, name in enumerate(shape_keys):
+        key_blocks[name].data.foreach_get('co', key_co[i].ravel())
+    key_co = np.ascontiguousarray(key_co.transpose(1, 0, 2))
+    reference_co = np.empty((len(shape_keys), vertex_count, 3), dtype=np.float32)
+
+    show_only_shape_key = obj.show_only_shape_key
+    active_shape_key_index = obj.active_shape_key_index
+    obj.show_only_shape_key = True
+    group = add_gradient_vertex_group(obj, SMOOTH_GROUP_NAME)
+    modifier = obj.modifiers.new(name='SKW Compare Smooth', type='CORRECTIVE_SMOOTH')
+    cases = []
+    try:
+        with context.temp_override(object=obj):
+            bpy.ops.object.modifier_move_to_index(modifier=modifier.name, index=0)
+        weights = read_vertex_group_weights(obj, group.name)
+        for smooth_type in SMOOTH_TYPES:
+            for only_smooth in (False, True):
+                for use_group in (False, True):
+                    smoother = CorrectiveSmooth(
+                        adjacency, rest_co,
+                        factor=args.smooth_factor,
+                        iterations=args.smooth_iterations,
+                        scale=args.smooth_scale,
+                        smooth_type=smooth_type,
+                        weights=weights if use_group else None
+                    )
+                    co = key_co.copy()
+                    if only_smooth:
+                        smoother.smooth(co)
+                    else:
+                        smoother.apply(co)
+
+                    modifier.factor = args.smooth_factor
+                    modifier.iterations = args.smooth_iterations
+                    modifier.scale = args.smooth_scale
+                    modifier.smooth_type = smooth_type
+                    modifier.use_only_smooth = only_smooth
+                    modifier.vertex_group = group.name if use_group else ''
+                    smooth_with_modifier(context, obj, modifier, shape_keys, reference_co)
+
+                    key_errors = error_statistics(co.transpose(1, 0, 2), reference_co, percentile=args.percentile)
+                    cases.append({
+                        'smooth_type': smooth_type,
+                        'only_smooth': only_smooth,
+                        'vertex_group': use_group,
+                        'error': summarize_errors(key_errors)
+                    })
+    finally:
+        obj.modifiers.remove(modifier)
+        obj.vertex_groups.remove(group)
+        obj.active_shape_key_index = active_shape_key_index
+        obj.show_only_shape_key = show_only_shape_key
+
+    return {
+        'object': obj.name,
+        'vertices': vertex_count,
+        'keys': len(shape_keys),
+        'reference': 'CORRECTIVE_SMOOTH',
+        'tolerance': args.tolerance,
+        'max_error': max((case['error']['max'] for case in cases), default=0.0),
+        'cases': cases
+    }
+
+
+def parse_args(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='compare_methods', description='Compare the surface deform methods.')
+    parser.add_argument('--file', help='Blend file with the source and target objects')
+    parser.add_argument('--source', help='Source object name')
+    parser.add_argument('--target', help='Target object name')
+    parser.add_argument('--shape-keys', nargs='+', help='Names of the shape keys to compare. Defaults to all')
+    parser.add_argument('--shape', choices=SHAPES, help='Compare on a generated case instead of a file')
+    parser.add_argument('--size', type=int, default=10000)
+    parser.add_argument('--keys', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--falloff', type=float, default=4.0)
+    parser.add_argument('--strength', type=float, default=1.0)
+    parser.add_argument('--key-block-size', type=int, default=32)
+    parser.add_argument('--search', choices=['BVH', 'GRID'], default='BVH')
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--percentile', type=float, default=99.0)
+    parser.add_argument('--budget', type=float, help='Accuracy budget: maximum worst key p99 error')
+    parser.add_argument('--smooth', action='store_true', help='Compare corrective smoothing instead of the methods')
+    parser.add_argument('--smooth-factor', type=float, default=0.5)
+    parser.add_argument('--smooth-iterations', type=int, default=5)
+    parser.add_argument('--smooth-scale', type=float, default=1.0)
+    parser.add_argument('--tolerance', type=float, default=0.0001, help='Largest allowed smoothing vertex error')
+    parser.add_argument('--per-key', action='store_true', help='Print the error of every key')
+    parser.add_argument('--output', help='JSON file to write the comparison to')
+    return parser.parse_args(argv)
+
+
+def main(argv: list | None = None) -> int:
+    """
+    Run the comparison given after '--' on the Blender command line.
+
+    Returns:
+        int: Exit code, 1 if the comparison failed or the error is above the budget.
+    """
+    if argv is None:
+        argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    args = parse_args(argv)
+
+    try:
+        if args.shape:
+            bpy.ops.wm.read_factory_settings(use_empty=True)
+            source_data, target_data = mesh_pair(args.shape, args.size)
+            src_obj = create_mesh_object(bpy.context, 'Source', source_data)
+            tgt_obj = create_mesh_object(bpy.context, 'Target', target_data)
+            add_shape_keys(src_obj, sparse_shape_keys(source_data[0], args.keys, seed=args.seed))
+        else:
+            if not args.source or not (args.target or args.smooth):
+                raise ValueError('A source and a target object (or a generated --shape) are required')
+            if args.file:
+                bpy.ops.wm.open_mainfile(filepath=args.file)
+            src_obj = get_mesh_object(args.source)
+            tgt_obj = get_mesh_object(args.target) if args.target else None
+        if args.smooth:
+            comparison = compare_smoothing(bpy.context, src_obj, args.shape_keys, args)
+        else:
+            comparison = compare_methods(bpy.context, src_obj, tgt_obj, args.shape_keys, args)
+    except Exception as ex:
+        traceback.print_exc(file=sys.stderr)
+        emit({'status': 'error', 'error': str(ex)})
+        return 1
+
+    if args.smooth:
+        failed = comparison['max_error'] > args.tolerance
+        comparison['status'] = 'over_tolerance' if failed else 'ok'
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(comparison, f, indent=2)
+        emit(comparison)
+        return 1 if failed else 0
+
+    failed = False
+    if args.budget is not None:
+        comparison['budget'] = args.budget
+        comparison['recommended'] = recommend_method(comparison, args.budget)
+        failed = comparison['error']['p99'] > args.budget
+    comparison['status'] = 'over_budget' if failed else 'ok'
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(comparison, f, indent=2)
+    emit(comparison if args.per_key else {key: value for key, value in comparison.items() if key != 'key_errors'})
+    return 1 if failed else 0
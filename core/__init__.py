@@ -0,0 +1,26 @@
+"""
+Array engine of the add-on.
+
+The modules of this package work on plain NumPy arrays (vertex coordinates,
+triangles, blocks of shape key coordinates, bindings) and never import bpy,
+so they can be used by worker processes, tests and tools outside Blender.
+The modules of the functions package read Blender data into arrays with
+foreach_get, call the engine and write the results back with foreach_set.
+"""
+from .surface_binding import (
+    SurfaceBinding,
+    BindingMatrix,
+    InfluenceIndex,
+    triangle_normals,
+    compute_binding,
+    calc_surface_deform,
+    deform_key_block,
+    deform_key_block_sparse
+)
+from .triangle_index import TriangleGrid, closest_points_on_triangles
+from .transfer import bind_points, deform_block, transfer_key_coordinates
+from .empty_keys import max_displacement, empty_key_mask
+from .corrective_smooth import MeshAdjacency, CorrectiveSmooth, smooth_coordinates
+from .binding_cache import BindingCache, binding_cache_key
+from .binding_io import BindingFileError, save_binding, load_binding
+from .shape_key_error import error_statistics, summarize_errors
@@ -0,0 +1,87 @@
+import hashlib
+import numpy as np
+from collections import OrderedDict
+
+
+def binding_cache_key(*arrays: np.ndarray, **params) -> str:
+    """
+    Build a content hash of the binding inputs (mesh arrays and method parameters).
+    """
+    hasher = hashlib.blake2b(digest_size=20)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        hasher.update(f'{array.dtype.str}{array.shape}'.encode())
+        hasher.update(array.data)
+    for name in sorted(params):
+        hasher.update(f'{name}={params[name]!r};'.encode())
+    return hasher.hexdigest()
+
+
+class BindingCache:
+    """
+    In-memory LRU cache of surface bindings limited by the total size of their arrays.
+    """
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+        # Key of the latest binding put under a lineage (e.g. the same source/target pair)
+        self._lineages = dict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._items
+
+    def get(self, key: str):
+        binding = self._items.get(key)
+        if binding is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return binding
+
+    def latest(self, lineage: str):
+        """
+        The latest binding put under the lineage if it is still cached (does not count as a hit or miss).
+        """
+        key = self._lineages.get(lineage)
+        return self._items.get(key) if key is not None else None
+
+    def put(self, key: str, binding, lineage: str | None = None) -> None:
+        if lineage is not None:
+            self._lineages[lineage] = key
+        if key in self._items:
+            self.nbytes -= self._items.pop(key).nbytes
+        if binding.nbytes > self.max_bytes:
+            # Would evict everything else and still not fit
+            return
+        self._items[key] = binding
+        self.nbytes += binding.nbytes
+        self.shrink()
+
+    def shrink(self) -> None:
+        """
+        Evict the least recently used bindings until the cache fits its budget.
+        """
+        while self.nbytes > self.max_bytes and self._items:
+            _, binding = self._items.popitem(last=False)
+            self.nbytes -= binding.nbytes
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._lineages.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+# Shared by all the transfer operator runs of the session
+binding_cache = BindingCache(max_bytes=512 * 1024 * 1024)
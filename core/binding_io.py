@@ -0,0 +1,138 @@
+import json
+import hashlib
+import numpy as np
+
+
+FORMAT_MAGIC = b'SKWBIND\0'
+FORMAT_VERSION = 2
+# Arrays are stored at offsets aligned to this number of bytes so they can be memory-mapped
+ALIGNMENT = 64
+
+
+class BindingFileError(Exception):
+    pass
+
+
+def topology_hash(tris: np.ndarray, vertex_count: int) -> str:
+    """
+    Hash of the mesh topology (vertex count and triangle vertex indices).
+    """
+    hasher = hashlib.blake2b(digest_size=20)
+    hasher.update(str(vertex_count).encode())
+    hasher.update(np.ascontiguousarray(tris, dtype=np.int32).data)
+    return hasher.hexdigest()
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def save_binding(
+        filepath: str,
+        arrays: dict,
+        source_vertex_count: int,
+        source_topology_hash: str,
+        source_content_hash: str | None = None,
+        target_content_hash: str | None = None
+) -> None:
+    """
+    Write binding arrays to a versioned binary file.
+
+    Layout: magic, version (uint32), header size (uint32), JSON header and
+    the raw arrays, each starting at an aligned offset.
+
+    Args:
+        filepath (str): Destination file path.
+        arrays (dict): Binding arrays by name. The first dimension is the target vertex count.
+        source_vertex_count (int): Number of vertices of the source mesh.
+        source_topology_hash (str): Topology hash of the source mesh (see topology_hash).
+        source_content_hash (str, optional): Hash of the source coordinates the binding was computed from.
+        target_content_hash (str, optional): Hash of the target rest coordinates the binding was computed from.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    target_vertex_count = len(next(iter(arrays.values()))) if arrays else 0
+
+    header = {
+        'source_vertex_count': int(source_vertex_count),
+        'target_vertex_count': int(target_vertex_count),
+        'source_topology_hash': source_topology_hash,
+        'source_content_hash': source_content_hash,
+        'target_content_hash': target_content_hash,
+        'arrays': {}
+    }
+    # Offsets depend on the header size, so it is laid out with placeholder offsets
+    # wide enough for any file size first
+    for name, array in arrays.items():
+        header['arrays'][name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': 2 ** 62}
+    header_size = _align(len(json.dumps(header).encode()) + len(FORMAT_MAGIC) + 8) - len(FORMAT_MAGIC) - 8
+
+    offset = len(FORMAT_MAGIC) + 8 + header_size
+    for name, array in arrays.items():
+        header['arrays'][name]['offset'] = offset
+        offset = _align(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode().ljust(header_size, b' ')
+
+    with open(filepath, 'wb') as f:
+        f.write(FORMAT_MAGIC)
+        f.write(np.array([FORMAT_VERSION, header_size], dtype='<u4').tobytes())
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(header['arrays'][name]['offset'])
+            f.write(array.data)
+
+
+def read_binding_header(filepath: str) -> dict:
+    with open(filepath, 'rb') as f:
+        magic = f.read(len(FORMAT_MAGIC))
+        if magic != FORMAT_MAGIC:
+            raise BindingFileError(f'{filepath} is not a binding file')
+        version, header_size = np.frombuffer(f.read(8), dtype='<u4')
+        if version != FORMAT_VERSION:
+            raise BindingFileError(f'Unsupported binding file version {version} (expected {FORMAT_VERSION})')
+        return json.loads(f.read(int(header_size)).decode())
+
+
+def load_binding(
+        filepath: str,
+        source_vertex_count: int,
+        target_vertex_count: int,
+        source_topology_hash: str,
+        source_content_hash: str | None = None,
+        target_content_hash: str | None = None
+) -> dict:
+    """
+    Memory-map binding arrays from a file written by save_binding.
+
+    The content hashes are checked when given: a binding computed before the
+    source or the target rest shape was edited (with the same topology) is stale.
+
+    Raises:
+        BindingFileError: If the file is invalid or was computed for other meshes.
+
+    Returns:
+        dict: Read-only memory-mapped binding arrays by name.
+    """
+    header = read_binding_header(filepath)
+    if header['source_vertex_count'] != source_vertex_count:
+        raise BindingFileError(
+            f"Source vertex count mismatch ({header['source_vertex_count']} != {source_vertex_count})"
+        )
+    if header['target_vertex_count'] != target_vertex_count:
+        raise BindingFileError(
+            f"Target vertex count mismatch ({header['target_vertex_count']} != {target_vertex_count})"
+        )
+    if header['source_topology_hash'] != source_topology_hash:
+        raise BindingFileError('Source topology has changed since the binding was saved')
+    if source_content_hash is not None and header['source_content_hash'] != source_content_hash:
+        raise BindingFileError('Source shape has changed since the binding was saved')
+    if target_content_hash is not None and header['target_content_hash'] != target_content_hash:
+        raise BindingFileError('Target rest shape has changed since the binding was saved')
+
+    arrays = {}
+    for name, info in header['arrays'].items():
+        shape = tuple(info['shape'])
+        if 0 in shape:
+            arrays[name] = np.empty(shape, dtype=info['dtype'])
+            continue
+        arrays[name] = np.memmap(filepath, dtype=info['dtype'], mode='r', offset=info['offset'], shape=shape)
+    return arrays
@@ -0,0 +1,279 @@
+import numpy as np
+
+
+# Matches the epsilons of the Corrective Smooth modifier
+LENGTH_EPSILON = np.finfo(np.float32).eps * 10.0
+
+
+def _segment_sum(values: np.ndarray, indptr: np.ndarray) -> np.ndarray:
+    """
+    Sum the rows of values over the CSR segments given by indptr. Empty segments sum to zero.
+    """
+    count = len(indptr) - 1
+    out = np.zeros((count,) + values.shape[1:], dtype=values.dtype)
+    if len(values) == 0:
+        return out
+    starts = np.minimum(indptr[:-1], len(values) - 1)
+    # reduceat is faster over flat rows
+    out.reshape(count, -1)[:] = np.add.reduceat(values.reshape(len(values), -1), starts, axis=0)
+    # reduceat returns a single element for empty segments
+    out[indptr[:-1] == indptr[1:]] = 0.0
+    return out
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """
+    Normalize vectors along the last axis in place. Zero vectors stay zero.
+    """
+    lengths = np.sqrt((vectors * vectors).sum(axis=-1, keepdims=True))
+    np.divide(vectors, lengths, out=vectors, where=lengths > 0.0)
+    return vectors
+
+
+class MeshAdjacency:
+    """
+    Vertex adjacency of a mesh used by corrective smoothing.
+
+    Edge neighbors of every vertex are stored in CSR format (indptr, indices).
+    Face corners are stored with their previous and next vertices and sorted
+    by vertex (corner_order, corner_ptr) to average corner offsets per vertex.
+    """
+    def __init__(
+            self,
+            vertex_count: int,
+            indptr: np.ndarray,
+            indices: np.ndarray,
+            corner_verts: np.ndarray,
+            corner_prev: np.ndarray,
+            corner_next: np.ndarray
+    ) -> None:
+        self.vertex_count = vertex_count
+        self.indptr = indptr
+        self.indices = indices
+        self.corner_verts = corner_verts
+        self.corner_prev = corner_prev
+        self.corner_next = corner_next
+
+        degree = np.diff(indptr)
+        self.degree = degree.astype(np.float32)
+        self.rows = np.repeat(np.arange(vertex_count, dtype=np.int32), degree)
+        self.corner_order = np.argsort(corner_verts, kind='stable')
+        self.corner_ptr = np.searchsorted(
+            corner_verts[self.corner_order], np.arange(vertex_count + 1)
+        ).astype(np.int64)
+
+    @classmethod
+    def build(
+            cls,
+            vertex_count: int,
+            edges: np.ndarray,
+            corner_verts: np.ndarray,
+            face_starts: np.ndarray,
+            face_sizes: np.ndarray
+    ) -> 'MeshAdjacency':
+        """
+        Build the adjacency from mesh edges and faces.
+
+        Args:
+            vertex_count (int): Number of mesh vertices.
+            edges (np.ndarray): (E, 2) edge vertex indices.
+            corner_verts (np.ndarray): (L,) vertex index of every face corner (loop).
+            face_starts (np.ndarray): (F,) first corner of every face.
+            face_sizes (np.ndarray): (F,) number of corners of every face.
+
+        Returns:
+            MeshAdjacency: The adjacency of the mesh.
+        """
+        edges = np.asarray(edges, dtype=np.int32).reshape(-1, 2)
+        rows = np.concatenate([edges[:, 0], edges[:, 1]])
+        cols = np.concatenate([edges[:, 1], edges[:, 0]])
+        order = np.argsort(rows, kind='stable')
+        indptr = np.searchsorted(rows[order], np.arange(vertex_count + 1)).astype(np.int64)
+        indices = cols[order].astype(np.int32)
+
+        corner_verts = np.asarray(corner_verts, dtype=np.int32)
+        face_starts = np.asarray(face_starts, dtype=np.int64)
+        face_sizes = np.asarray(face_sizes, dtype=np.int64)
+        starts = np.repeat(face_starts, face_sizes)
+        sizes = np.repeat(face_sizes, face_sizes)
+        offsets = np.arange(len(starts), dtype=np.int64) - np.repeat(np.cumsum(face_sizes) - face_sizes, face_sizes)
+        corners = starts + offsets
+        corner_next = corner_verts[starts + (offsets + 1) % sizes]
+        corner_prev = corner_verts[starts + (offsets - 1) % sizes]
+
+        return cls(
+            vertex_count=vertex_count,
+            indptr=indptr,
+            indices=indices,
+            corner_verts=corner_verts[corners],
+            corner_prev=corner_prev,
+            corner_next=corner_next
+        )
+
+
+def _expand(values: np.ndarray, ndim: int) -> np.ndarray:
+    # Per vertex values broadcast over the key and coordinate axes
+    return values.reshape((-1,) + (1,) * (ndim - 1))
+
+
+def smooth_coordinates(
+        adjacency: MeshAdjacency,
+        co: np.ndarray,
+        factor: float = 0.5,
+        iterations: int = 5,
+        smooth_type: str = 'SIMPLE',
+        weights: np.ndarray | None = None
+) -> np.ndarray:
+    """
+    Smooth vertex coordinates in place the way the Corrective Smooth modifier does.
+
+    Args:
+        adjacency (MeshAdjacency): Adjacency of the mesh.
+        co (np.ndarray): (N, 3) coordinates or (N, K, 3) coordinates of K shape keys.
+        factor (float, optional): Smoothing factor. Defaults to 0.5.
+        iterations (int, optional): Number of smoothing iterations. Defaults to 5.
+        smooth_type (str, optional): 'SIMPLE' or 'LENGTH_WEIGHTED'. Defaults to 'SIMPLE'.
+        weights (np.ndarray, optional): (N,) per vertex smoothing weights. Defaults to None.
+
+    Returns:
+        np.ndarray: co.
+    """
+    degree = adjacency.degree
+    if smooth_type == 'SIMPLE':
+        # Factor, weights and the neighbor count are folded into one coefficient
+        coefficient = factor / np.where(degree > 0.0, degree, 1.0)
+        if weights is not None:
+            coefficient = coefficient * weights
+        coefficient = _expand(coefficient.astype(np.float32), co.ndim)
+        degree = _expand(degree, co.ndim)
+        for _ in range(iterations):
+            delta = _segment_sum(co[adjacency.indices], adjacency.indptr)
+            delta -= co * degree
+            delta *= coefficient
+            co += delta
+    elif smooth_type == 'LENGTH_WEIGHTED':
+        # Length weighted smoothing is about half as strong as the simple one
+        factor = factor * 2.0
+        degree = _expand(degree, co.ndim)
+        for _ in range(iterations):
+            edge_dir = co[adjacency.indices] - co[adjacency.rows]
+            edge_dist = np.sqrt((edge_dir * edge_dir).sum(axis=-1, keepdims=True))
+            edge_dir *= edge_dist
+            delta = _segment_sum(edge_dir, adjacency.indptr)
+            div = _segment_sum(edge_dist, adjacency.indptr) * degree
+            coefficient = np.zeros_like(div)
+            np.divide(factor, div, out=coefficient, where=div > LENGTH_EPSILON)
+            if weights is not None:
+                coefficient *= _expand(weights.astype(np.float32), co.ndim)
+            delta *= coefficient
+            co += delta
+    else:
+        raise ValueError(f'Unknown smooth type {smooth_type}')
+    return co
+
+
+def tangent_spaces(adjacency: MeshAdjacency, co: np.ndarray) -> tuple:
+    """
+    Calculate the tangent space of every face corner (loop).
+
+    The axes of a corner space are orthonormal and built from the directions of
+    its two face edges. Corners with parallel edges get the identity space and
+    a zero weight, the others are weighted by the angle between the edges.
+
+    Args:
+        adjacency (MeshAdjacency): Adjacency of the mesh.
+        co (np.ndarray): (N, 3) or (N, K, 3) vertex coordinates.
+
+    Returns:
+        tuple: (L, 3) or (L, K, 3) tangent, bitangent and normal axes and (L,) or (L, K) corner weights.
+    """
+    curr = co[adjacency.corner_verts]
+    dir_prev = _normalize(co[adjacency.corner_prev] - curr)
+    dir_next = _normalize(curr - co[adjacency.corner_next])
+
+    normal = _normalize(np.cross(dir_prev, dir_next))
+    tangent = _normalize(dir_prev - dir_next)
+    bitangent = np.cross(normal, tangent)
+    weight = np.abs(np.arccos(np.clip((dir_prev * dir_next).sum(axis=-1), -1.0, 1.0)))
+
+    degenerate = np.all(np.abs(dir_prev - dir_next) <= LENGTH_EPSILON, axis=-1)
+    weight[degenerate] = 0.0
+    for axis, unit in enumerate((tangent, bitangent, normal)):
+        unit[degenerate] = np.eye(3, dtype=unit.dtype)[axis]
+    return tangent, bitangent, normal, weight
+
+
+class CorrectiveSmooth:
+    """
+    Corrective smoothing of shape keys against the rest coordinates of a mesh.
+
+    The rest coordinates are smoothed once and the offsets lost by smoothing
+    are stored in the corner tangent spaces of the smoothed rest mesh. Applying
+    it to deformed coordinates smooths them the same way and adds the offsets
+    back in their own tangent spaces (averaged over the corners of every vertex
+    by corner weight), as the Corrective Smooth modifier does.
+    """
+    def __init__(
+            self,
+            adjacency: MeshAdjacency,
+            rest_co: np.ndarray,
+            factor: float = 0.5,
+            iterations: int = 5,
+            scale: float = 1.0,
+            smooth_type: str = 'SIMPLE',
+            weights: np.ndarray | None = None
+    ) -> None:
+        self.adjacency = adjacency
+        self.factor = factor
+        self.iterations = iterations
+        self.scale = scale
+        self.smooth_type = smooth_type
+        self.weights = weights
+
+        rest_co = np.asarray(rest_co, dtype=np.float32)
+        smoothed = self.smooth(rest_co.copy())
+        delta = (rest_co - smoothed)[adjacency.corner_verts]
+        # Corner spaces are orthonormal, the transposed space is the inverse
+        self.deltas = np.stack(
+            [(delta * axis).sum(axis=-1) for axis in tangent_spaces(adjacency, smoothed)[:3]],
+            axis=-1
+        )
+
+    def smooth(self, co: np.ndarray) -> np.ndarray:
+        return smooth_coordinates(
+            self.adjacency, co,
+            factor=self.factor,
+            iterations=self.iterations,
+            smooth_type=self.smooth_type,
+            weights=self.weights
+        )
+
+    def apply(self, co: np.ndarray) -> np.ndarray:
+        """
+        Apply corrective smoothing to coordinates in place.
+
+        Args:
+            co (np.ndarray): (N, 3) coordinates or (N, K, 3) coordinates of K shape keys.
+
+        Returns:
+            np.ndarray: co.
+        """
+        adjacency = self.adjacency
+        self.smooth(co)
+        tangent, bitangent, normal, weight = tangent_spaces(adjacency, co)
+
+        deltas = self.deltas.reshape((len(self.deltas),) + (1,) * (co.ndim - 2) + (3,))
+        offsets = tangent
+        offsets *= deltas[..., 0:1]
+        offsets += bitangent * deltas[..., 1:2]
+        offsets += normal * deltas[..., 2:3]
+        offsets *= weight[..., None]
+
+        order = adjacency.corner_order
+        weight_sum = _segment_sum(weight[order], adjacency.corner_ptr)
+        offset_sum = _segment_sum(offsets[order], adjacency.corner_ptr)
+        coefficient = np.zeros_like(weight_sum)
+        np.divide(self.scale, weight_sum, out=coefficient, where=weight_sum > 0.0)
+        offset_sum *= coefficient[..., None]
+        co += offset_sum
+        return co
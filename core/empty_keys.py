@@ -0,0 +1,51 @@
+import numpy as np
+
+
+def max_displacement(co: np.ndarray, basis: np.ndarray, tmp: np.ndarray | None = None) -> float:
+    """
+    Largest vertex displacement of a shape key relative to the basis.
+
+    Args:
+        co (np.ndarray): (N, 3) shape key coordinates.
+        basis (np.ndarray): (N, 3) basis coordinates.
+        tmp (np.ndarray, optional): (N, 3) scratch buffer.
+    """
+    if len(co) == 0:
+        return 0.0
+    delta = np.subtract(co, basis, out=tmp)
+    np.multiply(delta, delta, out=delta)
+    return float(np.sqrt(delta.sum(axis=1).max()))
+
+
+def empty_key_mask(
+        co: np.ndarray,
+        basis: np.ndarray,
+        empty_threshold: float,
+        touched: np.ndarray | None = None
+) -> np.ndarray:
+    """
+    Find the keys of a block that do not move any vertex beyond the threshold.
+
+    Args:
+        co (np.ndarray): (N, K, 3) coordinates of K shape keys (the layout of deform_key_block).
+        basis (np.ndarray): (N, 3) basis coordinates.
+        empty_threshold (float): Largest displacement of an empty key.
+        touched (np.ndarray, optional): (K,) bool array of the keys that may move any vertex
+            (see deform_key_block_sparse), the others are empty without checking.
+
+    Returns:
+        np.ndarray: (K,) bool array, True for the empty keys.
+    """
+    key_count = co.shape[1]
+    empty = np.zeros(key_count, dtype=bool) if touched is None else ~touched
+    if len(co) == 0:
+        empty[:] = True
+        return empty
+
+    keys = np.flatnonzero(~empty)
+    if len(keys) == 0:
+        return empty
+    delta = (co if len(keys) == key_count else co[:, keys]) - basis[:, None, :]
+    dist_sq = np.einsum('nki,nki->nk', delta, delta).max(axis=0)
+    empty[keys] = np.sqrt(dist_sq) <= empty_threshold
+    return empty
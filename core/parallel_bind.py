@@ -0,0 +1,112 @@
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from .triangle_index import TriangleGrid
+from .surface_binding import SurfaceBinding, compute_binding
+
+
+# Number of target vertices bound by one task
+CHUNK_SIZE = 16384
+
+# Arrays attached by the worker process initializer
+_worker_arrays = dict()
+_worker_blocks = list()
+
+
+def _attach_shared_arrays(specs: dict) -> None:
+    for name, (shm_name, shape, dtype) in specs.items():
+        # Spawned workers share the resource tracker of the parent process which unlinks the blocks
+        shm = SharedMemory(name=shm_name)
+        _worker_blocks.append(shm)
+        _worker_arrays[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    a = _worker_arrays
+    _worker_arrays['grid'] = TriangleGrid(
+        verts=a['verts'],
+        tris=a['tris'],
+        origin=a['origin'],
+        cell_size=float(a['cell_size']),
+        dims=a['dims'],
+        cell_ids=a['cell_ids'],
+        cell_start=a['cell_start'],
+        cell_tris=a['cell_tris']
+    )
+
+
+def _bind_range(start: int, stop: int) -> None:
+    a = _worker_arrays
+    points = a['points'][start:stop]
+    tri_indices, _, _ = a['grid'].find_nearest(points)
+    binding = compute_binding(a['verts'], a['tris'], points, tri_indices, normals=a['tri_normals'])
+    for name in SurfaceBinding.ARRAYS:
+        a[f'out_{name}'][start:stop] = getattr(binding, name)
+
+
+def bind_points_parallel(
+        grid: TriangleGrid,
+        normals: np.ndarray,
+        points: np.ndarray,
+        workers: int,
+        chunk_size: int = CHUNK_SIZE
+) -> SurfaceBinding:
+    """
+    Bind points to the nearest triangles of the grid in a pool of worker processes.
+
+    Source triangle arrays, the grid and the points are shared with the workers
+    through shared memory. Each worker binds chunks of points and writes the
+    result straight into shared output arrays. The result is identical to
+    compute_binding over TriangleGrid.find_nearest in a single process.
+
+    Args:
+        grid (TriangleGrid): Grid over the source triangles.
+        normals (np.ndarray): (M, 3) source triangle normals.
+        points (np.ndarray): (P, 3) coordinates of the points to bind.
+        workers (int): Number of worker processes.
+        chunk_size (int, optional): Number of points bound by one task.
+
+    Returns:
+        SurfaceBinding: The binding of the points.
+    """
+    count = len(points)
+    specs = dict()
+    blocks = list()
+    outputs = dict()
+
+    def share(name: str, array: np.ndarray) -> np.ndarray:
+        shm = SharedMemory(create=True, size=max(1, array.nbytes))
+        blocks.append(shm)
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+        view[...] = array
+        specs[name] = (shm.name, array.shape, array.dtype.str)
+        return view
+
+    try:
+        for name, array in grid.arrays().items():
+            share(name, np.asarray(array))
+        share('tri_normals', np.asarray(normals))
+        share('points', np.asarray(points))
+        # Output layout is taken from the binding of a single point
+        sample = compute_binding(grid.verts, grid.tris, points[:1], np.zeros(1, dtype=np.int32), normals=normals)
+        for name, array in sample.arrays().items():
+            outputs[name] = share(f'out_{name}', np.zeros((count,) + array.shape[1:], dtype=array.dtype))
+
+        # Forking Blender is not safe, workers are started as fresh interpreters
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=context,
+                initializer=_attach_shared_arrays,
+                initargs=(specs,)
+        ) as pool:
+            futures = [pool.submit(_bind_range, start, min(start + chunk_size, count))
+                       for start in range(0, count, chunk_size)]
+            for future in futures:
+                future.result()
+
+        return SurfaceBinding(**{name: array.copy() for name, array in outputs.items()})
+    finally:
+        outputs.clear()
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
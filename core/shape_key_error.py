@@ -0,0 +1,42 @@
+import numpy as np
+
+
+def error_statistics(co: np.ndarray, reference_co: np.ndarray, percentile: float = 99.0) -> dict:
+    """
+    Per key statistics of the vertex distances between two blocks of shape keys.
+
+    Args:
+        co (np.ndarray): (K, N, 3) coordinates of K shape keys.
+        reference_co (np.ndarray): (K, N, 3) coordinates of the same keys to compare with.
+        percentile (float, optional): Percentile of the distances reported as 'p99'. Defaults to 99.
+
+    Returns:
+        dict: (K,) arrays of the maximum ('max'), root mean square ('rms') and
+            percentile ('p99') vertex distance of every key.
+    """
+    diff = co - reference_co
+    dist_sq = np.einsum('kni,kni->kn', diff, diff)
+    dist = np.sqrt(dist_sq)
+    return {
+        'max': dist.max(axis=1),
+        'rms': np.sqrt(dist_sq.mean(axis=1)),
+        'p99': np.percentile(dist, percentile, axis=1)
+    }
+
+
+def summarize_errors(key_errors: dict) -> dict:
+    """
+    Summarize the per key statistics of error_statistics over all the keys.
+
+    Returns:
+        dict: Worst key maximum, RMS over all the keys (keys have the same vertex
+            count) and worst and median key percentile.
+    """
+    if len(key_errors['max']) == 0:
+        return {'max': 0.0, 'rms': 0.0, 'p99': 0.0, 'p99_median': 0.0}
+    return {
+        'max': float(np.max(key_errors['max'])),
+        'rms': float(np.sqrt(np.mean(np.square(key_errors['rms'])))),
+        'p99': float(np.max(key_errors['p99'])),
+        'p99_median': float(np.median(key_errors['p99']))
+    }
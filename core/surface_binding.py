@@ -0,0 +1,389 @@
+import numpy as np
+from .triangle_index import dot
+
+
+class SurfaceBinding:
+    """
+    Array-backed binding of target mesh vertices to source mesh triangles.
+
+    Attributes:
+        tri_indices (np.ndarray): (N,) int32 index of the bound source triangle per target vertex.
+        vertex_indices (np.ndarray): (N, 3) int32 source vertex indices of the bound triangle.
+        weights (np.ndarray): (N, 3) float32 barycentric coordinates relative to the triangle.
+        normals (np.ndarray): (N, 3) float32 normal of the bound triangle.
+        offsets (np.ndarray): (N,) float32 distance from the vertex to the triangle plane along the normal.
+        rest_co (np.ndarray): (N, 3) float32 target coordinates the vertices were bound at (optional).
+    """
+    ARRAYS = ('tri_indices', 'vertex_indices', 'weights', 'normals', 'offsets')
+
+    def __init__(
+            self,
+            tri_indices: np.ndarray,
+            vertex_indices: np.ndarray,
+            weights: np.ndarray,
+            normals: np.ndarray,
+            offsets: np.ndarray,
+            rest_co: np.ndarray | None = None
+    ) -> None:
+        self.tri_indices = tri_indices
+        self.vertex_indices = vertex_indices
+        self.weights = weights
+        self.normals = normals
+        self.offsets = offsets
+        self.rest_co = rest_co
+        self._influence = None
+
+    def __len__(self) -> int:
+        return len(self.tri_indices)
+
+    @property
+    def nbytes(self) -> int:
+        nbytes = sum(getattr(self, name).nbytes for name in self.ARRAYS)
+        if self.rest_co is not None:
+            nbytes += self.rest_co.nbytes
+        return nbytes
+
+    def arrays(self) -> dict:
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    def to_matrix(self, source_vertex_count: int) -> 'BindingMatrix':
+        """
+        Represent the barycentric part of the binding as a sparse (P x N) matrix.
+        """
+        count = len(self)
+        return BindingMatrix(
+            indptr=np.arange(0, 3 * count + 1, 3, dtype=np.int64),
+            indices=self.vertex_indices.ravel(),
+            data=self.weights.ravel(),
+            shape=(count, source_vertex_count)
+        )
+
+    def changed_rows(self, points: np.ndarray) -> np.ndarray | None:
+        """
+        Find the target vertices moved or added since the binding was made.
+
+        Args:
+            points (np.ndarray): (P, 3) current target coordinates.
+
+        Returns:
+            np.ndarray | None: Sorted indices of the moved and added vertices or None if
+                the binding has no rest coordinates or vertices were removed.
+        """
+        if self.rest_co is None or len(points) < len(self):
+            return None
+        count = len(self)
+        moved = np.flatnonzero(np.any(points[:count] != self.rest_co, axis=1))
+        added = np.arange(count, len(points), dtype=moved.dtype)
+        return np.concatenate([moved, added])
+
+    def updated(self, rows: np.ndarray, binding: 'SurfaceBinding', points: np.ndarray) -> 'SurfaceBinding':
+        """
+        Copy of the binding with the given rows replaced (or appended) by another binding.
+
+        Args:
+            rows (np.ndarray): Sorted indices of the rebound target vertices.
+            binding (SurfaceBinding): Binding of the rebound vertices, one row per index.
+            points (np.ndarray): (P, 3) current target coordinates, the new rest coordinates.
+
+        Returns:
+            SurfaceBinding: The binding of all the P target vertices.
+        """
+        arrays = dict()
+        for name in self.ARRAYS:
+            old = getattr(self, name)
+            array = np.empty((len(points),) + old.shape[1:], dtype=old.dtype)
+            array[:len(old)] = old
+            array[rows] = getattr(binding, name)
+            arrays[name] = array
+        return SurfaceBinding(rest_co=points, **arrays)
+
+    def influence(self, source_vertex_count: int) -> 'InfluenceIndex':
+        """
+        Inverse index from source vertices to the target vertices bound to them (built once).
+        """
+        if self._influence is None or self._influence.source_vertex_count != source_vertex_count:
+            self._influence = InfluenceIndex.build(self.vertex_indices, source_vertex_count)
+        return self._influence
+
+
+class InfluenceIndex:
+    """
+    CSR index of the target vertices depending on each source vertex:
+    targets[ptr[i]:ptr[i + 1]] are the target vertices bound to triangles using source vertex i.
+    """
+    def __init__(self, ptr: np.ndarray, targets: np.ndarray, target_vertex_count: int) -> None:
+        self.ptr = ptr
+        self.targets = targets
+        self.target_vertex_count = target_vertex_count
+
+    @property
+    def source_vertex_count(self) -> int:
+        return len(self.ptr) - 1
+
+    @classmethod
+    def build(cls, vertex_indices: np.ndarray, source_vertex_count: int) -> 'InfluenceIndex':
+        sources = vertex_indices.ravel()
+        order = np.argsort(sources, kind='stable')
+        targets = (order // vertex_indices.shape[1]).astype(np.int32)
+        ptr = np.zeros(source_vertex_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=source_vertex_count), out=ptr[1:])
+        return cls(ptr, targets, len(vertex_indices))
+
+    def dependents(self, source_vertices: np.ndarray) -> np.ndarray:
+        """
+        Sorted indices of the target vertices depending on any of the source vertices.
+        """
+        starts = self.ptr[source_vertices]
+        counts = self.ptr[source_vertices + 1] - starts
+        positions = np.arange(counts.sum(), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+        mask = np.zeros(self.target_vertex_count, dtype=bool)
+        mask[self.targets[np.repeat(starts, counts) + positions]] = True
+        return np.flatnonzero(mask)
+
+
+class BindingMatrix:
+    """
+    Sparse matrix in CSR format mapping source vertices to target vertices.
+
+    Multiplying it by a (N, C) block of source coordinates gives the (P, C)
+    barycentric blend of the target vertices, so a block of K shape keys laid
+    out as (N, 3K) columns is deformed in one product.
+    """
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, shape: tuple) -> None:
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = shape
+
+        # Rows of the same length (always the case for triangle bindings) are
+        # multiplied column by column without reduceat
+        row_sizes = np.diff(indptr)
+        if len(row_sizes) and np.all(row_sizes == row_sizes[0]) and row_sizes[0] > 0:
+            self.row_size = int(row_sizes[0])
+        else:
+            self.row_size = None
+
+    @property
+    def nnz(self) -> int:
+        return len(self.data)
+
+    def dot(self, x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Multiply the matrix by a dense (N, C) array.
+
+        Returns:
+            np.ndarray: (P, C) array of the same dtype as x.
+        """
+        rows, cols = self.shape
+        if x.shape[0] != cols:
+            raise ValueError(f'Expected {cols} rows, got {x.shape[0]}')
+        if out is None:
+            out = np.empty((rows,) + x.shape[1:], dtype=x.dtype)
+
+        if self.row_size is not None:
+            indices = self.indices.reshape(rows, self.row_size)
+            data = self.data.reshape(rows, self.row_size)
+            tmp = np.empty_like(out)
+            out.fill(0.0)
+            for column in range(self.row_size):
+                np.take(x, indices[:, column], axis=0, out=tmp)
+                tmp *= data[:, column].reshape((-1,) + (1,) * (x.ndim - 1))
+                out += tmp
+            return out
+
+        out.fill(0.0)
+        if self.nnz == 0:
+            return out
+        products = x[self.indices] * self.data.reshape((-1,) + (1,) * (x.ndim - 1))
+        starts = np.minimum(self.indptr[:-1], self.nnz - 1)
+        out[:] = np.add.reduceat(products, starts, axis=0)
+        # reduceat returns a single element for empty rows
+        out[self.indptr[:-1] == self.indptr[1:]] = 0.0
+        return out
+
+
+def triangle_normals(verts: np.ndarray, tris: np.ndarray) -> np.ndarray:
+    """
+    Calculate unit normals of the triangles. Degenerate triangles get a zero normal.
+    """
+    corners = verts[tris].astype(np.float64)
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    np.divide(normals, lengths, out=normals, where=lengths > 0.0)
+    return normals
+
+
+def compute_binding(
+        verts: np.ndarray,
+        tris: np.ndarray,
+        points: np.ndarray,
+        tri_indices: np.ndarray,
+        normals: np.ndarray | None = None
+) -> SurfaceBinding:
+    """
+    Calculate barycentric coordinates and normal offsets of points bound to known triangles.
+
+    Args:
+        verts (np.ndarray): (N, 3) source vertex coordinates.
+        tris (np.ndarray): (M, 3) source triangle vertex indices.
+        points (np.ndarray): (P, 3) coordinates of the points to bind.
+        tri_indices (np.ndarray): (P,) index of the triangle each point is bound to.
+        normals (np.ndarray, optional): (M, 3) triangle normals. Calculated if not provided.
+
+    Returns:
+        SurfaceBinding: The binding of the points.
+    """
+    if normals is None:
+        normals = triangle_normals(verts, tris)
+
+    tri_indices = np.asarray(tri_indices, dtype=np.int32)
+    vertex_indices = tris[tri_indices].astype(np.int32)
+    corners = verts[vertex_indices].astype(np.float64)
+    pts = points.astype(np.float64)
+
+    v2_v1 = corners[:, 1] - corners[:, 0]
+    v3_v1 = corners[:, 2] - corners[:, 0]
+    pt_v1 = pts - corners[:, 0]
+    d00 = dot(v2_v1, v2_v1)
+    d01 = dot(v2_v1, v3_v1)
+    d11 = dot(v3_v1, v3_v1)
+    d20 = dot(pt_v1, v2_v1)
+    d21 = dot(pt_v1, v3_v1)
+    denom = d00 * d11 - d01 * d01
+
+    # Degenerate triangles bind the point to their first vertex
+    valid = denom != 0.0
+    safe_denom = np.where(valid, denom, 1.0)
+    v = np.where(valid, (d11 * d20 - d01 * d21) / safe_denom, 0.0)
+    w = np.where(valid, (d00 * d21 - d01 * d20) / safe_denom, 0.0)
+    u = 1.0 - v - w
+    weights = np.stack((u, v, w), axis=1)
+
+    tri_normals = normals[tri_indices]
+    projected = corners[:, 0] * u[:, None] + corners[:, 1] * v[:, None] + corners[:, 2] * w[:, None]
+    offsets = dot(pts - projected, tri_normals)
+
+    return SurfaceBinding(
+        tri_indices=tri_indices,
+        vertex_indices=vertex_indices,
+        weights=weights.astype(np.float32),
+        normals=tri_normals.astype(np.float32),
+        offsets=offsets.astype(np.float32)
+    )
+
+
+def calc_surface_deform(
+        binding: SurfaceBinding,
+        new_source_data: np.ndarray,
+        out: np.ndarray | None = None,
+        tmp: np.ndarray | None = None
+) -> np.ndarray:
+    """
+    Calculate deformed target vertex coordinates.
+
+    The corners are gathered and blended one at a time, so the only memory
+    used is the output buffer and one temporary buffer of the same size.
+    Both can be preallocated and reused between shape keys.
+
+    Args:
+        binding (SurfaceBinding): Binding data of the target vertices.
+        new_source_data (np.ndarray): (N, 3) float32 deformed source vertex coordinates.
+        out (np.ndarray, optional): (P, 3) float32 buffer to write the result into.
+        tmp (np.ndarray, optional): (P, 3) float32 scratch buffer.
+
+    Returns:
+        np.ndarray: (P, 3) float32 deformed target vertex coordinates.
+    """
+    count = len(binding)
+    if out is None:
+        out = np.empty((count, 3), dtype=np.float32)
+    if tmp is None:
+        tmp = np.empty((count, 3), dtype=np.float32)
+
+    np.multiply(binding.normals, binding.offsets[:, None], out=out)
+    for corner in range(3):
+        np.take(new_source_data, binding.vertex_indices[:, corner], axis=0, out=tmp)
+        tmp *= binding.weights[:, corner, None]
+        out += tmp
+    return out
+
+
+def deform_key_block(
+        binding: SurfaceBinding,
+        matrix: BindingMatrix,
+        key_block: np.ndarray
+) -> np.ndarray:
+    """
+    Calculate deformed target coordinates for a block of source shape keys at once.
+
+    Args:
+        binding (SurfaceBinding): Binding data of the target vertices.
+        matrix (BindingMatrix): Sparse matrix of the binding (see SurfaceBinding.to_matrix).
+        key_block (np.ndarray): (K, N, 3) float32 source shape key coordinates.
+
+    Returns:
+        np.ndarray: (P, K, 3) float32 deformed target coordinates.
+    """
+    key_count, vertex_count, _ = key_block.shape
+    columns = key_block.transpose(1, 0, 2).reshape(vertex_count, 3 * key_count)
+    new_co = matrix.dot(columns).reshape(-1, key_count, 3)
+    new_co += (binding.normals * binding.offsets[:, None])[:, None, :]
+    return new_co
+
+
+def deform_key_block_sparse(
+        binding: SurfaceBinding,
+        key_block: np.ndarray,
+        source_basis: np.ndarray,
+        target_basis: np.ndarray,
+        moved_threshold: float = 0.0,
+        dense_ratio: float = 0.5
+) -> tuple:
+    """
+    Calculate deformed target coordinates updating only the target vertices a shape key moves.
+
+    Source vertices displaced from the basis by more than moved_threshold are
+    looked up in the influence index of the binding. Only their dependent target
+    vertices are recalculated, the rest keep the target basis coordinates.
+
+    Args:
+        binding (SurfaceBinding): Binding data of the target vertices.
+        key_block (np.ndarray): (K, N, 3) float32 source shape key coordinates.
+        source_basis (np.ndarray): (N, 3) source basis coordinates.
+        target_basis (np.ndarray): (P, 3) target basis coordinates.
+        moved_threshold (float, optional): Displacement a source vertex needs to count as moved.
+        dense_ratio (float, optional): Share of dependent target vertices above which
+            all the target vertices are recalculated.
+
+    Returns:
+        tuple: (P, K, 3) float32 deformed target coordinates and (K,) bool array of
+            the keys that move any target vertex.
+    """
+    key_count, vertex_count, _ = key_block.shape
+    target_count = len(binding)
+    influence = binding.influence(vertex_count)
+
+    new_co = np.empty((target_count, key_count, 3), dtype=np.float32)
+    touched = np.zeros(key_count, dtype=bool)
+    delta = np.empty((vertex_count, 3), dtype=np.float32)
+    for k in range(key_count):
+        np.subtract(key_block[k], source_basis, out=delta)
+        moved = np.flatnonzero(dot(delta, delta) > moved_threshold * moved_threshold)
+        rows = influence.dependents(moved) if len(moved) else moved
+        if len(rows) == 0:
+            new_co[:, k] = target_basis
+            continue
+
+        touched[k] = True
+        if len(rows) > dense_ratio * target_count:
+            new_co[:, k] = calc_surface_deform(binding, key_block[k])
+            continue
+
+        vertex_indices = binding.vertex_indices[rows]
+        weights = binding.weights[rows]
+        rows_co = binding.normals[rows] * binding.offsets[rows, None]
+        for corner in range(3):
+            rows_co += key_block[k][vertex_indices[:, corner]] * weights[:, corner, None]
+        new_co[:, k] = target_basis
+        new_co[rows, k] = rows_co
+    return new_co, touched
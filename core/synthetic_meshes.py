@@ -0,0 +1,143 @@
+import numpy as np
+
+
+# Meshes are (co, corner_verts, face_sizes) tuples: (N, 3) float32 vertex
+# coordinates, (L,) int32 vertex index of every face corner and (F,) int32
+# number of corners of every face, the layout of Blender mesh loops.
+
+
+def _faces(*blocks: np.ndarray) -> tuple:
+    corner_verts = np.concatenate([block.ravel() for block in blocks]).astype(np.int32)
+    face_sizes = np.concatenate([np.full(len(block), block.shape[1]) for block in blocks]).astype(np.int32)
+    return corner_verts, face_sizes
+
+
+def _wrapped_quads(rings: int, segments: int) -> np.ndarray:
+    """
+    Quads between consecutive rings of vertices closed around every ring.
+    """
+    r = np.arange(rings - 1)[:, None]
+    s = np.arange(segments)[None, :]
+    a = r * segments + s
+    b = r * segments + (s + 1) % segments
+    return np.stack([a, a + segments, b + segments, b], axis=-1).reshape(-1, 4)
+
+
+def _ring_coordinates(rings: int, segments: int, radius: float, lat_min: float, lat_max: float) -> np.ndarray:
+    """
+    Vertices of rings of a sphere from lat_min to lat_max (polar angles), ring by ring.
+    """
+    theta = np.linspace(lat_min, lat_max, rings)[:, None]
+    phi = np.linspace(0.0, 2.0 * np.pi, segments, endpoint=False)[None, :]
+    return np.stack([
+        (radius * np.sin(theta) * np.cos(phi)).ravel(),
+        (radius * np.sin(theta) * np.sin(phi)).ravel(),
+        np.broadcast_to(radius * np.cos(theta), (rings, segments)).ravel()
+    ], axis=-1)
+
+
+def grid_mesh(vertex_count: int, size: float = 2.0, z: float = 0.0) -> tuple:
+    """
+    Square grid of quads in the XY plane with about vertex_count vertices.
+    """
+    n = max(2, int(round(np.sqrt(vertex_count))))
+    x, y = np.meshgrid(np.linspace(-size / 2, size / 2, n), np.linspace(-size / 2, size / 2, n))
+    co = np.stack([x.ravel(), y.ravel(), np.full(n * n, z)], axis=-1).astype(np.float32)
+
+    r = np.arange(n - 1)[:, None]
+    c = np.arange(n - 1)[None, :]
+    a = r * n + c
+    quads = np.stack([a, a + 1, a + n + 1, a + n], axis=-1).reshape(-1, 4)
+    return (co,) + _faces(quads)
+
+
+def band_mesh(vertex_count: int, radius: float = 1.0, lat_min: float = 0.0, lat_max: float = np.pi) -> tuple:
+    """
+    Open band of a sphere between two latitudes (polar angles), with about vertex_count
+    vertices and roughly square quads.
+    """
+    aspect = 2.0 * np.pi * np.sin((lat_min + lat_max) / 2) / (lat_max - lat_min)
+    rings = max(2, int(round(np.sqrt(vertex_count / aspect))))
+    segments = max(3, int(round(rings * aspect)))
+    co = _ring_coordinates(rings, segments, radius, lat_min, lat_max).astype(np.float32)
+    return (co,) + _faces(_wrapped_quads(rings, segments))
+
+
+def sphere_mesh(vertex_count: int, radius: float = 1.0) -> tuple:
+    """
+    UV sphere with about vertex_count vertices: quads between the rings and triangle fans at the poles.
+    """
+    rings = max(2, int(round(np.sqrt(max(vertex_count - 2, 8) / 2))))
+    segments = 2 * rings
+    step = np.pi / (rings + 1)
+    co = _ring_coordinates(rings, segments, radius, step, np.pi - step)
+    co = np.concatenate([co, [[0.0, 0.0, radius], [0.0, 0.0, -radius]]]).astype(np.float32)
+
+    top, bottom = rings * segments, rings * segments + 1
+    s = np.arange(segments)
+    last = (rings - 1) * segments
+    top_fan = np.stack([np.full(segments, top), s, (s + 1) % segments], axis=-1)
+    bottom_fan = np.stack([np.full(segments, bottom), last + (s + 1) % segments, last + s], axis=-1)
+    return (co,) + _faces(_wrapped_quads(rings, segments), top_fan, bottom_fan)
+
+
+def mesh_pair(shape: str, vertex_count: int) -> tuple:
+    """
+    Source and target meshes of a benchmark case.
+
+    The target has a different resolution and is offset from the source, so
+    no target vertex coincides with a source one (which Surface Deform fails
+    to bind).
+
+    Args:
+        shape (str): 'GRID' (plane over a plane), 'SPHERE' (sphere over a sphere)
+            or 'GARMENT' (band around the middle of a sphere, like a shirt over a body).
+        vertex_count (int): Approximate number of source vertices.
+
+    Returns:
+        tuple: Source and target meshes.
+    """
+    if shape == 'GRID':
+        return grid_mesh(vertex_count), grid_mesh(int(vertex_count * 0.9), size=1.9, z=0.02)
+    if shape == 'SPHERE':
+        return sphere_mesh(vertex_count), sphere_mesh(int(vertex_count * 0.9), radius=1.02)
+    if shape == 'GARMENT':
+        return sphere_mesh(vertex_count), band_mesh(int(vertex_count * 0.5), 1.03, 0.35 * np.pi, 0.75 * np.pi)
+    raise ValueError(f'Unknown benchmark mesh shape {shape}')
+
+
+def sparse_shape_keys(
+        co: np.ndarray,
+        count: int,
+        seed: int = 0,
+        fraction: float = 0.05,
+        amplitude: float = 0.05
+):
+    """
+    Generate random sparse shape keys.
+
+    Every key moves the fraction of the vertices nearest to a random vertex
+    in a random direction, with a smooth falloff towards the border of the
+    region. Keys are yielded one by one, so a thousand keys of a large mesh
+    are never held in memory at once.
+
+    Args:
+        co (np.ndarray): (N, 3) basis coordinates.
+        count (int): Number of keys.
+        seed (int, optional): Seed of the random generator, the same seed gives the same keys.
+        fraction (float, optional): Fraction of the vertices every key moves. Defaults to 0.05.
+        amplitude (float, optional): Maximum displacement. Defaults to 0.05.
+
+    Yields:
+        np.ndarray: (N, 3) float32 coordinates of a key.
+    """
+    rng = np.random.default_rng(seed)
+    moved = max(1, min(len(co) - 1, int(len(co) * fraction)))
+    for _ in range(count):
+        center = co[rng.integers(len(co))]
+        direction = rng.normal(size=3)
+        direction *= amplitude / np.linalg.norm(direction)
+        dist = np.sqrt(((co - center) ** 2).sum(axis=1))
+        radius = max(np.partition(dist, moved)[moved], 1e-6)
+        weight = np.clip(1.0 - dist / radius, 0.0, None) ** 2
+        yield (co + weight[:, None] * direction).astype(np.float32)
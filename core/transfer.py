@@ -0,0 +1,136 @@
+import numpy as np
+from .triangle_index import TriangleGrid
+from .parallel_bind import bind_points_parallel, CHUNK_SIZE
+from .empty_keys import empty_key_mask
+from .surface_binding import (
+    SurfaceBinding,
+    BindingMatrix,
+    triangle_normals,
+    compute_binding,
+    deform_key_block,
+    deform_key_block_sparse
+)
+
+
+def bind_points(
+        verts: np.ndarray,
+        tris: np.ndarray,
+        points: np.ndarray,
+        normals: np.ndarray | None = None,
+        grid: TriangleGrid | None = None,
+        workers: int = 1
+) -> SurfaceBinding:
+    """
+    Bind points to the nearest source triangles found with a TriangleGrid.
+
+    Args:
+        verts (np.ndarray): (N, 3) source vertex coordinates.
+        tris (np.ndarray): (M, 3) source triangle vertex indices.
+        points (np.ndarray): (P, 3) points to bind.
+        normals (np.ndarray, optional): (M, 3) source triangle normals. Calculated if not given.
+        grid (TriangleGrid, optional): Spatial index of the source triangles. Built if not given.
+        workers (int, optional): Number of worker processes binding large point sets. Defaults to 1.
+
+    Returns:
+        SurfaceBinding: Binding of the points with their rest coordinates.
+    """
+    if normals is None:
+        normals = triangle_normals(verts, tris)
+    if grid is None:
+        grid = TriangleGrid.build(verts, tris)
+    if workers > 1 and len(points) > CHUNK_SIZE:
+        binding = bind_points_parallel(grid, normals, points, workers=workers)
+    else:
+        tri_indices, _, _ = grid.find_nearest(points)
+        binding = compute_binding(verts, tris, points, tri_indices, normals=normals)
+    binding.rest_co = points
+    return binding
+
+
+def deform_block(
+        binding: SurfaceBinding,
+        key_block: np.ndarray,
+        matrix: BindingMatrix | None = None,
+        source_basis: np.ndarray | None = None,
+        target_basis: np.ndarray | None = None,
+        sparse: bool = False
+) -> tuple:
+    """
+    Deform a block of source shape keys into the bound target.
+
+    Args:
+        binding (SurfaceBinding): Binding of the target vertices.
+        key_block (np.ndarray): (K, N, 3) float32 source shape key coordinates.
+        matrix (BindingMatrix, optional): Sparse matrix of the binding. Built if not given.
+        source_basis (np.ndarray, optional): (N, 3) source basis coordinates, needed by sparse.
+        target_basis (np.ndarray, optional): (P, 3) target basis coordinates, needed by sparse.
+        sparse (bool, optional): Recalculate only the target vertices each key moves
+            (see deform_key_block_sparse). Defaults to False.
+
+    Returns:
+        tuple: (P, K, 3) float32 deformed target coordinates and (K,) bool array of the
+            keys that move any target vertex (None unless sparse).
+    """
+    if sparse:
+        return deform_key_block_sparse(binding, key_block, source_basis, target_basis)
+    if matrix is None:
+        matrix = binding.to_matrix(key_block.shape[1])
+    return deform_key_block(binding, matrix, key_block), None
+
+
+def transfer_key_coordinates(
+        source_verts: np.ndarray,
+        source_tris: np.ndarray,
+        target_co: np.ndarray,
+        key_co: np.ndarray,
+        binding: SurfaceBinding | None = None,
+        key_block_size: int = 32,
+        empty_threshold: float | None = None,
+        sparse: bool = False,
+        workers: int = 1
+) -> tuple:
+    """
+    Transfer shape keys between meshes given as arrays.
+
+    The target is bound to the source basis once (unless a binding is given)
+    and the keys are deformed in blocks of key_block_size.
+
+    Args:
+        source_verts (np.ndarray): (N, 3) source basis coordinates.
+        source_tris (np.ndarray): (M, 3) source triangle vertex indices.
+        target_co (np.ndarray): (P, 3) target basis coordinates.
+        key_co (np.ndarray): (K, N, 3) source shape key coordinates.
+        binding (SurfaceBinding, optional): Binding of the target to reuse.
+        key_block_size (int, optional): Number of keys deformed at once. Defaults to 32.
+        empty_threshold (float, optional): Keys that do not move any target vertex beyond
+            this threshold are reported as empty. Defaults to None.
+        sparse (bool, optional): See deform_block. Keys that move no bound source vertex
+            are reported as empty, with or without empty_threshold. Defaults to False.
+        workers (int, optional): Number of worker processes binding the target. Defaults to 1.
+
+    Returns:
+        tuple: (K, P, 3) float32 target shape key coordinates and (K,) bool array of
+            the empty keys (None without empty_threshold and sparse).
+    """
+    source_verts = np.ascontiguousarray(source_verts, dtype=np.float32)
+    target_co = np.ascontiguousarray(target_co, dtype=np.float32)
+    if binding is None:
+        binding = bind_points(source_verts, np.asarray(source_tris, dtype=np.int32), target_co, workers=workers)
+    matrix = None if sparse else binding.to_matrix(len(source_verts))
+
+    key_count = len(key_co)
+    out = np.empty((key_count, len(target_co), 3), dtype=np.float32)
+    empty = np.zeros(key_count, dtype=bool) if empty_threshold is not None or sparse else None
+    key_block_size = max(1, key_block_size)
+    for start in range(0, key_count, key_block_size):
+        key_block = np.asarray(key_co[start:start + key_block_size], dtype=np.float32)
+        co, touched = deform_block(
+            binding, key_block, matrix=matrix,
+            source_basis=source_verts, target_basis=target_co, sparse=sparse
+        )
+        out[start:start + len(key_block)] = co.transpose(1, 0, 2)
+        if empty_threshold is not None:
+            empty[start:start + len(key_block)] = empty_key_mask(co, target_co, empty_threshold, touched=touched)
+        elif empty is not None:
+            empty[start:start + len(key_block)] = ~touched
+    return out, empty
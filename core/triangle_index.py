@@ -0,0 +1,348 @@
+import numpy as np
+
+
+def dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Row-wise dot product of two (N, 3) arrays.
+    """
+    # Written out (instead of einsum) so results do not depend on the batch size
+    return a[:, 0] * b[:, 0] + a[:, 1] * b[:, 1] + a[:, 2] * b[:, 2]
+
+
+def _safe_ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    # Degenerate triangles give zero denominators, the ratio falls back to zero
+    valid = denominator != 0.0
+    return np.where(valid, numerator / np.where(valid, denominator, 1.0), 0.0)
+
+
+def _closest_points_on_segments(points: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    ab = b - a
+    t = np.clip(_safe_ratio(dot(points - a, ab), dot(ab, ab)), 0.0, 1.0)
+    return a + ab * t[:, None]
+
+
+def closest_points_on_triangles(
+        points: np.ndarray,
+        a: np.ndarray,
+        b: np.ndarray,
+        c: np.ndarray
+) -> np.ndarray:
+    """
+    Calculate the closest point on each triangle (a, b, c) to the matching point.
+
+    Vectorized version of the Voronoi region test from "Real-Time Collision Detection" (C. Ericson).
+
+    Args:
+        points (np.ndarray): (N, 3) query points.
+        a, b, c (np.ndarray): (N, 3) triangle corners.
+
+    Returns:
+        np.ndarray: (N, 3) closest points.
+    """
+    ab = b - a
+    ac = c - a
+    ap = points - a
+    d1 = dot(ab, ap)
+    d2 = dot(ac, ap)
+
+    bp = points - b
+    d3 = dot(ab, bp)
+    d4 = dot(ac, bp)
+
+    cp = points - c
+    d5 = dot(ab, cp)
+    d6 = dot(ac, cp)
+
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+
+    # Inside the face
+    denom = va + vb + vc
+    v = _safe_ratio(vb, denom)
+    w = _safe_ratio(vc, denom)
+    result = a + ab * v[:, None] + ac * w[:, None]
+
+    # Regions are applied from the lowest to the highest priority
+    d43 = d4 - d3
+    d56 = d5 - d6
+    region = (va <= 0.0) & (d43 >= 0.0) & (d56 >= 0.0)
+    t = _safe_ratio(d43, d43 + d56)
+    result = np.where(region[:, None], b + (c - b) * t[:, None], result)
+
+    region = (vb <= 0.0) & (d2 >= 0.0) & (d6 <= 0.0)
+    t = _safe_ratio(d2, d2 - d6)
+    result = np.where(region[:, None], a + ac * t[:, None], result)
+
+    region = (d6 >= 0.0) & (d5 <= d6)
+    result = np.where(region[:, None], c, result)
+
+    region = (vc <= 0.0) & (d1 >= 0.0) & (d3 <= 0.0)
+    t = _safe_ratio(d1, d1 - d3)
+    result = np.where(region[:, None], a + ab * t[:, None], result)
+
+    region = (d3 >= 0.0) & (d4 <= d3)
+    result = np.where(region[:, None], b, result)
+
+    region = (d1 <= 0.0) & (d2 <= 0.0)
+    result = np.where(region[:, None], a, result)
+
+    # The region test assumes non-degenerate triangles, zero-area ones are treated as three segments
+    normal = np.cross(ab, ac)
+    degenerate = dot(normal, normal) <= 1e-12 * dot(ab, ab) * dot(ac, ac)
+    if np.any(degenerate):
+        pts = points[degenerate]
+        best = None
+        best_d2 = None
+        for start, end in ((a, b), (a, c), (b, c)):
+            co = _closest_points_on_segments(pts, start[degenerate], end[degenerate])
+            diff = pts - co
+            d2 = dot(diff, diff)
+            if best is None:
+                best, best_d2 = co, d2
+            else:
+                closer = d2 < best_d2
+                best = np.where(closer[:, None], co, best)
+                best_d2 = np.where(closer, d2, best_d2)
+        result[degenerate] = best
+
+    return result
+
+
+def _shell_offsets(radius: int) -> np.ndarray:
+    """
+    Cell offsets at exactly the given Chebyshev distance.
+    """
+    if radius == 0:
+        return np.zeros((1, 3), dtype=np.int64)
+    r = np.arange(-radius, radius + 1)
+    offsets = np.stack(np.meshgrid(r, r, r, indexing='ij'), axis=-1).reshape(-1, 3)
+    return offsets[np.abs(offsets).max(axis=1) == radius]
+
+
+class TriangleGrid:
+    """
+    Sparse uniform grid over triangle bounding boxes answering batched nearest-triangle queries.
+
+    Pure NumPy replacement of mathutils.bvhtree.BVHTree.find_nearest, usable
+    outside Blender and in worker processes. Each triangle is registered in
+    all the cells its bounding box overlaps. Only occupied cells are stored:
+    cell_ids holds their sorted linear ids and cell_start/cell_tris list their
+    triangles in CSR layout.
+    """
+    # Shells searched ring by ring before falling back to testing all triangles
+    MAX_RADIUS = 8
+
+    def __init__(
+            self,
+            verts: np.ndarray,
+            tris: np.ndarray,
+            origin: np.ndarray,
+            cell_size: float,
+            dims: np.ndarray,
+            cell_ids: np.ndarray,
+            cell_start: np.ndarray,
+            cell_tris: np.ndarray
+    ) -> None:
+        self.verts = verts
+        self.tris = tris
+        self.origin = origin
+        self.cell_size = float(cell_size)
+        self.dims = dims
+        self.cell_ids = cell_ids
+        self.cell_start = cell_start
+        self.cell_tris = cell_tris
+
+        corners = verts[tris]
+        self.tri_lo = corners.min(axis=1).astype(np.float64)
+        self.tri_hi = corners.max(axis=1).astype(np.float64)
+
+    @classmethod
+    def build(cls, verts: np.ndarray, tris: np.ndarray, cell_size: float | None = None) -> 'TriangleGrid':
+        """
+        Build the grid. The cell size defaults to the mean triangle bounding box size.
+        """
+        if len(tris) == 0:
+            raise ValueError('Unable to build a spatial index without triangles')
+
+        corners = verts[tris].astype(np.float64)
+        lo = corners.min(axis=1)
+        hi = corners.max(axis=1)
+        origin = lo.min(axis=0)
+        extent = hi.max(axis=0) - origin
+
+        if cell_size is None:
+            cell_size = float((hi - lo).max(axis=1).mean())
+        if cell_size <= 0.0:
+            cell_size = float(extent.max()) or 1.0
+        # Keep linear cell ids within int64
+        cell_size = max(cell_size, float(extent.max()) / 2 ** 20)
+        dims = np.maximum(1, np.ceil(extent / cell_size).astype(np.int64))
+
+        cell_lo = np.clip(((lo - origin) / cell_size).astype(np.int64), 0, dims - 1)
+        cell_hi = np.clip(((hi - origin) / cell_size).astype(np.int64), 0, dims - 1)
+        sizes = cell_hi - cell_lo + 1
+        counts = sizes.prod(axis=1)
+
+        # Enumerate every (triangle, cell) pair of the triangle bounding boxes
+        tri_ids = np.repeat(np.arange(len(tris), dtype=np.int64), counts)
+        local = np.arange(counts.sum(), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+        sizes = sizes[tri_ids]
+        ix = local % sizes[:, 0]
+        iy = (local // sizes[:, 0]) % sizes[:, 1]
+        iz = local // (sizes[:, 0] * sizes[:, 1])
+        cells = cell_lo[tri_ids] + np.stack((ix, iy, iz), axis=1)
+        pair_cells = (cells[:, 2] * dims[1] + cells[:, 1]) * dims[0] + cells[:, 0]
+
+        order = np.argsort(pair_cells, kind='stable')
+        cell_ids, cell_counts = np.unique(pair_cells[order], return_counts=True)
+        cell_start = np.zeros(len(cell_ids) + 1, dtype=np.int64)
+        np.cumsum(cell_counts, out=cell_start[1:])
+        cell_tris = tri_ids[order].astype(np.int32)
+
+        return cls(verts, tris, origin, cell_size, dims, cell_ids, cell_start, cell_tris)
+
+    @property
+    def nbytes(self) -> int:
+        return self.cell_ids.nbytes + self.cell_start.nbytes + self.cell_tris.nbytes
+
+    def arrays(self) -> dict:
+        return {
+            'verts': self.verts,
+            'tris': self.tris,
+            'origin': self.origin,
+            'cell_size': np.array(self.cell_size),
+            'dims': self.dims,
+            'cell_ids': self.cell_ids,
+            'cell_start': self.cell_start,
+            'cell_tris': self.cell_tris
+        }
+
+    def find_nearest(self, points: np.ndarray, chunk_size: int = 4096) -> tuple:
+        """
+        Find the nearest triangle of each point.
+
+        Results of a point do not depend on the other points or the chunk size.
+
+        Args:
+            points (np.ndarray): (N, 3) query points.
+            chunk_size (int, optional): Number of points processed at once.
+
+        Returns:
+            tuple: (N,) int32 triangle indices, (N, 3) closest points and (N,) distances.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        tri_indices = np.empty(len(points), dtype=np.int32)
+        closest = np.empty((len(points), 3), dtype=np.float64)
+        distances = np.empty(len(points), dtype=np.float64)
+        for start in range(0, len(points), chunk_size):
+            chunk = slice(start, start + chunk_size)
+            tri_indices[chunk], closest[chunk], distances[chunk] = self._find_nearest_chunk(points[chunk])
+        return tri_indices, closest, distances
+
+    def _update_best(
+            self,
+            points: np.ndarray,
+            cand_points: np.ndarray,
+            cand_tris: np.ndarray,
+            best_d2: np.ndarray,
+            best_tri: np.ndarray,
+            best_co: np.ndarray
+    ) -> None:
+        if len(cand_tris) == 0:
+            return
+        # Skip triangles whose bounding box is farther than the nearest triangle found so far
+        pts = points[cand_points]
+        outside = np.maximum(np.maximum(self.tri_lo[cand_tris] - pts, pts - self.tri_hi[cand_tris]), 0.0)
+        near = dot(outside, outside) <= best_d2[cand_points]
+        if not np.all(near):
+            cand_points = cand_points[near]
+            cand_tris = cand_tris[near]
+        if len(cand_tris) == 0:
+            return
+
+        # Triangles registered in several cells of the shell are tested once
+        keys = np.unique(cand_points * len(self.tris) + cand_tris)
+        cand_points = keys // len(self.tris)
+        cand_tris = keys % len(self.tris)
+        pts = points[cand_points]
+
+        corners = self.verts[self.tris[cand_tris]].astype(np.float64)
+        co = closest_points_on_triangles(pts, corners[:, 0], corners[:, 1], corners[:, 2])
+        diff = pts - co
+        d2 = dot(diff, diff)
+
+        # Nearest candidate per point. Candidates are sorted by point and triangle,
+        # so the first minimum of a group is the one with the lowest triangle index
+        group_starts = np.flatnonzero(np.r_[True, cand_points[1:] != cand_points[:-1]])
+        group_sizes = np.diff(np.r_[group_starts, len(cand_points)])
+        group_min = np.repeat(np.minimum.reduceat(d2, group_starts), group_sizes)
+        winners = np.flatnonzero(d2 == group_min)
+        winners = winners[np.r_[True, cand_points[winners[1:]] != cand_points[winners[:-1]]]]
+        p = cand_points[winners]
+        better = (d2[winners] < best_d2[p]) | ((d2[winners] == best_d2[p]) & (cand_tris[winners] < best_tri[p]))
+        p = p[better]
+        winners = winners[better]
+        best_d2[p] = d2[winners]
+        best_tri[p] = cand_tris[winners]
+        best_co[p] = co[winners]
+
+    def _find_nearest_chunk(self, points: np.ndarray) -> tuple:
+        count = len(points)
+        best_d2 = np.full(count, np.inf)
+        best_tri = np.full(count, -1, dtype=np.int64)
+        best_co = np.zeros((count, 3))
+
+        local = (points - self.origin) / self.cell_size
+        home = np.clip(np.floor(local).astype(np.int64), 0, self.dims - 1)
+        # Distance from the point to the walls of its cell (zero outside the grid)
+        frac = local - home
+        gap = np.clip(np.minimum(frac, 1.0 - frac).min(axis=1), 0.0, None) * self.cell_size
+
+        active = np.arange(count)
+        radius = 0
+        while len(active) and radius <= self.MAX_RADIUS:
+            offsets = _shell_offsets(radius)
+            cells = home[active][:, None, :] + offsets[None, :, :]
+            valid = np.all((cells >= 0) & (cells < self.dims), axis=2)
+
+            # Skip cells farther than the nearest triangle found so far
+            lo = cells * self.cell_size + self.origin
+            pts = points[active][:, None, :]
+            outside = np.maximum(np.maximum(lo - pts, pts - lo - self.cell_size), 0.0)
+            valid &= (outside * outside).sum(axis=2) <= best_d2[active][:, None]
+
+            pair_points = np.broadcast_to(active[:, None], valid.shape)[valid]
+            cells = cells[valid]
+            linear = (cells[:, 2] * self.dims[1] + cells[:, 1]) * self.dims[0] + cells[:, 0]
+            slots = np.searchsorted(self.cell_ids, linear)
+            slots = np.minimum(slots, len(self.cell_ids) - 1)
+            occupied = self.cell_ids[slots] == linear
+            pair_points = pair_points[occupied]
+            slots = slots[occupied]
+
+            # Expand (point, cell) pairs into (point, triangle) candidates
+            starts = self.cell_start[slots]
+            counts = self.cell_start[slots + 1] - starts
+            cand_points = np.repeat(pair_points, counts)
+            positions = np.arange(counts.sum(), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+            cand_tris = self.cell_tris[np.repeat(starts, counts) + positions].astype(np.int64)
+            self._update_best(points, cand_points, cand_tris, best_d2, best_tri, best_co)
+
+            # Cells beyond the shell are farther than this bound from the point
+            bound = radius * self.cell_size + gap[active]
+            done = best_d2[active] <= bound * bound
+            active = active[~done]
+            radius += 1
+
+        if len(active):
+            # Points far from the mesh are tested against all the triangles
+            tri_count = len(self.tris)
+            step = max(1, 1000000 // tri_count)
+            for start in range(0, len(active), step):
+                chunk = active[start:start + step]
+                cand_points = np.repeat(chunk, tri_count)
+                cand_tris = np.tile(np.arange(tri_count, dtype=np.int64), len(chunk))
+                self._update_best(points, cand_points, cand_tris, best_d2, best_tri, best_co)
+
+        return best_tri.astype(np.int32), best_co, np.sqrt(best_d2)
@@ -0,0 +1,281 @@
+"""
+Parallel transfer in a pool of background Blender processes.
+
+The live scene is saved to a temporary copy, the transfer is split into jobs
+(one per target, optionally split further into blocks of shape keys) and every
+job runs in its own `blender -b` process against the copy. A worker writes the
+coordinates of the shape keys it transferred into an array exchange file
+(.npz) which the dispatcher writes back into the live objects with foreach_set.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+import traceback
+import numpy as np
+import bpy
+from typing import List
+from .cli import JOB_DEFAULTS, transfer_job
+from .functions.bind_drivers import shape_key_add_binding_driver
+
+
+# Number of stderr lines of a failed worker kept in the report
+ERROR_TAIL_LINES = 20
+
+
+class FarmError(Exception):
+    pass
+
+
+class FarmJob:
+    """
+    One worker job: a single target and an optional subset of the source shape keys.
+    """
+    def __init__(self, index: int, target: str, shape_keys: List[str] | None, directory: str) -> None:
+        self.index = index
+        self.target = target
+        self.shape_keys = shape_keys
+        self.job_path = os.path.join(directory, f'job_{index}.json')
+        self.exchange_path = os.path.join(directory, f'job_{index}.npz')
+        self.log_path = os.path.join(directory, f'job_{index}.log')
+        self.attempts = 0
+        self.seconds = 0.0
+        self.error = None
+
+
+def worker_command(blend_path: str, job_path: str, exchange_path: str) -> list:
+    """
+    Command line of a background Blender worker running one job.
+    """
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    # The add-on is imported as a plain package from its folder, user add-ons are not loaded.
+    # The folder name need not be an identifier (e.g. ShapeKeyWrap-main from a GitHub zip)
+    expr = (
+        'import sys, importlib; '
+        f'sys.path.insert(0, {os.path.dirname(package_dir)!r}); '
+        f"sys.exit(importlib.import_module({os.path.basename(package_dir) + '.farm'!r}).worker_main())"
+    )
+    return [
+        bpy.app.binary_path, '-b', '--factory-startup', blend_path,
+        '--python-expr', expr,
+        '--', job_path, exchange_path
+    ]
+
+
+def worker_main(argv: list | None = None) -> int:
+    """
+    Entry point of a worker: run the job and write the transferred shape keys into the exchange file.
+    """
+    if argv is None:
+        argv = sys.argv[sys.argv.index('--') + 1:]
+    job_path, exchange_path = argv
+    try:
+        with open(job_path, 'r', encoding='utf-8') as f:
+            job = {**JOB_DEFAULTS, **json.load(f)}
+        created_sks, skipped_sks, _ = transfer_job(bpy.context, job)
+
+        tgt_obj = bpy.data.objects[job['targets'][0]]
+        names = created_sks[tgt_obj.name]
+        co = np.empty((len(names), len(tgt_obj.data.vertices), 3), dtype=np.float32)
+        key_blocks = tgt_obj.data.shape_keys.key_blocks if names else None
+        for i, name in enumerate(names):
+            key_blocks[name].data.foreach_get('co', co[i].ravel())
+        np.savez(
+            exchange_path,
+            names=np.array(names, dtype=str),
+            skipped=np.array(skipped_sks.get(tgt_obj.name, []), dtype=str),
+            co=co
+        )
+    except Exception:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def merge_job_result(
+        tgt_obj: bpy.types.Object,
+        src_obj: bpy.types.Object,
+        exchange_path: str,
+        overwrite_shape_keys: bool,
+        create_drivers: bool,
+        created_sks: List[str],
+        skipped_sks: List[str]
+) -> None:
+    """
+    Write the shape keys of a worker exchange file into the live target object.
+    """
+    with np.load(exchange_path) as exchange:
+        names = exchange['names'].tolist()
+        skipped = exchange['skipped'].tolist()
+        co = exchange['co']
+    if co.shape[1:] != (len(tgt_obj.data.vertices), 3):
+        raise FarmError(f'{tgt_obj.name}: worker result has {co.shape[1]} vertices, expected {len(tgt_obj.data.vertices)}')
+
+    for sk_name in skipped:
+        # Empty keys are not created (the existing key would be overwritten with an empty one)
+        target_sks = tgt_obj.data.shape_keys
+        tgt_sk = target_sks.key_blocks.get(sk_name) if target_sks is not None else None
+        if overwrite_shape_keys and tgt_sk is not None:
+            tgt_obj.shape_key_remove(tgt_sk)
+        skipped_sks.append(sk_name)
+
+    for sk_name, sk_co in zip(names, co):
+        target_sks = tgt_obj.data.shape_keys
+        if target_sks is None:
+            tgt_obj.shape_key_add(name='Basis', from_mix=False)
+            target_sks = tgt_obj.data.shape_keys
+        tgt_sk = target_sks.key_blocks.get(sk_name) if overwrite_shape_keys else None
+        if tgt_sk is None:
+            tgt_sk = tgt_obj.shape_key_add(name=sk_name, from_mix=False)
+        tgt_sk.data.foreach_set('co', sk_co.ravel())
+        if create_drivers:
+            shape_key_add_binding_driver(sk=tgt_sk, src_obj=src_obj, src_sk_name=sk_name)
+        created_sks.append(tgt_sk.name)
+
+
+def transfer_shape_keys_farm(
+        context: bpy.types.Context,
+        src_obj: bpy.types.Object,
+        tgt_objs: List[bpy.types.Object],
+        job_settings: dict,
+        shape_keys: List[str] | None = None,
+        overwrite_shape_keys: bool = False,
+        create_drivers: bool = False,
+        workers: int = 2,
+        keys_per_job: int = 0,
+        retries: int = 1,
+        timeout: float | None = None,
+        skipped_sks: dict | None = None,
+        report: list | None = None
+) -> dict:
+    """
+    Transfer shape keys to the targets in a pool of background Blender workers.
+
+    Args:
+        context (bpy.types.Context): The current context in Blender.
+        src_obj (bpy.types.Object): Object to transfer the shape keys from.
+        tgt_objs (List[bpy.types.Object]): Objects to transfer the shape keys to.
+        job_settings (dict): Method parameters of the jobs (see cli.JOB_DEFAULTS).
+        shape_keys (List[str], optional): Names of the shape keys to transfer. Defaults to all of them.
+        overwrite_shape_keys (bool, optional): Write into existing target shape keys with the same names.
+        create_drivers (bool, optional): Bind target shape key values to the source ones.
+        workers (int, optional): Number of worker processes running at once. Defaults to 2.
+        keys_per_job (int, optional): Split the shape keys of a target into jobs of this size (0 to not split).
+        retries (int, optional): Number of times a failed job is restarted. Defaults to 1.
+        timeout (float, optional): Seconds after which a running job is killed and counts as failed.
+        skipped_sks (dict, optional): Filled with the names of the skipped empty shape keys by target object name.
+        report (list, optional): Filled with a dict per job (target, keys, attempts, seconds, error).
+
+    Returns:
+        dict: Names of the created (or overwritten) shape keys by target object name.
+
+    Raises:
+        FarmError: If any job failed after all the retries.
+    """
+    if shape_keys is None:
+        shape_keys = [sk.name for sk in src_obj.data.shape_keys.key_blocks[1:]]
+    directory = tempfile.mkdtemp(prefix='skw_farm_')
+    try:
+        blend_path = os.path.join(directory, 'scene.blend')
+        bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True)
+
+        jobs = list()
+        for tgt_obj in tgt_objs:
+            blocks = [shape_keys]
+            if keys_per_job > 0:
+                blocks = [shape_keys[i:i + keys_per_job] for i in range(0, len(shape_keys), keys_per_job)]
+            for block in blocks:
+                if not block:
+                    continue
+                job = FarmJob(len(jobs), tgt_obj.name, block, directory)
+                with open(job.job_path, 'w', encoding='utf-8') as f:
+                    json.dump({
+                        **job_settings,
+                        'source': src_obj.name,
+                        'targets': [tgt_obj.name],
+                        'shape_keys': block,
+                        # The worker copy gets keys named after the source keys,
+                        # overwriting is applied when merging into the live file
+                        'overwrite': True,
+                        'drivers': False,
+                        'smooth': None
+                    }, f)
+                jobs.append(job)
+
+        run_jobs(jobs, blend_path, workers=workers, retries=retries, timeout=timeout)
+
+        if report is not None:
+            report.extend({
+                'target': job.target,
+                'keys': len(job.shape_keys),
+                'attempts': job.attempts,
+                'seconds': job.seconds,
+                'error': job.error
+            } for job in jobs)
+        failed = [job for job in jobs if job.error is not None]
+        if failed:
+            for job in failed:
+                print(f'Job {job.index} ({job.target}) failed after {job.attempts} attempts:\n{job.error}')
+            raise FarmError(f'{len(failed)} of {len(jobs)} jobs failed (see the system console)')
+
+        # Results are merged in job order to keep the key order of every target
+        created_sks = {obj.name: [] for obj in tgt_objs}
+        if skipped_sks is not None:
+            skipped_sks.update({obj.name: [] for obj in tgt_objs})
+        for job in jobs:
+            tgt_obj = bpy.data.objects[job.target]
+            merge_job_result(
+                tgt_obj, src_obj, job.exchange_path,
+                overwrite_shape_keys=overwrite_shape_keys,
+                create_drivers=create_drivers,
+                created_sks=created_sks[tgt_obj.name],
+                skipped_sks=skipped_sks[tgt_obj.name] if skipped_sks is not None else []
+            )
+        return created_sks
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def run_jobs(jobs: List[FarmJob], blend_path: str, workers: int, retries: int, timeout: float | None) -> None:
+    """
+    Run the jobs in at most `workers` processes at once, restarting failed ones up to `retries` times.
+    """
+    pending = list(reversed(jobs))
+    running = dict()
+    while pending or running:
+        while pending and len(running) < max(1, workers):
+            job = pending.pop()
+            job.attempts += 1
+            log = open(job.log_path, 'w', encoding='utf-8')
+            process = subprocess.Popen(
+                worker_command(blend_path, job.job_path, job.exchange_path),
+                stdout=log, stderr=subprocess.STDOUT
+            )
+            running[job] = (process, log, time.perf_counter())
+
+        time.sleep(0.05)
+        for job, (process, log, start) in list(running.items()):
+            elapsed = time.perf_counter() - start
+            timed_out = False
+            if process.poll() is None:
+                if timeout is None or elapsed < timeout:
+                    continue
+                process.kill()
+                process.wait()
+                timed_out = True
+            log.close()
+            del running[job]
+            job.seconds += elapsed
+
+            if process.returncode == 0 and os.path.exists(job.exchange_path):
+                job.error = None
+                continue
+            with open(job.log_path, 'r', encoding='utf-8', errors='replace') as f:
+                tail = f.read().splitlines()[-ERROR_TAIL_LINES:]
+            reason = 'timed out' if timed_out else f'exit code {process.returncode}'
+            job.error = '\n'.join([reason] + tail)
+            if job.attempts <= retries:
+                pending.append(job)
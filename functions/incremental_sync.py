@@ -0,0 +1,103 @@
+import bpy
+import numpy as np
+from typing import List
+from ..core.binding_cache import binding_cache_key
+from .surface_deform import read_basis_coordinates
+
+
+# Target object property with the state of the last successful transfer
+SYNC_PROP = 'skw_sync'
+
+
+def shape_key_hashes(obj: bpy.types.Object, shape_keys: List[str] | None = None) -> dict:
+    """
+    Hash the coordinates of the shape keys of an object.
+
+    Every key is read with foreach_get into one reused buffer and hashed as a whole.
+
+    Returns:
+        dict: Content hash by shape key name (the basis key included).
+    """
+    co = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+    hashes = dict()
+    for index, sk in enumerate(obj.data.shape_keys.key_blocks):
+        if index > 0 and shape_keys is not None and sk.name not in shape_keys:
+            continue
+        sk.data.foreach_get('co', co)
+        hashes[sk.name] = binding_cache_key(co, relative_key=sk.relative_key.name)
+    return hashes
+
+
+def sync_context_hash(src_obj: bpy.types.Object, tgt_obj: bpy.types.Object, src_hashes: dict, **settings) -> str:
+    """
+    Hash everything that invalidates all the transferred keys of a target at once:
+    the source object and basis, the target basis and the transfer settings.
+
+    The target basis is read from the basis shape key (the coordinates the
+    transfer binds to), not from the mesh vertices.
+    """
+    basis_name = src_obj.data.shape_keys.key_blocks[0].name
+    co = read_basis_coordinates(tgt_obj.data)
+    return binding_cache_key(co, source=src_obj.name, source_basis=src_hashes[basis_name], **settings)
+
+
+def find_changed_shape_keys(
+        src_obj: bpy.types.Object,
+        tgt_obj: bpy.types.Object,
+        src_hashes: dict,
+        context_hash: str
+) -> List[str]:
+    """
+    Find the source shape keys that are new or changed since the last transfer to the target.
+
+    All the keys are returned if the target has not been synced yet or the
+    context hash differs. Synced keys missing on the target are returned as
+    well, unless they were skipped as empty.
+    """
+    sk_names = [sk.name for sk in src_obj.data.shape_keys.key_blocks[1:] if sk.name in src_hashes]
+    state = tgt_obj.get(SYNC_PROP)
+    if state is None or state.get('context') != context_hash:
+        return sk_names
+
+    synced = dict(state.get('keys', {}).items())
+    empty = dict(state.get('empty', {}).items())
+    target_sks = tgt_obj.data.shape_keys
+    existing = set(target_sks.key_blocks.keys()) if target_sks is not None else set()
+    return [
+        sk_name for sk_name in sk_names
+        if not (
+            (synced.get(sk_name) == src_hashes[sk_name] and sk_name in existing)
+            or empty.get(sk_name) == src_hashes[sk_name]
+        )
+    ]
+
+
+def record_synced_shape_keys(
+        tgt_obj: bpy.types.Object,
+        src_hashes: dict,
+        synced_sks: List[str],
+        skipped_sks: List[str],
+        context_hash: str
+) -> None:
+    """
+    Store the hashes of the transferred (or skipped as empty) shape keys on the target.
+    """
+    state = tgt_obj.get(SYNC_PROP)
+    if state is None or state.get('context') != context_hash:
+        synced, empty = dict(), dict()
+    else:
+        synced = dict(state.get('keys', {}).items())
+        empty = dict(state.get('empty', {}).items())
+
+    for sk_name in synced_sks:
+        synced[sk_name] = src_hashes[sk_name]
+        empty.pop(sk_name, None)
+    for sk_name in skipped_sks:
+        empty[sk_name] = src_hashes[sk_name]
+        synced.pop(sk_name, None)
+
+    tgt_obj[SYNC_PROP] = {
+        'context': context_hash,
+        'keys': synced,
+        'empty': empty
+    }
@@ -0,0 +1,201 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import List
+
+
+class StageStats:
+    """
+    Accumulated statistics of one stage: calls, wall time, processed items
+    (shape keys, vertices...) and the peak of memory traced while it ran.
+    """
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0.0
+        self.items = 0
+        self.peak_bytes = 0
+
+    def to_dict(self) -> dict:
+        return {
+            'calls': self.calls,
+            'seconds': self.seconds,
+            'items': self.items,
+            'seconds_per_item': self.seconds / self.items if self.items else None,
+            'peak_bytes': self.peak_bytes
+        }
+
+
+class Profiler:
+    """
+    Stage profiler of one operator run.
+
+    Stages nest, a stage is recorded under the path of the stages it runs in
+    (e.g. 'transfer/bind'). With trace_memory, tracemalloc runs during the
+    session and every stage records the peak of traced memory above the
+    memory traced when it started. Stages are entered on the main thread only,
+    work done in threads is added with record().
+    """
+    def __init__(self, name: str, trace_memory: bool = False) -> None:
+        self.name = name
+        self.trace_memory = trace_memory
+        self.stages = dict()
+        # [path, traced bytes at the start, peak of the finished child stages]
+        self._stack = []
+        self._started_tracing = False
+        self._start = None
+        self.seconds = 0.0
+        self.peak_bytes = 0
+
+    def start(self) -> None:
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+
+    def stop(self) -> None:
+        self.seconds = time.perf_counter() - self._start
+        if self.trace_memory:
+            self.peak_bytes = max(self.peak_bytes, tracemalloc.get_traced_memory()[1])
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def _path(self, name: str) -> str:
+        return f'{self._stack[-1][0]}/{name}' if self._stack else name
+
+    def _stats(self, path: str) -> StageStats:
+        stats = self.stages.get(path)
+        if stats is None:
+            stats = self.stages[path] = StageStats()
+        return stats
+
+    @contextmanager
+    def stage(self, name: str, items: int = 0):
+        path = self._path(name)
+        # Stats are created on entry so stages are reported in the order they started
+        stats = self._stats(path)
+        frame = [path, 0, 0]
+        if self.trace_memory:
+            frame[1] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self._stack.pop()
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.items += items
+            if self.trace_memory:
+                # Child stages reset the peak, their peaks are carried up the stack
+                peak = max(tracemalloc.get_traced_memory()[1], frame[2])
+                stats.peak_bytes = max(stats.peak_bytes, peak - frame[1])
+                self.peak_bytes = max(self.peak_bytes, peak)
+                if self._stack:
+                    self._stack[-1][2] = max(self._stack[-1][2], peak)
+
+    def record(self, name: str, seconds: float, items: int = 0, calls: int = 1) -> None:
+        """
+        Add time measured elsewhere (e.g. in worker threads) to a stage of the current one.
+        """
+        stats = self._stats(self._path(name))
+        stats.calls += calls
+        stats.seconds += seconds
+        stats.items += items
+
+    def report(self) -> dict:
+        return {
+            'name': self.name,
+            'seconds': self.seconds,
+            'peak_bytes': self.peak_bytes if self.trace_memory else None,
+            'stages': {path: stats.to_dict() for path, stats in self.stages.items()}
+        }
+
+
+def format_report(report: dict) -> List[str]:
+    """
+    Format a profiler report as text lines, one per stage, indented by nesting.
+    """
+    memory = report['peak_bytes'] is not None
+    lines = [f"{report['name']}: {report['seconds']:.3f} s" + (
+        f", peak {report['peak_bytes'] / (1024 * 1024):.1f} MB" if memory else ''
+    )]
+    for path, stats in report['stages'].items():
+        name = path.rsplit('/', 1)[-1]
+        line = f"{'  ' * (path.count('/') + 1)}{name}: {stats['seconds']:.3f} s, {stats['calls']} calls"
+        if stats['items']:
+            line += f", {stats['seconds_per_item'] * 1000:.2f} ms/item ({stats['items']})"
+        if memory:
+            line += f", peak {stats['peak_bytes'] / (1024 * 1024):.1f} MB"
+        lines.append(line)
+    return lines
+
+
+# Profiler of the running session, stages outside of a session are not recorded
+_active_profiler = None
+# Report of the last finished session (shown in the panel)
+last_report = None
+
+
+@contextmanager
+def profile_session(name: str, trace_memory: bool = False, filepath: str | None = None, echo: bool = True):
+    """
+    Profile the stages run inside the block.
+
+    The report is kept in last_report, printed to the console (unless echo is
+    off) and written as JSON to filepath if given (a failed write only prints
+    a warning). A session started inside another one is part of the outer one
+    (the block runs as a stage).
+
+    Args:
+        name (str): Name of the session (e.g. the operator).
+        trace_memory (bool, optional): Trace memory peaks with tracemalloc (slows Python allocations).
+        filepath (str, optional): JSON file to write the report to.
+        echo (bool, optional): Print the report to the console. Defaults to True.
+    """
+    global _active_profiler, last_report
+    if _active_profiler is not None:
+        with _active_profiler.stage(name):
+            yield _active_profiler
+        return
+
+    profiler = Profiler(name, trace_memory=trace_memory)
+    _active_profiler = profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _active_profiler = None
+        last_report = profiler.report()
+        if echo:
+            print('\n'.join(format_report(last_report)))
+        if filepath:
+            # The report must not mask or override the outcome of the session
+            try:
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    json.dump(last_report, f, indent=2)
+            except OSError as ex:
+                print(f'Unable to write the profile report {filepath}: {ex}')
+
+
+def stage(name: str, items: int = 0):
+    """
+    Context manager timing a stage of the running session (no-op outside of a session).
+    """
+    if _active_profiler is None:
+        return nullcontext()
+    return _active_profiler.stage(name, items=items)
+
+
+def record(name: str, seconds: float, items: int = 0, calls: int = 1) -> None:
+    """
+    Add time measured elsewhere to the running session (no-op outside of a session).
+    """
+    if _active_profiler is not None:
+        _active_profiler.record(name, seconds, items=items, calls=calls)
@@ -1,46 +1,64 @@
 import bpy
+import numpy as np
 from typing import List
+from ..core.empty_keys import max_displacement
 
 
-def remove_empty_shape_keys(
-        context: bpy.types.Context,
+def find_empty_shape_keys(
         obj: bpy.types.Object,
         empty_threshold: float,
         shape_keys: List[str] | None = None
-) -> int:
-    nullshapekeysdeleted = 0
-    shape_keys_to_remove = []
+) -> List[str]:
+    """
+    Find shape keys whose vertices do not move beyond the threshold.
+
+    Every key is read with foreach_get into one reused buffer and compared
+    with the mesh vertex coordinates at once.
+    """
+    vertex_count = len(obj.data.vertices)
+    basis = np.empty((vertex_count, 3), dtype=np.float32)
+    obj.data.vertices.foreach_get('co', basis.ravel())
+    co = np.empty_like(basis)
+    tmp = np.empty_like(basis)
 
+    empty = []
     for sk in obj.data.shape_keys.key_blocks[1:]:
         if shape_keys is not None and sk.name not in shape_keys:
             continue
+        sk.data.foreach_get('co', co.ravel())
+        if max_displacement(co, basis, tmp) <= empty_threshold:
+            empty.append(sk.name)
+    return empty
+
+
+def remove_shape_keys(obj: bpy.types.Object, shape_keys: List[str]) -> int:
+    """
+    Remove shape keys by name through the data API (no operators, no undo pushes).
+    """
+    key_blocks = obj.data.shape_keys.key_blocks
+    removed = 0
+    for sk_name in shape_keys:
+        sk = key_blocks.get(sk_name)
+        if sk is None:
+            continue
+        obj.shape_key_remove(sk)
+        removed += 1
+    return removed
+
+
+def remove_empty_shape_keys(
+        context: bpy.types.Context,
+        obj: bpy.types.Object,
+        empty_threshold: float,
+        shape_keys: List[str] | None = None
+) -> int:
+    if obj.data.shape_keys is None:
+        return 0
+
+    obj_active_shape_key_index = obj.active_shape_key_index
+    empty = find_empty_shape_keys(obj, empty_threshold, shape_keys)
+    removed = remove_shape_keys(obj, empty)
 
-        is_empty = True
-        for v in obj.data.vertices:
-            delta = sk.data[v.index].co - v.co
-
-            # If any displacement is above the threshold, mark the shape key as not empty
-            if delta.length > empty_threshold:
-                is_empty = False
-                break
-
-        # If the shape key is empty (below the threshold), mark it for deletion
-        if is_empty:
-            shape_keys_to_remove.append(sk)
-        
-    with context.temp_override(object=obj):
-        # Check if the skp_shape_key_remove operator is available
-        operator_to_use = bpy.ops.object.shape_key_remove
-        if "skp_shape_key_remove" in dir(bpy.ops.object):
-            operator_to_use = bpy.ops.object.skp_shape_key_remove
-
-        # Delete the shape keys marked for removal (outside the loop to avoid modifying the collection during iteration)
-        for key in shape_keys_to_remove:
-            iIndex = obj.data.shape_keys.key_blocks.keys().index(key.name)
-            obj.active_shape_key_index = iIndex
-
-            # Use the selected operator to delete the shape key
-            operator_to_use('EXEC_DEFAULT')
-            nullshapekeysdeleted += 1
-    
-    return nullshapekeysdeleted
+    key_count = len(obj.data.shape_keys.key_blocks) if obj.data.shape_keys else 0
+    obj.active_shape_key_index = min(obj_active_shape_key_index, max(0, key_count - 1))
+    return removed
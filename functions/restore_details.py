@@ -1,5 +1,32 @@
 import bpy
+import numpy as np
 from typing import List
+from ..core.corrective_smooth import CorrectiveSmooth
+from .smooth_shape_keys import read_mesh_adjacency, read_rest_coordinates, apply_corrective_smooth
+from . import profiling
+
+
+def read_vertex_group_weights(obj: bpy.types.Object, vertex_group: str) -> np.ndarray | None:
+    """
+    Read the weights of a vertex group into an array. Vertices outside the group get zero weight.
+
+    Vertex group weights have no foreach_get accessor, so they are read vertex by
+    vertex in a single pass (timed as the 'vertex_group' stage).
+
+    Returns:
+        np.ndarray | None: (N,) float32 weights or None if the object has no such
+            vertex group (the whole mesh is smoothed then, as by the modifier).
+    """
+    group = obj.vertex_groups.get(vertex_group) if vertex_group else None
+    if group is None:
+        return None
+
+    group_index = group.index
+    return np.fromiter(
+        (next((g.weight for g in v.groups if g.group == group_index), 0.0) for v in obj.data.vertices),
+        dtype=np.float32,
+        count=len(obj.data.vertices)
+    )
 
 
 def restore_details(
@@ -13,59 +40,33 @@ def restore_details(
         overwrite_shape_keys: bool = False,
         shape_keys: List[str] | None = None
 ) -> None:
-    obj_show_only_shape_key = obj.show_only_shape_key
-    obj_active_shape_key_index = obj.active_shape_key_index
-
-    obj.active_shape_key_index = 0
-    obj.show_only_shape_key = True
-
-    mod: bpy.types.CorrectiveSmoothModifier = obj.modifiers.new(name='Corrective Smooth', type='CORRECTIVE_SMOOTH')
-    mod.factor = factor
-    mod.iterations = iterations
-    mod.smooth_type = smooth_type
-    mod.scale = scale
-    mod.vertex_group = vertex_group
-
-    with context.temp_override(object=obj):
-        bpy.ops.object.modifier_move_to_index(modifier=mod.name, index=0)
-
-    sk_names = [sk.name for sk in obj.data.shape_keys.key_blocks[1:]]
-    for sk_name in sk_names:
-        
-        sk = obj.data.shape_keys.key_blocks.get(sk_name)
-        if shape_keys is not None and sk.name not in shape_keys:
-            continue
-        
-        # Set SK index
-        obj.active_shape_key_index = obj.data.shape_keys.key_blocks.keys().index(sk_name)
-        
-        with context.temp_override(object=obj):
-            bpy.ops.object.modifier_apply_as_shapekey(
-                keep_modifier=True,
-                modifier=mod.name,
-                report=False
-            )
-        new_sk = obj.data.shape_keys.key_blocks[-1]
-        
-        if new_sk.name in sk_names:
-            raise Exception('Unable to apply corrective smooth modifier')
-    
-        if overwrite_shape_keys:
-            
-            # Use foreach_set to batch update the original shape key data
-            sk.data.foreach_set("co", [value for v in new_sk.data for value in v.co[:]])
-            
-            # Remove the new shape key
-            with context.temp_override(object=obj):
-                sk_index = len(obj.data.shape_keys.key_blocks) - 1
-                obj.active_shape_key_index = sk_index
-                bpy.ops.object.shape_key_remove()
+    """
+    Restore details of shape keys by corrective smoothing weighted by a vertex group.
 
-            # Note. We do not remove old shape key renaming the new one to keep the original order
-                
-        else:
-            new_sk.name = f'RD_{sk_name}'
+    Group weights and the mesh adjacency are read once and all the selected
+    shape keys are smoothed in blocks (see smooth_shape_keys).
+    """
+    if obj.data.shape_keys is None:
+        return
 
-    obj.active_shape_key_index = obj_active_shape_key_index
-    obj.show_only_shape_key = obj_show_only_shape_key
-    obj.modifiers.remove(mod)
+    with profiling.stage('vertex_group', items=len(obj.data.vertices)):
+        weights = read_vertex_group_weights(obj, vertex_group)
+    with profiling.stage('adjacency', items=len(obj.data.vertices)):
+        adjacency = read_mesh_adjacency(obj.data)
+    with profiling.stage('rest_deltas', items=len(obj.data.vertices)):
+        smoother = CorrectiveSmooth(
+            adjacency,
+            read_rest_coordinates(obj.data),
+            factor=factor,
+            iterations=iterations,
+            scale=scale,
+            smooth_type=smooth_type,
+            weights=weights
+        )
+    apply_corrective_smooth(
+        obj,
+        smoother,
+        prefix='RD_',
+        overwrite_shape_keys=overwrite_shape_keys,
+        shape_keys=shape_keys
+    )
@@ -1,5 +1,79 @@
 import bpy
+import numpy as np
 from typing import List
+from ..core.corrective_smooth import MeshAdjacency, CorrectiveSmooth
+from . import profiling
+
+
+def read_mesh_adjacency(mesh: bpy.types.Mesh) -> MeshAdjacency:
+    """
+    Read mesh edges and faces with foreach_get and build the vertex adjacency.
+    """
+    edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get('vertices', edges)
+    corner_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get('vertex_index', corner_verts)
+    face_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get('loop_start', face_starts)
+    face_sizes = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get('loop_total', face_sizes)
+    return MeshAdjacency.build(len(mesh.vertices), edges, corner_verts, face_starts, face_sizes)
+
+
+def read_rest_coordinates(mesh: bpy.types.Mesh) -> np.ndarray:
+    """
+    Read the mesh vertex coordinates the Corrective Smooth modifier uses as rest positions.
+    """
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get('co', co)
+    return co.reshape(-1, 3)
+
+
+def apply_corrective_smooth(
+        obj: bpy.types.Object,
+        smoother: CorrectiveSmooth,
+        prefix: str,
+        overwrite_shape_keys: bool = False,
+        shape_keys: List[str] | None = None,
+        key_block_size: int = 16
+) -> List[str]:
+    """
+    Apply corrective smoothing to blocks of shape keys of an object.
+
+    Returns:
+        List[str]: Names of the written shape keys.
+    """
+    key_blocks = obj.data.shape_keys.key_blocks
+    sk_names = [sk.name for sk in key_blocks[1:] if shape_keys is None or sk.name in shape_keys]
+
+    vertex_count = len(obj.data.vertices)
+    key_block_size = max(1, key_block_size)
+    block = np.empty((vertex_count, key_block_size, 3), dtype=np.float32)
+    buffer = np.empty((vertex_count, 3), dtype=np.float32)
+
+    written = []
+    for start in range(0, len(sk_names), key_block_size):
+        block_names = sk_names[start:start + key_block_size]
+        co = block[:, :len(block_names)]
+        with profiling.stage('read_keys', items=len(block_names)):
+            for i, sk_name in enumerate(block_names):
+                key_blocks[sk_name].data.foreach_get('co', buffer.ravel())
+                co[:, i] = buffer
+
+        with profiling.stage('smooth', items=len(block_names)):
+            smoother.apply(co)
+
+        with profiling.stage('write', items=len(block_names)):
+            for i, sk_name in enumerate(block_names):
+                buffer[:] = co[:, i]
+                if overwrite_shape_keys:
+                    sk = key_blocks[sk_name]
+                else:
+                    sk = obj.shape_key_add(name=f'{prefix}{sk_name}', from_mix=False)
+                sk.data.foreach_set('co', buffer.ravel())
+                written.append(sk.name)
+    obj.data.update()
+    return written
 
 
 def smooth_shape_keys(
@@ -17,61 +91,29 @@ def smooth_shape_keys(
     Method used for smoothing
         'SIMPLE' Simple - Use the average of adjacent edge-vertices.
         'LENGTH_WEIGHTED' Length Weight - Use the average of adjacent edge-vertices weighted by their length.
-    """
-    # obj.show_only_shape_key = False
-    # for sk in obj.data.shape_keys.key_blocks:
-    #     sk.value = 0.0  
-    
-    obj_show_only_shape_key = obj.show_only_shape_key
-    obj_active_shape_key_index = obj.active_shape_key_index
-    obj.active_shape_key_index = 0
-    obj.show_only_shape_key = True
-
-    mod = obj.modifiers.new(name='Corrective Smooth', type='CORRECTIVE_SMOOTH')
-    mod.factor = factor
-    mod.iterations = iterations
-    mod.smooth_type = smooth_type
-    mod.scale = scale
 
-    with context.temp_override(object=obj):
-        bpy.ops.object.modifier_move_to_index(modifier=mod.name, index=0)
-    
-    sk_names = [sk.name for sk in obj.data.shape_keys.key_blocks[1:]]
-    for sk_name in sk_names:
-        
-        sk = obj.data.shape_keys.key_blocks.get(sk_name)
-        if shape_keys is not None and sk.name not in shape_keys:
-            continue
-        # Set SK index
-        obj.active_shape_key_index = obj.data.shape_keys.key_blocks.keys().index(sk_name)
-        
-        with context.temp_override(object=obj):
-            bpy.ops.object.modifier_apply_as_shapekey(
-                keep_modifier=True,
-                modifier=mod.name,
-                report=False
-            )
-        new_sk = obj.data.shape_keys.key_blocks[-1]
-        
-        if new_sk.name in sk_names:
-            raise Exception('Unable to apply corrective smooth modifier')
-    
-        if overwrite_shape_keys:
-            
-            # Use foreach_set to batch update the original shape key data
-            sk.data.foreach_set("co", [value for v in new_sk.data for value in v.co[:]])
-            
-            # Remove the new shape key
-            with context.temp_override(object=obj):
-                sk_index = len(obj.data.shape_keys.key_blocks) - 1
-                obj.active_shape_key_index = sk_index
-                bpy.ops.object.shape_key_remove()
-
-            # Note. We do not remove old shape key renaming the new one to keep the original order
-                
-        else:
-            new_sk.name = f'CS_{sk_name}'
+    Shape keys are smoothed in blocks with a NumPy implementation of the
+    Corrective Smooth modifier, the adjacency and the rest deltas are calculated
+    once per mesh.
+    """
+    if obj.data.shape_keys is None:
+        return
 
-    obj.active_shape_key_index = obj_active_shape_key_index
-    obj.show_only_shape_key = obj_show_only_shape_key
-    obj.modifiers.remove(mod)
\ No newline at end of file
+    with profiling.stage('adjacency', items=len(obj.data.vertices)):
+        adjacency = read_mesh_adjacency(obj.data)
+    with profiling.stage('rest_deltas', items=len(obj.data.vertices)):
+        smoother = CorrectiveSmooth(
+            adjacency,
+            read_rest_coordinates(obj.data),
+            factor=factor,
+            iterations=iterations,
+            scale=scale,
+            smooth_type=smooth_type
+        )
+    apply_corrective_smooth(
+        obj,
+        smoother,
+        prefix='CS_',
+        overwrite_shape_keys=overwrite_shape_keys,
+        shape_keys=shape_keys
+    )
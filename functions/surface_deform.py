@@ -1,174 +1,499 @@
+import os
+import time
 import bpy
-import bmesh
-import math
+import numpy as np
 from typing import List
+from concurrent.futures import ThreadPoolExecutor
 from mathutils.bvhtree import BVHTree
-from mathutils import Vector
-from mathutils.kdtree import KDTree
+from ..core.binding_cache import BindingCache, binding_cache_key
+from ..core.binding_io import BindingFileError, topology_hash, save_binding, load_binding
+from ..core.triangle_index import TriangleGrid
+from ..core.empty_keys import empty_key_mask
+from ..core.surface_binding import SurfaceBinding, BindingMatrix, triangle_normals, compute_binding
+from ..core import transfer
+from . import profiling
 
 
-def create_surface_binding(src_obj: bpy.types.Object, tgt_obj: bpy.types.Object):
+BVH_EPSILON = 0.0001
+
+
+def read_mesh_triangles(mesh: bpy.types.Mesh) -> tuple:
+    """
+    Read vertex coordinates and loop triangles of a mesh into contiguous arrays.
+
+    Returns:
+        tuple: (N, 3) float32 vertex coordinates and (M, 3) int32 triangle vertex indices.
+    """
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get('co', co)
+
+    mesh.calc_loop_triangles()
+    tris = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get('vertices', tris)
+    return co.reshape(-1, 3), tris.reshape(-1, 3)
+
+
+def read_basis_coordinates(mesh: bpy.types.Mesh) -> np.ndarray:
+    """
+    Read the basis shape key coordinates of a mesh (or vertex coordinates if it has no shape keys).
+    """
+    if mesh.shape_keys and len(mesh.shape_keys.key_blocks) >= 1:
+        data = mesh.shape_keys.key_blocks[0].data
+    else:
+        data = mesh.vertices
+    co = np.empty(len(data) * 3, dtype=np.float32)
+    data.foreach_get('co', co)
+    return co.reshape(-1, 3)
+
+
+class SurfaceSource:
     """
-    Bind target mesh vertices to the nearest source mesh triangle using BVHTree.
+    Source mesh data shared by all the target bindings of one transfer.
+
+    Holds the triangulated source arrays and builds the spatial index
+    (BVHTree or TriangleGrid) once, on first use, so a cache or file hit for
+    every target never builds it.
+    """
+    def __init__(self, src_obj: bpy.types.Object) -> None:
+        self.obj = src_obj
+        self.verts, self.tris = read_mesh_triangles(src_obj.data)
+        if len(self.tris) == 0:
+            raise ValueError(f'{src_obj.name} has no faces to bind to')
+        self.normals = triangle_normals(self.verts, self.tris)
+        self._bvh = None
+        self._grid = None
+        self._basis_co = None
+        self._content_hash = None
+        self._topology_hash = None
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.verts)
+
+    @property
+    def bvh(self) -> BVHTree:
+        if self._bvh is None:
+            self._bvh = BVHTree.FromPolygons(self.verts.tolist(), self.tris.tolist(), epsilon=BVH_EPSILON)
+        return self._bvh
+
+    @property
+    def grid(self) -> TriangleGrid:
+        if self._grid is None:
+            self._grid = TriangleGrid.build(self.verts, self.tris)
+        return self._grid
+
+    def find_nearest(self, points: np.ndarray, search: str = 'BVH') -> np.ndarray:
+        """
+        Find the index of the nearest source triangle of each point.
+
+        Args:
+            points (np.ndarray): (N, 3) query points.
+            search (str, optional): 'BVH' to query mathutils BVHTree point by point (reference
+                implementation) or 'GRID' to query the NumPy TriangleGrid in batches.
+        """
+        if search == 'GRID':
+            tri_indices, _, _ = self.grid.find_nearest(points)
+            return tri_indices
+        if search != 'BVH':
+            raise ValueError(f'Unknown nearest triangle search: {search}')
+        find_nearest = self.bvh.find_nearest
+        return np.fromiter(
+            (find_nearest(co)[2] for co in points.tolist()),
+            dtype=np.int32,
+            count=len(points)
+        )
+
+    @property
+    def basis_co(self) -> np.ndarray:
+        if self._basis_co is None:
+            self._basis_co = read_basis_coordinates(self.obj.data)
+        return self._basis_co
+
+    @property
+    def content_hash(self) -> str:
+        """
+        Hash of the source topology and basis coordinates.
+        """
+        if self._content_hash is None:
+            self._content_hash = binding_cache_key(self.tris, self.verts)
+        return self._content_hash
+
+    @property
+    def topology_hash(self) -> str:
+        if self._topology_hash is None:
+            self._topology_hash = topology_hash(self.tris, self.vertex_count)
+        return self._topology_hash
+
+    def read_key_block(self, shape_keys: List[str], out: np.ndarray) -> np.ndarray:
+        """
+        Read coordinates of the source shape keys into a (K, N, 3) float32 buffer.
+        """
+        key_blocks = self.obj.data.shape_keys.key_blocks
+        for i, sk_name in enumerate(shape_keys):
+            key_blocks[sk_name].data.foreach_get('co', out[i].ravel())
+        return out[:len(shape_keys)]
+
+
+def create_surface_binding(
+        src_obj: bpy.types.Object,
+        tgt_obj: bpy.types.Object,
+        cache: BindingCache | None = None,
+        source: SurfaceSource | None = None,
+        search: str = 'BVH',
+        workers: int = 1
+) -> SurfaceBinding:
+    """
+    Bind target mesh vertices to the nearest source mesh triangle.
 
     This function binds each vertex of the target mesh to the closest triangle 
-    on the source mesh. It uses the BVHTree structure for efficient nearest 
-    neighbor search and calculates the barycentric coordinates of each binding.
+    on the source mesh. Source triangles and target coordinates are read with
+    foreach_get, the spatial index (BVHTree or TriangleGrid) is only used to
+    find the nearest triangle and the barycentric coordinates, normals and
+    offsets are calculated for all the vertices at once.
 
     Args:
         src_obj (bpy.types.Object): The source object whose mesh will be used for binding.
         tgt_obj (bpy.types.Object): The target object whose vertices will be bound to the source mesh.
+        cache (BindingCache, optional): Cache to look the binding up in before binding from scratch.
+        source (SurfaceSource, optional): Prepared source data shared between several targets.
+        search (str, optional): Nearest triangle search, 'BVH' or 'GRID' (see SurfaceSource.find_nearest).
+        workers (int, optional): Number of worker processes binding the vertices with the 'GRID' search.
+            The result is identical to binding in a single process.
+
+    With a cache, the binding keeps the target rest coordinates. When the target
+    basis changes, the previous binding of the same pair is looked up and only the
+    moved or added vertices are rebound (all of them if vertices were removed).
 
     Returns:
-        list: A list of tuples containing binding data for each target vertex.
-              Each tuple consists of:
-              - vertex_indices (list of int): Indices of the vertices of the closest triangle in the source mesh.
-              - normal (Vector): Normal of the closest triangle face.
-              - b_coords (tuple of float): Barycentric coordinates of the target vertex relative to the closest triangle.
-              - offset (float): Distance from the target vertex to the triangle plane along the normal.
-    """
-    source_mesh: bpy.types.Mesh = src_obj.data
-    target_mesh: bpy.types.Mesh = tgt_obj.data
-
-    if target_mesh.shape_keys and len(target_mesh.shape_keys.key_blocks) >= 1:
-        target_verts = target_mesh.shape_keys.key_blocks[0].data
+        SurfaceBinding: Array-backed binding data of the target vertices.
+    """
+    if source is None:
+        source = SurfaceSource(src_obj)
+    points = read_basis_coordinates(tgt_obj.data)
+
+    if cache is None:
+        return bind_points(source, points, search=search, workers=workers)
+
+    cache_key = binding_cache_key(points, source=source.content_hash, method=search, epsilon=BVH_EPSILON)
+    binding = cache.get(cache_key)
+    if binding is not None:
+        return binding
+
+    lineage = binding_cache_key(source=source.content_hash, target=tgt_obj.name, method=search, epsilon=BVH_EPSILON)
+    previous = cache.latest(lineage)
+    rows = previous.changed_rows(points) if previous is not None else None
+    if rows is not None and len(rows) == 0:
+        binding = previous
+    elif rows is not None:
+        binding = previous.updated(rows, bind_points(source, points[rows], search=search, workers=workers), points)
     else:
-        target_verts = target_mesh.vertices
-
-    bm = bmesh.new()
-    bm.from_mesh(source_mesh)
-    bmesh.ops.triangulate(bm, faces=bm.faces[:])
-    bm.faces.ensure_lookup_table()
-    bm.normal_update()
-    bvh = BVHTree.FromBMesh(bm, epsilon=0.0001)
-
-    # Barycentric coordinates helper function
-    def barycentric_coords(pt, v1, v2, v3):
-        v2_v1 = v2 - v1
-        v3_v1 = v3 - v1
-        pt_v1 = pt - v1
-        d00 = v2_v1.dot(v2_v1)
-        d01 = v2_v1.dot(v3_v1)
-        d11 = v3_v1.dot(v3_v1)
-        d20 = pt_v1.dot(v2_v1)
-        d21 = pt_v1.dot(v3_v1)
-        denom = d00 * d11 - d01 * d01
-        v = (d11 * d20 - d01 * d21) / denom
-        w = (d00 * d21 - d01 * d20) / denom
-        u = 1.0 - v - w
-        return (u, v, w)
-
-    # Bind each target vertex to the closest source triangle
-    bind_data = []
-    for v in target_verts:
-        _, normal, index, _ = bvh.find_nearest(v.co)
-        if index is not None:
-            face = bm.faces[index]
-            verts = [vert.co for vert in face.verts]
-            vertex_indices = [vert.index for vert in face.verts]
-            if face.normal.length <= 0.5:
-                print(face.normal)
-            b_coords = barycentric_coords(v.co, *verts)
-            offset = (v.co - (verts[0] * b_coords[0] + verts[1] * b_coords[1] + verts[2] * b_coords[2])).dot(normal)
-            bind_data.append((vertex_indices, face.normal.copy(), b_coords, offset))
-            
-        else:
-            raise Exception
-
-    bm.free()  # Free the BMesh
-
-    return bind_data
-
-
-def calc_surface_deform(
-        bind_data,
-        new_source_data: list
-) -> None:
-    """
-    Identify problem vertices based on angular deviation of binding normals.
-
-    This function identifies vertices in the target mesh that may have problematic 
-    bindings based on the angular deviation of the normals of their associated triangles 
-    in the binding data. Vertices with an average normal deviation above a specified 
-    threshold are flagged as problem vertices.
+        binding = bind_points(source, points, search=search, workers=workers)
+    cache.put(cache_key, binding, lineage=lineage)
+    return binding
 
-    Args:
-        target_obj (bpy.types.Object): The target object whose vertices are being analyzed.
-        bind_data (dict): Binding data for the target vertices. Each entry is a tuple containing
-                          the vertex indices, normal, barycentric coordinates, and offset.
 
-    Returns:
-        dict: A dictionary where the keys are vertex indices and the values are the 
-              normalized problem severity (ranging from 0.0 to 1.0).
+def bind_points(source: SurfaceSource, points: np.ndarray, search: str = 'BVH', workers: int = 1) -> SurfaceBinding:
+    """
+    Bind points to the nearest source triangles (see create_surface_binding).
     """
-    
-    new_co = list()
-    # Apply deformations
-    for vertices, normal, b_coords, offset in bind_data:
+    if search == 'GRID':
+        return transfer.bind_points(
+            source.verts, source.tris, points, normals=source.normals, grid=source.grid, workers=workers
+        )
+    tri_indices = source.find_nearest(points, search=search)
+    binding = compute_binding(source.verts, source.tris, points, tri_indices, normals=source.normals)
+    binding.rest_co = points
+    return binding
 
-        verts = [new_source_data[idx] for idx in vertices]
-        new_pos = verts[0] * b_coords[0] + verts[1] * b_coords[1] + verts[2] * b_coords[2]
-        new_pos += normal * offset
-        new_co.append(new_pos)
-    return new_co
 
+def binding_file_path(directory: str, src_obj: bpy.types.Object, tgt_obj: bpy.types.Object) -> str:
+    """
+    Path of the binding file of a source/target pair inside a directory.
+    """
+    name = f'{bpy.path.clean_name(src_obj.name)}__{bpy.path.clean_name(tgt_obj.name)}.skwb'
+    return os.path.join(bpy.path.abspath(directory), name)
 
-def transfer_shapekeys(
-        context: bpy.types.Context,
+
+def save_surface_binding(
+        src_obj: bpy.types.Object,
         tgt_obj: bpy.types.Object,
+        filepath: str,
+        cache: BindingCache | None = None,
+        source: SurfaceSource | None = None,
+        search: str = 'BVH',
+        workers: int = 1
+) -> SurfaceBinding:
+    """
+    Bind the target to the source and write the binding to a file for reuse in other sessions.
+    """
+    if source is None:
+        source = SurfaceSource(src_obj)
+    binding = create_surface_binding(
+        src_obj, tgt_obj, cache=cache, source=source, search=search, workers=workers
+    )
+    save_binding(
+        filepath,
+        binding.arrays(),
+        source_vertex_count=source.vertex_count,
+        source_topology_hash=source.topology_hash,
+        source_content_hash=source.content_hash,
+        target_content_hash=binding_cache_key(read_basis_coordinates(tgt_obj.data))
+    )
+    return binding
+
+
+def load_surface_binding(
+        src_obj: bpy.types.Object,
+        tgt_obj: bpy.types.Object,
+        filepath: str,
+        source: SurfaceSource | None = None
+) -> SurfaceBinding:
+    """
+    Memory-map a binding saved by save_surface_binding.
+
+    Raises:
+        BindingFileError: If the binding was saved for meshes with other topology or
+            before the source or the target rest shape changed.
+    """
+    if source is None:
+        source = SurfaceSource(src_obj)
+    arrays = load_binding(
+        filepath,
+        source_vertex_count=source.vertex_count,
+        target_vertex_count=len(tgt_obj.data.vertices),
+        source_topology_hash=source.topology_hash,
+        source_content_hash=source.content_hash,
+        target_content_hash=binding_cache_key(read_basis_coordinates(tgt_obj.data))
+    )
+    missing = [name for name in SurfaceBinding.ARRAYS if name not in arrays]
+    if missing:
+        raise BindingFileError(f'Binding file has no {", ".join(missing)} data')
+    return SurfaceBinding(**{name: arrays[name] for name in SurfaceBinding.ARRAYS})
+
+
+def get_target_shape_key(tgt_obj: bpy.types.Object, sk_name: str, overwrite_shape_keys: bool):
+    if tgt_obj.data.shape_keys is None:
+        tgt_obj.shape_key_add(name="Basis", from_mix=False)
+        return tgt_obj.shape_key_add(name=sk_name, from_mix=False)
+    tgt_sk = tgt_obj.data.shape_keys.key_blocks.get(sk_name)
+    if tgt_sk is None or not overwrite_shape_keys:
+        tgt_sk = tgt_obj.shape_key_add(name=sk_name, from_mix=False)
+    return tgt_sk
+
+
+def transfer_shapekeys_to_objects(
+        context: bpy.types.Context,
+        tgt_objs: List[bpy.types.Object],
         src_obj: bpy.types.Object,
         shape_keys: List[str] | None = None,
-        overwrite_shape_keys: bool = False
-    ) -> List[str]:
+        overwrite_shape_keys: bool = False,
+        key_block_size: int = 32,
+        cache: BindingCache | None = None,
+        binding_dir: str | None = None,
+        search: str = 'BVH',
+        workers: int = 1,
+        threads: int = 1,
+        empty_threshold: float | None = None,
+        skipped_sks: dict | None = None,
+        sparse: bool = False
+    ) -> dict:
     """
-    Transfer shape keys from source objects to target objects.
+    Transfer shape keys from a source object to several target objects.
 
-    This function transfers shape key deformations from source objects to target objects.
-    It can optionally apply corrective smoothing iterations to address any problematic
-    vertex bindings.
+    The source mesh is prepared once (see SurfaceSource) and shared by the
+    bindings of all the targets. Every block of source shape keys is read
+    once and deformed into each target in turn.
+
+    Deformation runs in a thread pool (the NumPy kernels release the GIL)
+    while the main thread writes the previous block into the target shape
+    keys, so all RNA access stays on the main thread.
 
     Args:
         context (bpy.types.Context): The current context in Blender.
-        target_objects (bpy.types.Object): A tuple of target basis and target final objects.
-        source_objects (bpy.types.Object): A tuple of source basis and source final objects.
-        basis_shape_key (str, optional): The name of the basis shape key to use. Defaults to None.
+        tgt_objs (List[bpy.types.Object]): Objects to transfer the shape keys to.
+        src_obj (bpy.types.Object): Object to transfer the shape keys from.
         shape_keys (List[str], optional): A list of shape key names to transfer. Defaults to None.
+        overwrite_shape_keys (bool, optional): Write into existing target shape keys with the same names.
+        key_block_size (int, optional): Number of shape keys deformed in one matrix product. Defaults to 32.
+        cache (BindingCache, optional): Binding cache to reuse unchanged bindings from. Defaults to None.
+        binding_dir (str, optional): Directory with saved binding files to load the binding from. Defaults to None.
+        search (str, optional): Nearest triangle search, 'BVH' or 'GRID'. Defaults to 'BVH'.
+        workers (int, optional): Number of worker processes binding with the 'GRID' search. Defaults to 1.
+        threads (int, optional): Number of threads deforming shape keys. Defaults to 1.
+        empty_threshold (float, optional): Shape keys that do not move any target vertex beyond
+            this threshold are not created (existing ones are removed when overwriting). Defaults to None.
+        skipped_sks (dict, optional): Filled with the names of the skipped empty shape keys by target object name.
+        sparse (bool, optional): Recalculate only the target vertices bound to the source vertices
+            each shape key moves. Keys that move none of them are skipped like empty keys, with or
+            without empty_threshold. Defaults to False.
 
     Returns:
-        None
+        dict: Names of the created (or overwritten) shape keys by target object name.
 
     Raises:
-        Exception: If the target shape key is not found in the source object.
         ValueError: If there is a mismatch in the number of vertices.
     """
-    binding = create_surface_binding(src_obj, tgt_obj)
-    new_sks = []
+    with profiling.stage('source'):
+        source = SurfaceSource(src_obj)
+
+    bindings = []
+    for tgt_obj in tgt_objs:
+        with profiling.stage('bind', items=len(tgt_obj.data.vertices)):
+            binding = None
+            if binding_dir:
+                filepath = binding_file_path(binding_dir, src_obj, tgt_obj)
+                if os.path.isfile(filepath):
+                    try:
+                        binding = load_surface_binding(src_obj, tgt_obj, filepath, source=source)
+                    except BindingFileError as ex:
+                        print(f'Ignoring binding file {filepath}: {ex}')
+            if binding is None:
+                binding = create_surface_binding(
+                    src_obj, tgt_obj, cache=cache, source=source, search=search, workers=workers
+                )
+            if len(binding) != len(tgt_obj.data.vertices):
+                raise ValueError("Mismatch in the number of vertices.")
+            bindings.append((tgt_obj, binding, binding.to_matrix(source.vertex_count)))
 
+    key_blocks = src_obj.data.shape_keys.key_blocks
     if shape_keys is None:
         # Process all shape keys
-        shape_keys = [sk.name for sk in src_obj.data.shape_keys.key_blocks[1:]]
-    
-    for sk_name in shape_keys:
-        sk = src_obj.data.shape_keys.key_blocks.get(sk_name)
-        if not sk:
-            continue
-        
-        new_coordinates = calc_surface_deform(binding, [v.co for v in sk.data])
-
-        if tgt_obj.data.shape_keys is None:
-            tgt_obj.shape_key_add(name="Basis", from_mix=False)
-            tgt_sk = tgt_obj.shape_key_add(name=sk_name, from_mix=False)
-        else:
-            tgt_sk = tgt_obj.data.shape_keys.key_blocks.get(sk_name)
-            if tgt_sk is None or not overwrite_shape_keys:
-                tgt_sk = tgt_obj.shape_key_add(name=sk_name, from_mix=False)
-
-        flattened_coordinates = [value for co in new_coordinates for value in co[:]]
-        # Ensure the length matches
-        if len(flattened_coordinates) == 3 * len(tgt_sk.data):
-            tgt_sk.data.foreach_set("co", flattened_coordinates)
-        else:
-            raise ValueError("Mismatch in the number of vertices.")
-
-        new_sks.append(tgt_sk.name)
+        shape_keys = [sk.name for sk in key_blocks[1:]]
+    shape_keys = [sk_name for sk_name in shape_keys if key_blocks.get(sk_name)]
+
+    new_sks = {tgt_obj.name: [] for tgt_obj in tgt_objs}
+    key_block_size = max(1, key_block_size)
+    threads = max(1, threads)
+    # Keys of a block are split between the threads
+    sub_block_size = -(-key_block_size // threads)
+
+    # Buffers are allocated once and reused. Two source blocks are needed because
+    # the next block is read while the previous one is still being deformed
+    source_blocks = [
+        np.empty((key_block_size, source.vertex_count, 3), dtype=np.float32) for _ in range(2)
+    ]
+    new_co = {tgt_obj.name: np.empty((len(binding), 3), dtype=np.float32) for tgt_obj, binding, _ in bindings}
+
+    basis_co = dict()
+    if empty_threshold is not None or sparse:
+        basis_co = {tgt_obj.name: read_basis_coordinates(tgt_obj.data) for tgt_obj in tgt_objs}
+    if skipped_sks is not None:
+        skipped_sks.update({tgt_obj.name: [] for tgt_obj in tgt_objs})
+
+    def write_block(block_names: List[str], staged: list) -> None:
+        for tgt_obj, futures in staged:
+            buffer = new_co[tgt_obj.name]
+            names = iter(block_names)
+            for future in futures:
+                deformed, empty, deform_seconds, empty_seconds = future.result()
+                # Deformation and empty key checks are timed in the threads
+                profiling.record('deform', deform_seconds, items=deformed.shape[1])
+                if empty_threshold is not None:
+                    profiling.record('empty_check', empty_seconds, items=deformed.shape[1])
+                for i in range(deformed.shape[1]):
+                    sk_name = next(names)
+                    if empty is not None and empty[i]:
+                        # Do not create empty keys (the existing key would be overwritten with an empty one)
+                        with profiling.stage('remove_empty', items=1):
+                            if overwrite_shape_keys and tgt_obj.data.shape_keys is not None:
+                                tgt_sk = tgt_obj.data.shape_keys.key_blocks.get(sk_name)
+                                if tgt_sk is not None:
+                                    tgt_obj.shape_key_remove(tgt_sk)
+                        if skipped_sks is not None:
+                            skipped_sks[tgt_obj.name].append(sk_name)
+                        continue
+
+                    buffer[:] = deformed[:, i]
+                    with profiling.stage('write', items=1):
+                        tgt_sk = get_target_shape_key(tgt_obj, sk_name, overwrite_shape_keys)
+                        tgt_sk.data.foreach_set("co", buffer.ravel())
+                    new_sks[tgt_obj.name].append(tgt_sk.name)
+
+    def deform(binding: SurfaceBinding, matrix: BindingMatrix, tgt_name: str, key_block: np.ndarray) -> tuple:
+        start = time.perf_counter()
+        deformed, touched = transfer.deform_block(
+            binding, key_block, matrix=matrix,
+            source_basis=source.basis_co if sparse else None,
+            target_basis=basis_co.get(tgt_name),
+            sparse=sparse
+        )
+        deform_seconds = time.perf_counter() - start
+        empty = None
+        if empty_threshold is not None:
+            # Keys that do not move any bound source vertex (sparse) are empty without checking
+            empty = empty_key_mask(deformed, basis_co[tgt_name], empty_threshold, touched=touched)
+        elif touched is not None:
+            # Without the check, keys that do not move any bound source vertex are still skipped
+            empty = ~touched
+        return deformed, empty, deform_seconds, time.perf_counter() - start - deform_seconds
+
+    if sparse:
+        # Lazy source basis and influence indices are built before the threads share them
+        with profiling.stage('influence'):
+            source.basis_co
+            for _, binding, _ in bindings:
+                binding.influence(source.vertex_count)
+
+    pending = None
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for block_index, start in enumerate(range(0, len(shape_keys), key_block_size)):
+            block_names = shape_keys[start:start + key_block_size]
+            with profiling.stage('read_keys', items=len(block_names)):
+                block = source.read_key_block(block_names, source_blocks[block_index % 2])
+
+            staged = []
+            for tgt_obj, binding, matrix in bindings:
+                futures = [
+                    pool.submit(deform, binding, matrix, tgt_obj.name, block[i:i + sub_block_size])
+                    for i in range(0, len(block_names), sub_block_size)
+                ]
+                staged.append((tgt_obj, futures))
+
+            if pending is not None:
+                write_block(*pending)
+            pending = (block_names, staged)
+
+        if pending is not None:
+            write_block(*pending)
     return new_sks
+
+
+def transfer_shapekeys(
+        context: bpy.types.Context,
+        tgt_obj: bpy.types.Object,
+        src_obj: bpy.types.Object,
+        shape_keys: List[str] | None = None,
+        overwrite_shape_keys: bool = False,
+        key_block_size: int = 32,
+        cache: BindingCache | None = None,
+        binding_dir: str | None = None,
+        search: str = 'BVH',
+        workers: int = 1,
+        threads: int = 1,
+        empty_threshold: float | None = None,
+        sparse: bool = False
+    ) -> List[str]:
+    """
+    Transfer shape keys from the source object to a single target object.
+
+    See transfer_shapekeys_to_objects for the arguments.
+
+    Returns:
+        List[str]: Names of the created (or overwritten) shape keys.
+    """
+    new_sks = transfer_shapekeys_to_objects(
+        context=context,
+        tgt_objs=[tgt_obj],
+        src_obj=src_obj,
+        shape_keys=shape_keys,
+        overwrite_shape_keys=overwrite_shape_keys,
+        key_block_size=key_block_size,
+        cache=cache,
+        binding_dir=binding_dir,
+        search=search,
+        workers=workers,
+        threads=threads,
+        empty_threshold=empty_threshold,
+        sparse=sparse
+    )
+    return new_sks[tgt_obj.name]
@@ -1,14 +1,130 @@
 import bpy
+import numpy as np
 from typing import List
 import mathutils
 import random
 from .bind_drivers import shape_key_add_binding_driver
+from ..core.empty_keys import max_displacement
+from ..core.binding_cache import binding_cache_key
+from .surface_deform import read_basis_coordinates
+from . import profiling
+
+
+# Kept Surface Deform modifiers are named after their source object
+KEPT_DEFORMER_PREFIX = 'SKW Bind '
+# Target object property with the bind hash of every kept modifier by modifier name
+BIND_HASHES_PROP = 'skw_bind_hashes'
 
 
 class IsNotBoundException(Exception):
     pass
 
 
+def read_evaluated_coordinates(context: bpy.types.Context, obj: bpy.types.Object, out: np.ndarray) -> np.ndarray:
+    """
+    Read the evaluated vertex coordinates of an object into a (N, 3) float32 array.
+
+    The depsgraph is brought up to date first, so changes made since the last
+    evaluation (e.g. shape key values of a modifier target) are included.
+    """
+    depsgraph = context.evaluated_depsgraph_get()
+    mesh = obj.evaluated_get(depsgraph).data
+    if len(mesh.vertices) != len(out):
+        raise ValueError(f'Evaluated {obj.name} has {len(mesh.vertices)} vertices, expected {len(out)}')
+    mesh.vertices.foreach_get('co', out.ravel())
+    return out
+
+
+def bind_surface_deform(
+        context: bpy.types.Context,
+        obj: bpy.types.Object,
+        from_obj: bpy.types.Object,
+        falloff: float,
+        strength: float
+) -> bpy.types.SurfaceDeformModifier:
+    """
+    Add a Surface Deform modifier targeting from_obj as the first modifier of obj and bind it.
+    """
+    deformer = obj.modifiers.new(name='surface defrom', type='SURFACE_DEFORM')
+    deformer.target = from_obj
+    deformer.falloff = falloff
+    deformer.strength = strength
+
+    with context.temp_override(object=obj):
+        bpy.ops.object.modifier_move_to_index(modifier=deformer.name, index=0)
+        bpy.ops.object.surfacedeform_bind(modifier=deformer.name)
+    return deformer
+
+
+def surface_deform_bind_hash(from_obj: bpy.types.Object, tgt_obj: bpy.types.Object, falloff: float) -> str:
+    """
+    Hash everything a Surface Deform bind depends on: source basis and faces, target basis,
+    placement of the target relative to the source and falloff (strength only scales the
+    bound deformation and is not part of the bind).
+    """
+    src_mesh = from_obj.data
+    corner_verts = np.empty(len(src_mesh.loops), dtype=np.int32)
+    src_mesh.loops.foreach_get('vertex_index', corner_verts)
+    face_sizes = np.empty(len(src_mesh.polygons), dtype=np.int32)
+    src_mesh.polygons.foreach_get('loop_total', face_sizes)
+    tgt_co = np.empty(len(tgt_obj.data.vertices) * 3, dtype=np.float32)
+    tgt_obj.data.vertices.foreach_get('co', tgt_co)
+    # The modifier binds in the space of the source, moving either object invalidates the bind
+    relative_matrix = np.array(from_obj.matrix_world.inverted() @ tgt_obj.matrix_world, dtype=np.float32).ravel()
+    return binding_cache_key(
+        read_basis_coordinates(src_mesh), corner_verts, face_sizes, tgt_co, relative_matrix,
+        falloff=float(falloff)
+    )
+
+
+def get_kept_surface_deform(
+        context: bpy.types.Context,
+        tgt_obj: bpy.types.Object,
+        from_obj: bpy.types.Object,
+        falloff: float,
+        strength: float
+) -> bpy.types.SurfaceDeformModifier:
+    """
+    Get the kept Surface Deform modifier of a (source, target) pair enabled and bound.
+
+    The modifier is created on first use. It is rebound only if the bind hash
+    (see surface_deform_bind_hash) differs from the one stored on the target
+    when it was bound.
+    """
+    bind_hash = surface_deform_bind_hash(from_obj, tgt_obj, falloff)
+    hashes = tgt_obj.get(BIND_HASHES_PROP)
+
+    deformer = next((
+        mod for mod in tgt_obj.modifiers
+        if mod.type == 'SURFACE_DEFORM' and mod.target == from_obj and mod.name.startswith(KEPT_DEFORMER_PREFIX)
+    ), None)
+    if deformer is None:
+        deformer = tgt_obj.modifiers.new(name=f'{KEPT_DEFORMER_PREFIX}{from_obj.name}', type='SURFACE_DEFORM')
+        deformer.target = from_obj
+    deformer.show_viewport = True
+    deformer.show_render = True
+    deformer.strength = strength
+
+    with context.temp_override(object=tgt_obj):
+        if tgt_obj.modifiers.find(deformer.name) != 0:
+            bpy.ops.object.modifier_move_to_index(modifier=deformer.name, index=0)
+
+        if deformer.is_bound and hashes is not None and hashes.get(deformer.name) == bind_hash:
+            return deformer
+
+        # The bind operator toggles, a stale bind is released first
+        if deformer.is_bound:
+            bpy.ops.object.surfacedeform_bind(modifier=deformer.name)
+        deformer.falloff = falloff
+        bpy.ops.object.surfacedeform_bind(modifier=deformer.name)
+
+    if deformer.is_bound:
+        if tgt_obj.get(BIND_HASHES_PROP) is None:
+            tgt_obj[BIND_HASHES_PROP] = dict()
+        tgt_obj[BIND_HASHES_PROP][deformer.name] = bind_hash
+    return deformer
+
+
 def transfer_shape_keys(
         context: bpy.types.Context,
         from_obj: bpy.types.Object,
@@ -18,10 +134,29 @@ def transfer_shape_keys(
         overwrite_shape_keys: bool = False,
         shape_keys: List[str] | None = None,
         bind_noise: tuple | None = None,
-        create_drivers: bool = False
+        create_drivers: bool = False,
+        empty_threshold: float | None = None,
+        skipped_sks: dict | None = None,
+        merge_targets: bool = False,
+        keep_bound_modifiers: bool = False
 ) -> None:
-    
+    """
+    Transfer shape keys with Blender's Surface Deform modifier.
+
+    With merge_targets the targets are joined into one scratch mesh in world
+    space, so the modifier is bound once and every source key is evaluated once
+    for all of them instead of once per target. Only targets with a rigid or
+    uniformly scaled world matrix are merged (the bind is not invariant under
+    non-uniform or negative scale), the others are bound one by one.
+
+    With keep_bound_modifiers the bound modifier of every target is kept
+    disabled after the transfer and reused by later runs, it is rebound only
+    when the source or the target basis or their placement changes. It is not
+    used with bind noise (the noise differs on every run) or merged targets.
+    """
     result = {obj.name: list() for obj in to_objs}
+    if skipped_sks is not None:
+        skipped_sks.update({obj.name: list() for obj in to_objs})
 
     from_obj.show_only_shape_key = False
     for sk in from_obj.data.shape_keys.key_blocks:
@@ -29,91 +164,203 @@ def transfer_shape_keys(
 
     noise_key_name = None
     if bind_noise is not None:
-        min_noise, max_noise = bind_noise
-        # Add a new shape key
-        noise_key = from_obj.shape_key_add(name="DELTA_NOISE", from_mix=False)
-        noise_key_name = noise_key.name
-        from_obj.data.update()
-        # Get the vertex normals from the current shape
-        normals = [vertex.normal for vertex in from_obj.data.vertices]
-        # Apply random offset to each vertex in the shape key
-        for i, vertex in enumerate(noise_key.data):
-            offset = normals[i] * random.uniform(min_noise, max_noise)
-            vertex.co +=  mathutils.Vector(offset)
-        noise_key.value = 1.0   
-    
-    for tgt_obj in to_objs:
-        if tgt_obj is from_obj:
-            continue
+        with profiling.stage('bind_noise'):
+            min_noise, max_noise = bind_noise
+            # Add a new shape key
+            noise_key = from_obj.shape_key_add(name="DELTA_NOISE", from_mix=False)
+            noise_key_name = noise_key.name
+            from_obj.data.update()
+            # Get the vertex normals from the current shape
+            normals = [vertex.normal for vertex in from_obj.data.vertices]
+            # Apply random offset to each vertex in the shape key
+            for i, vertex in enumerate(noise_key.data):
+                offset = normals[i] * random.uniform(min_noise, max_noise)
+                vertex.co +=  mathutils.Vector(offset)
+            noise_key.value = 1.0   
+
+    def remove_noise_key():
+        if noise_key_name:
+            noise_key = from_obj.data.shape_keys.key_blocks.get(noise_key_name)
+            if noise_key is not None:
+                from_obj.shape_key_remove(noise_key)
+
+    src_sks = [
+        sk for sk in from_obj.data.shape_keys.key_blocks[1:]
+        # Skip temp noise shape key
+        if sk.name != noise_key_name and (shape_keys is None or sk.name in shape_keys)
+    ]
+    tgt_objs = [obj for obj in to_objs if obj is not from_obj]
+
+    def store_shape_key(tgt_obj, sk_name, new_co, basis_co, tmp_co):
+        target_sks = tgt_obj.data.shape_keys
+        tgt_sk = target_sks.key_blocks.get(sk_name) if target_sks is not None else None
+
+        if empty_threshold is not None:
+            with profiling.stage('empty_check', items=1):
+                is_empty = max_displacement(new_co, basis_co, tmp_co) <= empty_threshold
+            if is_empty:
+                # Do not create empty keys (the existing key would be overwritten with an empty one)
+                with profiling.stage('remove_empty', items=1):
+                    if overwrite_shape_keys and tgt_sk is not None:
+                        tgt_obj.shape_key_remove(tgt_sk)
+                if skipped_sks is not None:
+                    skipped_sks[tgt_obj.name].append(sk_name)
+                return
+
+        with profiling.stage('write', items=1):
+            if not overwrite_shape_keys or tgt_sk is None:
+                if target_sks is None:
+                    tgt_obj.shape_key_add(name='Basis', from_mix=False)
+                tgt_sk = tgt_obj.shape_key_add(name=sk_name, from_mix=False)
+            # Existing keys are written in place so the key order is kept
+            tgt_sk.data.foreach_set('co', new_co.ravel())
+
+        if create_drivers:
+            with profiling.stage('drivers', items=1):
+                shape_key_add_binding_driver(
+                    sk=tgt_sk,
+                    src_obj=from_obj,
+                    src_sk_name=sk_name
+                )
+
+        result[tgt_obj.name].append(tgt_sk.name)
+
+    separate_objs = tgt_objs
+    if merge_targets:
+        merged_objs = [obj for obj in tgt_objs if is_uniformly_scaled(obj.matrix_world)]
+        if len(merged_objs) > 1:
+            try:
+                transfer_merged(context, from_obj, merged_objs, src_sks, falloff, strength, store_shape_key)
+            except IsNotBoundException:
+                remove_noise_key()
+                raise
+            separate_objs = [obj for obj in tgt_objs if obj not in merged_objs]
+
+    for tgt_obj in separate_objs:
         tgt_obj_show_only_shape_key = tgt_obj.show_only_shape_key
         tgt_obj_active_shape_key_index = tgt_obj.active_shape_key_index
         tgt_obj.active_shape_key_index = 0
         tgt_obj.show_only_shape_key = True
 
-        deformer = tgt_obj.modifiers.new(name='surface defrom', type='SURFACE_DEFORM')
-        deformer.target = from_obj
-        deformer.falloff = falloff
-        deformer.strength = strength
-
-        with context.temp_override(object=tgt_obj):
-            bpy.ops.object.modifier_move_to_index(modifier=deformer.name, index=0)
-            bpy.ops.object.surfacedeform_bind(modifier=deformer.name)
+        keep_deformer = keep_bound_modifiers and noise_key_name is None
+        with profiling.stage('bind', items=len(tgt_obj.data.vertices)):
+            if keep_deformer:
+                deformer = get_kept_surface_deform(context, tgt_obj, from_obj, falloff, strength)
+            else:
+                deformer = bind_surface_deform(context, tgt_obj, from_obj, falloff, strength)
 
         if not deformer.is_bound:
             # Remove Noise Shape Key
-            if noise_key_name:
-                index = from_obj.data.shape_keys.key_blocks.find(noise_key_name)
-                if index > 0:
-                    from_obj.active_shape_key_index = index
-                    bpy.ops.object.shape_key_remove()
+            remove_noise_key()
             tgt_obj.modifiers.remove(deformer)
             raise IsNotBoundException()
-        
-        for sk in from_obj.data.shape_keys.key_blocks[1:]:
-            # Skip temp noise shape key
-            if sk.name == noise_key_name:
-                continue
-            if shape_keys is not None and sk.name not in shape_keys:
-                continue
-            
-            sk.value = 1.0
-            deformer.name = sk.name
-            if overwrite_shape_keys:
-                target_sks = tgt_obj.data.shape_keys
-                if target_sks is not None and sk.name in target_sks.key_blocks.keys():
-                    sk_index = target_sks.key_blocks.keys().index(sk.name)
-                    tgt_obj.active_shape_key_index = sk_index
-                    with context.temp_override(object=tgt_obj):
-                        bpy.ops.object.shape_key_remove()
-
-            with context.temp_override(object=tgt_obj):
-                bpy.ops.object.modifier_apply_as_shapekey(
-                    keep_modifier=True,
-                    modifier=deformer.name,
-                    report=False
-                )
-            sk.value = 0.0
 
-            new_sk = tgt_obj.data.shape_keys.key_blocks[-1]
-            
-            if create_drivers:
-                shape_key_add_binding_driver(
-                    sk=new_sk,
-                    src_obj=from_obj,
-                    src_sk_name=sk.name
-                )
+        basis_co = np.empty((len(tgt_obj.data.vertices), 3), dtype=np.float32)
+        tgt_obj.data.vertices.foreach_get('co', basis_co.ravel())
+        new_co = np.empty_like(basis_co)
+        tmp_co = np.empty_like(basis_co)
 
-            result[tgt_obj.name].append(new_sk.name)
+        # Only the deformer may change the evaluated coordinates
+        modifier_states = [(mod, mod.show_viewport) for mod in tgt_obj.modifiers if mod != deformer]
+        for mod, _ in modifier_states:
+            mod.show_viewport = False
+        try:
+            for sk in src_sks:
+                with profiling.stage('evaluate', items=1):
+                    sk.value = 1.0
+                    read_evaluated_coordinates(context, tgt_obj, new_co)
+                    sk.value = 0.0
+                store_shape_key(tgt_obj, sk.name, new_co, basis_co, tmp_co)
+        finally:
+            for mod, show_viewport in modifier_states:
+                mod.show_viewport = show_viewport
 
         tgt_obj.active_shape_key_index = tgt_obj_active_shape_key_index
         tgt_obj.show_only_shape_key = tgt_obj_show_only_shape_key
-        tgt_obj.modifiers.remove(deformer)
+        if keep_deformer:
+            deformer.show_viewport = False
+            deformer.show_render = False
+            deformer.show_expanded = False
+        else:
+            tgt_obj.modifiers.remove(deformer)
 
     # Remove Noise Shape Key
-    if noise_key_name:
-        index = from_obj.data.shape_keys.key_blocks.find(noise_key_name)
-        if index > 0:
-            from_obj.active_shape_key_index = index
-            bpy.ops.object.shape_key_remove()
+    remove_noise_key()
 
     return result
+
+
+def is_uniformly_scaled(matrix: mathutils.Matrix, tolerance: float = 1e-5) -> bool:
+    """
+    Whether a matrix is a rotation with a positive uniform scale and a translation.
+    """
+    linear = np.array(matrix, dtype=np.float64)[:3, :3]
+    if np.linalg.det(linear) <= 0.0:
+        return False
+    gram = linear.T @ linear
+    scale = np.trace(gram) / 3.0
+    return np.allclose(gram, np.eye(3) * scale, rtol=0.0, atol=tolerance * scale)
+
+
+def transfer_merged(
+        context: bpy.types.Context,
+        from_obj: bpy.types.Object,
+        tgt_objs: List[bpy.types.Object],
+        src_sks: list,
+        falloff: float,
+        strength: float,
+        store_shape_key
+) -> None:
+    """
+    Transfer shape keys to several targets through one scratch mesh.
+
+    Target vertices are joined in world space into a vertex-only scratch object
+    with a known vertex range per target. The scratch object is bound once, every
+    source key is evaluated once and the vertex ranges are mapped back into the
+    local space of their targets and passed to store_shape_key.
+
+    The targets must be rigid or uniformly scaled (see is_uniformly_scaled) to
+    give the same result as binding them one by one.
+    """
+    counts = [len(obj.data.vertices) for obj in tgt_objs]
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    world_co = np.empty((offsets[-1], 3), dtype=np.float32)
+
+    basis_co = dict()
+    tmp_co = dict()
+    to_local = dict()
+    for obj, start, stop in zip(tgt_objs, offsets[:-1], offsets[1:]):
+        co = np.empty((stop - start, 3), dtype=np.float32)
+        obj.data.vertices.foreach_get('co', co.ravel())
+        basis_co[obj.name] = co
+        tmp_co[obj.name] = np.empty_like(co)
+        matrix = np.array(obj.matrix_world, dtype=np.float64)
+        world_co[start:stop] = co @ matrix[:3, :3].T + matrix[:3, 3]
+        to_local[obj.name] = np.array(obj.matrix_world.inverted(), dtype=np.float64)
+
+    with profiling.stage('merge', items=len(world_co)):
+        mesh = bpy.data.meshes.new('SKW_merged_targets')
+        mesh.vertices.add(len(world_co))
+        mesh.vertices.foreach_set('co', world_co.ravel())
+        mesh.update()
+        scratch = bpy.data.objects.new(mesh.name, mesh)
+        context.scene.collection.objects.link(scratch)
+    try:
+        with profiling.stage('bind', items=len(world_co)):
+            deformer = bind_surface_deform(context, scratch, from_obj, falloff, strength)
+        if not deformer.is_bound:
+            raise IsNotBoundException()
+
+        new_world_co = np.empty_like(world_co)
+        for sk in src_sks:
+            with profiling.stage('evaluate', items=1):
+                sk.value = 1.0
+                read_evaluated_coordinates(context, scratch, new_world_co)
+                sk.value = 0.0
+            for obj, start, stop in zip(tgt_objs, offsets[:-1], offsets[1:]):
+                matrix = to_local[obj.name]
+                new_co = (new_world_co[start:stop] @ matrix[:3, :3].T + matrix[:3, 3]).astype(np.float32)
+                store_shape_key(obj, sk.name, new_co, basis_co[obj.name], tmp_co[obj.name])
+    finally:
+        bpy.data.objects.remove(scratch)
+        bpy.data.meshes.remove(mesh)
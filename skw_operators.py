@@ -1,11 +1,27 @@
+import os
 import bpy
 import traceback
+from contextlib import nullcontext
 from .functions.bind_drivers import bind_shape_key_values, remove_shape_key_drivers
 from .functions.remove_empty_shape_keys import remove_empty_shape_keys
 from .functions.transfer_shape_keys import transfer_shape_keys, IsNotBoundException
 from .functions.smooth_shape_keys import smooth_shape_keys
-from .functions.surface_deform import transfer_shapekeys
+from .functions.surface_deform import (
+    transfer_shapekeys_to_objects,
+    save_surface_binding,
+    binding_file_path,
+    SurfaceSource
+)
 from .functions.restore_details import restore_details
+from .functions import profiling
+from .core.binding_cache import binding_cache
+from .farm import transfer_shape_keys_farm
+from .functions.incremental_sync import (
+    shape_key_hashes,
+    sync_context_hash,
+    find_changed_shape_keys,
+    record_synced_shape_keys
+)
 
 
 REFRESH_LIST_OPTION = [
@@ -31,6 +47,162 @@ class ObjectShapeKeyState:
         obj.active_shape_key_index = self.shape_key_index
 
 
+def operator_profile(skw: bpy.types.PropertyGroup, name: str):
+    """
+    Profiling session of an operator run if stage profiling is enabled (see functions.profiling).
+    """
+    if not skw.profile_stages:
+        return nullcontext()
+    return profiling.profile_session(
+        name,
+        trace_memory=skw.profile_memory,
+        filepath=bpy.path.abspath(skw.profile_report_path) if skw.profile_report_path else None
+    )
+
+
+def transfer_to_targets(
+        context: bpy.types.Context,
+        skw: bpy.types.PropertyGroup,
+        active: bpy.types.Object,
+        tgt_objs: list,
+        shape_keys: list | None,
+        overwrite_shape_keys: bool,
+        empty_threshold: float | None,
+        skipped_sks: dict
+) -> dict:
+    if skw.farm_workers > 1:
+        report = list()
+        created_sks = transfer_shape_keys_farm(
+            context=context,
+            src_obj=active,
+            tgt_objs=tgt_objs,
+            job_settings=farm_job_settings(skw, empty_threshold),
+            shape_keys=shape_keys,
+            overwrite_shape_keys=overwrite_shape_keys,
+            create_drivers=skw.bind_drivers,
+            workers=skw.farm_workers,
+            keys_per_job=skw.farm_keys_per_job,
+            retries=skw.farm_retries,
+            skipped_sks=skipped_sks,
+            report=report
+        )
+        for job in report:
+            print(f"{job['target']}: {job['keys']} shape keys in {job['seconds']:.2f} s, {job['attempts']} attempts")
+        return created_sks
+
+    if skw.surface_deform_method == 'SQUEEZY_PIXELS':
+        cache = None
+        if skw.use_binding_cache:
+            cache = binding_cache
+            cache.max_bytes = skw.binding_cache_size * 1024 * 1024
+            cache.shrink()
+
+        created_sks = transfer_shapekeys_to_objects(
+            context=context,
+            tgt_objs=tgt_objs,
+            src_obj=active,
+            shape_keys=shape_keys,
+            overwrite_shape_keys=overwrite_shape_keys,
+            key_block_size=skw.sp_key_block_size,
+            cache=cache,
+            binding_dir=skw.binding_dir if skw.use_binding_files else None,
+            search=skw.sp_nearest_search,
+            workers=skw.sp_bind_workers,
+            threads=skw.sp_deform_threads,
+            empty_threshold=empty_threshold,
+            skipped_sks=skipped_sks,
+            sparse=skw.sp_sparse_update
+        )
+
+        # Create drivers if necessary
+        if skw.bind_drivers:
+            for obj in tgt_objs:
+                with profiling.stage('drivers', items=len(created_sks[obj.name])):
+                    bind_shape_key_values(context, obj, active, created_sks[obj.name])
+    else:
+        created_sks = transfer_shape_keys(
+            context=context,
+            from_obj=active,
+            to_objs=tgt_objs,
+            falloff=skw.sd_falloff,
+            strength=skw.sd_strength,
+            overwrite_shape_keys=overwrite_shape_keys,
+            shape_keys=shape_keys,
+            bind_noise=(skw.min_noise, skw.max_noise) if skw.use_bind_noise else None,
+            create_drivers=skw.bind_drivers,
+            empty_threshold=empty_threshold,
+            skipped_sks=skipped_sks,
+            merge_targets=skw.sd_merge_targets,
+            keep_bound_modifiers=skw.sd_keep_bound_modifiers
+        )
+    return created_sks
+
+
+def farm_job_settings(skw: bpy.types.PropertyGroup, empty_threshold: float | None) -> dict:
+    """
+    Method parameters of the worker jobs (see cli.JOB_DEFAULTS).
+    """
+    return dict(
+        method=skw.surface_deform_method,
+        empty_threshold=empty_threshold,
+        key_block_size=skw.sp_key_block_size,
+        search=skw.sp_nearest_search,
+        # Parallelism comes from the worker processes
+        workers=1,
+        threads=1,
+        sparse=skw.sp_sparse_update,
+        binding_dir=bpy.path.abspath(skw.binding_dir) if skw.use_binding_files else None,
+        falloff=skw.sd_falloff,
+        strength=skw.sd_strength,
+        bind_noise=[skw.min_noise, skw.max_noise] if skw.use_bind_noise else None
+    )
+
+
+def transfer_settings(skw: bpy.types.PropertyGroup) -> dict:
+    """
+    Settings that change the transferred shape keys (all of them are re-transferred when these change).
+    """
+    settings = dict(
+        method=skw.surface_deform_method,
+        empty_threshold=skw.empty_threshold if skw.remove_empty_shape_keys else None
+    )
+    if skw.surface_deform_method == 'SQUEEZY_PIXELS':
+        settings.update(search=skw.sp_nearest_search)
+    else:
+        settings.update(falloff=skw.sd_falloff, strength=skw.sd_strength)
+    if skw.smooth_shape_keys:
+        settings.update(
+            cs_factor=skw.cs_factor,
+            cs_iterations=skw.cs_iterations,
+            cs_scale=skw.cs_scale,
+            cs_smooth_type=skw.cs_smooth_type
+        )
+    return settings
+
+
+def plan_incremental_transfer(
+        skw: bpy.types.PropertyGroup,
+        active: bpy.types.Object,
+        tgt_objs: list,
+        shape_keys: list | None
+) -> tuple:
+    """
+    Find the shape keys to transfer to every target since the last sync.
+
+    Returns:
+        tuple: Source key hashes, context hash by target name and the names of
+            the new or changed shape keys by target name.
+    """
+    src_hashes = shape_key_hashes(active, shape_keys)
+    settings = transfer_settings(skw)
+    context_hashes = {obj.name: sync_context_hash(active, obj, src_hashes, **settings) for obj in tgt_objs}
+    changed_sks = {
+        obj.name: find_changed_shape_keys(active, obj, src_hashes, context_hashes[obj.name])
+        for obj in tgt_objs
+    }
+    return src_hashes, context_hashes, changed_sks
+
+
 # gets called from SKW_OT_transfer_shape_keys(bpy.types.Operator):
 def execute_shape_key_wrap(self, context: bpy.types.Context) -> None:
     active = context.active_object
@@ -41,63 +213,89 @@ def execute_shape_key_wrap(self, context: bpy.types.Context) -> None:
     skw = context.scene.skw_prop   
     
     shape_keys = skw_sk_list.get_enabled_list() if skw.use_shape_key_list else None
+    # New empty keys are skipped during the transfer instead of being created and removed afterwards
+    empty_threshold = skw.empty_threshold if skw.remove_empty_shape_keys else None
+    skipped_sks = dict()
 
-    if skw.surface_deform_method == 'SQUEEZY_PIXELS':
-        created_sks = dict()
+    if skw.incremental_transfer:
+        with profiling.stage('plan'):
+            src_hashes, context_hashes, changed_sks = plan_incremental_transfer(skw, active, tgt_objs, shape_keys)
+
+        # Targets with the same changed keys are transferred together
+        groups = dict()
         for obj in tgt_objs:
-            created_sks_for_obj = transfer_shapekeys(
-                context=context,
-                tgt_obj=obj,
-                src_obj=active,
-                shape_keys=shape_keys,
-                overwrite_shape_keys=skw.overwrite_shape_keys
-            )
-            created_sks[obj.name] = created_sks_for_obj
+            groups.setdefault(tuple(changed_sks[obj.name]), []).append(obj)
 
-            if not skw.bind_drivers:
+        created_sks = {obj.name: [] for obj in tgt_objs}
+        for sk_names, objs in groups.items():
+            if not sk_names:
                 continue
-            # Create drivers if necessary
-            bind_shape_key_values(context, obj, active, created_sks_for_obj)
+            group_skipped_sks = dict()
+            with profiling.stage('transfer', items=len(sk_names) * len(objs)):
+                created_sks.update(transfer_to_targets(
+                    context, skw, active, objs, list(sk_names),
+                    # Changed keys are updated in place
+                    overwrite_shape_keys=True,
+                    empty_threshold=empty_threshold,
+                    skipped_sks=group_skipped_sks
+                ))
+            skipped_sks.update(group_skipped_sks)
+
+        for obj in tgt_objs:
+            record_synced_shape_keys(
+                obj, src_hashes,
+                synced_sks=created_sks[obj.name],
+                skipped_sks=skipped_sks.get(obj.name, []),
+                context_hash=context_hashes[obj.name]
+            )
+        updated_count = sum(len(names) for names in changed_sks.values())
+        self.report({'INFO'}, f"Updated {updated_count} new or changed shape keys on {len(tgt_objs)} objects")
     else:
-        created_sks = transfer_shape_keys(
-            context=context,
-            from_obj=active,
-            to_objs=tgt_objs,
-            falloff=skw.sd_falloff,
-            strength=skw.sd_strength,
-            overwrite_shape_keys=skw.overwrite_shape_keys,
-            shape_keys=shape_keys,
-            bind_noise=(skw.min_noise, skw.max_noise) if skw.use_bind_noise else None,
-            create_drivers=skw.bind_drivers
-        )
-        
+        sk_count = len(shape_keys) if shape_keys is not None else len(active.data.shape_keys.key_blocks) - 1
+        with profiling.stage('transfer', items=sk_count * len(tgt_objs)):
+            created_sks = transfer_to_targets(
+                context, skw, active, tgt_objs, shape_keys,
+                overwrite_shape_keys=skw.overwrite_shape_keys,
+                empty_threshold=empty_threshold,
+                skipped_sks=skipped_sks
+            )
 
-    # Optionally remove empty shape keys
+    skipped_count = sum(len(names) for names in skipped_sks.values())
     if skw.remove_empty_shape_keys:
-        nullshapekeysdeleted = 0
-        for obj in tgt_objs:
-            res = remove_empty_shape_keys(context, obj, skw.empty_threshold, shape_keys)
-            nullshapekeysdeleted += res
-        
-        if nullshapekeysdeleted == 0:
+        # Empty keys of the transferred names that were already on the targets (not written
+        # by this transfer, e.g. without overwriting) are still removed afterwards
+        src_names = shape_keys if shape_keys is not None else [sk.name for sk in active.data.shape_keys.key_blocks[1:]]
+        removed_count = 0
+        with profiling.stage('remove_empty'):
+            for obj in tgt_objs:
+                written = set(created_sks[obj.name])
+                existing = [sk_name for sk_name in src_names if sk_name not in written]
+                removed_count += remove_empty_shape_keys(context, obj, skw.empty_threshold, existing)
+
+        deleted_count = skipped_count + removed_count
+        if deleted_count == 0:
             self.report({'INFO'}, f"No shape keys deleted. All keys have displacement above threshold.")
         else:
-            self.report({'INFO'}, f"Deleted {nullshapekeysdeleted} shape keys with displacement below {skw.empty_threshold:.6f}")
+            self.report({'INFO'}, f"Deleted {deleted_count} shape keys with displacement below {skw.empty_threshold:.6f}")
+    elif skipped_count:
+        # Sparse update skips keys that move no bound source vertex
+        self.report({'INFO'}, f"Skipped {skipped_count} shape keys that move no bound vertex")
             
     # Optionally smooth transferred shape keys
     if skw.smooth_shape_keys:
         for obj in tgt_objs:
             sks_to_smooth = created_sks[obj.name]
-            smooth_shape_keys(
-                context,
-                obj,
-                factor=skw.cs_factor,
-                iterations=skw.cs_iterations,
-                scale=skw.cs_scale,
-                smooth_type=skw.cs_smooth_type,
-                overwrite_shape_keys=True,
-                shape_keys=sks_to_smooth
-            )
+            with profiling.stage('smooth', items=len(sks_to_smooth)):
+                smooth_shape_keys(
+                    context,
+                    obj,
+                    factor=skw.cs_factor,
+                    iterations=skw.cs_iterations,
+                    scale=skw.cs_scale,
+                    smooth_type=skw.cs_smooth_type,
+                    overwrite_shape_keys=True,
+                    shape_keys=sks_to_smooth
+                )
     
 
 def skw_poll(context: bpy.types.Context):
@@ -141,7 +339,8 @@ class SKW_OT_transfer_shape_keys(bpy.types.Operator):
         from_obj = context.active_object
         active_sk_state = ObjectShapeKeyState(from_obj)
         try:
-            execute_shape_key_wrap(self, context)
+            with operator_profile(context.scene.skw_prop, 'Transfer Shape Keys'):
+                execute_shape_key_wrap(self, context)
             active_sk_state.restore(from_obj)
         except IsNotBoundException:
             # Restore shape key values, active etc.
@@ -157,6 +356,93 @@ class SKW_OT_transfer_shape_keys(bpy.types.Operator):
         return {"FINISHED"}
     
 
+class SKW_OT_clear_binding_cache(bpy.types.Operator):
+    bl_idname = 'shape_key_wrap.clear_binding_cache'
+    bl_label = 'Clear Binding Cache'
+    bl_description = 'Free all the cached Squeezy Pixels bindings and reset the cache counters'
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        binding_cache.clear()
+        return {'FINISHED'}
+
+
+class SKW_OT_export_bindings(bpy.types.Operator):
+    bl_idname = 'shape_key_wrap.export_bindings'
+    bl_label = 'Export Bindings'
+    bl_description = (
+        'Bind selected objects to the active object (Squeezy Pixels method) and save '
+        'the bindings to the binding directory'
+    )
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        result, _ = skw_poll(context)
+        return result
+
+    def execute(self, context):
+        try:
+            active = context.active_object
+            skw = context.scene.skw_prop
+            directory = bpy.path.abspath(skw.binding_dir)
+            os.makedirs(directory, exist_ok=True)
+
+            cache = binding_cache if skw.use_binding_cache else None
+            source = SurfaceSource(active)
+            tgt_objs = [obj for obj in context.selected_objects if obj is not active]
+            for obj in tgt_objs:
+                save_surface_binding(
+                    active, obj, binding_file_path(directory, active, obj),
+                    cache=cache, source=source, search=skw.sp_nearest_search,
+                    workers=skw.sp_bind_workers
+                )
+            self.report({'INFO'}, f'Exported {len(tgt_objs)} bindings to {directory}')
+        except Exception as ex:
+            self.report({"ERROR"}, str(ex))
+            print(traceback.format_exc())
+            return {"CANCELLED"}
+        return {"FINISHED"}
+
+
+class SKW_OT_report_changed_shape_keys(bpy.types.Operator):
+    bl_idname = 'shape_key_wrap.report_changed_shape_keys'
+    bl_label = 'Report Changes'
+    bl_description = (
+        'Report the shape keys an incremental transfer would update on the selected objects '
+        'without transferring anything'
+    )
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        result, _ = skw_poll(context)
+        return result
+
+    def execute(self, context):
+        try:
+            active = context.active_object
+            skw = context.scene.skw_prop
+            tgt_objs = [obj for obj in context.selected_objects if obj is not active]
+            shape_keys = active.data.skw_sk_list.get_enabled_list() if skw.use_shape_key_list else None
+
+            _, _, changed_sks = plan_incremental_transfer(skw, active, tgt_objs, shape_keys)
+            for obj_name, sk_names in changed_sks.items():
+                print(f'{obj_name}: {len(sk_names)} shape keys to update')
+                for sk_name in sk_names:
+                    print(f'    {sk_name}')
+            updated_count = sum(len(names) for names in changed_sks.values())
+            self.report({'INFO'}, (
+                f'{updated_count} new or changed shape keys on {len(tgt_objs)} objects '
+                '(see the system console for the list)'
+            ))
+        except Exception as ex:
+            self.report({"ERROR"}, str(ex))
+            print(traceback.format_exc())
+            return {"CANCELLED"}
+        return {"FINISHED"}
+
+
 # gets called when transfer button clicked
 class SKW_OT_restore_original_details(bpy.types.Operator):
     bl_idname = "shape_key_wrap.restore_original_details"
@@ -184,17 +470,18 @@ class SKW_OT_restore_original_details(bpy.types.Operator):
                 skw_sk_list = obj.data.skw_sk_list   
             
                 shape_keys = skw_sk_list.get_enabled_list() if skw.use_shape_key_list else None
-            restore_details(
-                context=context,
-                obj=obj,
-                vertex_group=skw.rd_vertex_group,
-                factor=skw.rd_cs_factor,
-                iterations=skw.rd_cs_iterations,
-                scale=skw.rd_cs_scale,
-                smooth_type=skw.rd_cs_smooth_type,
-                overwrite_shape_keys=skw.overwrite_shape_keys,
-                shape_keys=shape_keys
-            )
+            with operator_profile(skw, 'Restore Details'):
+                restore_details(
+                    context=context,
+                    obj=obj,
+                    vertex_group=skw.rd_vertex_group,
+                    factor=skw.rd_cs_factor,
+                    iterations=skw.rd_cs_iterations,
+                    scale=skw.rd_cs_scale,
+                    smooth_type=skw.rd_cs_smooth_type,
+                    overwrite_shape_keys=skw.overwrite_shape_keys,
+                    shape_keys=shape_keys
+                )
             active_sk_state.restore(obj)
         except Exception as ex:
             self.report({"ERROR"}, str(ex))
@@ -271,8 +558,10 @@ class SKW_OT_bind_shape_key_values(bpy.types.Operator):
 
             shape_keys = skw_sk_list.get_enabled_list() if skw.use_shape_key_list else None
             
-            for tgt_obj in tgt_objs:
-                bind_shape_key_values(context, tgt_obj, from_obj, shape_keys)
+            with operator_profile(skw, 'Add Drivers'):
+                for tgt_obj in tgt_objs:
+                    with profiling.stage('drivers'):
+                        bind_shape_key_values(context, tgt_obj, from_obj, shape_keys)
             
             active_sk_state.restore(from_obj)
         except Exception as ex:
@@ -356,7 +645,9 @@ class SKW_OT_remove_empty_shape_keys(bpy.types.Operator):
 
             shape_keys = skw_sk_list.get_enabled_list() if skw.use_shape_key_list else None
 
-            remove_empty_shape_keys(context, obj, self.empty_threshold, shape_keys)
+            with operator_profile(skw, 'Remove Empty Shape Keys'):
+                with profiling.stage('remove_empty'):
+                    remove_empty_shape_keys(context, obj, self.empty_threshold, shape_keys)
 
             bpy.ops.shape_key_wrap.refresh_list(action='REFRESH')
         except Exception as ex:
@@ -396,16 +687,17 @@ class SKW_OT_smooth_shape_keys(bpy.types.Operator):
 
             shape_keys = skw_sk_list.get_enabled_list() if skw.use_shape_key_list else None
 
-            smooth_shape_keys(
-                context,
-                obj,
-                factor=skw.cs_factor,
-                iterations=skw.cs_iterations,
-                scale=skw.cs_scale,
-                smooth_type=skw.cs_smooth_type,
-                overwrite_shape_keys=skw.overwrite_shape_keys,
-                shape_keys=shape_keys
-            )
+            with operator_profile(skw, 'Smooth Shape Keys'):
+                smooth_shape_keys(
+                    context,
+                    obj,
+                    factor=skw.cs_factor,
+                    iterations=skw.cs_iterations,
+                    scale=skw.cs_scale,
+                    smooth_type=skw.cs_smooth_type,
+                    overwrite_shape_keys=skw.overwrite_shape_keys,
+                    shape_keys=shape_keys
+                )
 
             bpy.ops.shape_key_wrap.refresh_list(action='REFRESH')
         except Exception as ex:
@@ -418,6 +710,9 @@ class SKW_OT_smooth_shape_keys(bpy.types.Operator):
 
 CLASSES = [
     SKW_OT_transfer_shape_keys,
+    SKW_OT_clear_binding_cache,
+    SKW_OT_export_bindings,
+    SKW_OT_report_changed_shape_keys,
     SKW_OT_refresh_shape_keys,
     SKW_OT_bind_shape_key_values,
     SKW_OT_remove_drivers,
@@ -7,8 +7,13 @@ from .skw_operators import (
     SKW_OT_remove_empty_shape_keys,
     SKW_OT_smooth_shape_keys,
     SKW_OT_restore_original_details,
+    SKW_OT_clear_binding_cache,
+    SKW_OT_export_bindings,
+    SKW_OT_report_changed_shape_keys,
     skw_poll
 )
+from .core.binding_cache import binding_cache
+from .functions import profiling
 from .skw_validate_mesh import (
     SKW_OT_validate_edges,
     SKW_OT_validate_faces
@@ -103,12 +108,59 @@ class SKW_PT_object_mode(bpy.types.Panel):
 
                 col.prop(skw, 'sd_falloff', text='Falloff')
                 col.prop(skw, 'sd_strength', text='Strength')
+                col.prop(skw, 'sd_merge_targets', text='Merge Targets')
+                if not skw.sd_merge_targets:
+                    col.prop(skw, 'sd_keep_bound_modifiers', text='Keep Bound Modifiers')
+            else:
+                col.prop(skw, 'sp_nearest_search', text='Search')
+                if skw.sp_nearest_search == 'GRID':
+                    col.prop(skw, 'sp_bind_workers', text='Workers')
+                col.prop(skw, 'sp_key_block_size', text='Key Block Size')
+                col.prop(skw, 'sp_deform_threads', text='Deform Threads')
+                col.prop(skw, 'sp_sparse_update', text='Sparse Update')
+                if skw.use_binding_cache:
+                    cache_box = col.box()
+                    cache_box.prop(skw, 'use_binding_cache', text='Cache Bindings')
+                    cache_box.prop(skw, 'binding_cache_size', text='Size (MB)')
+                    sub_col = cache_box.column(align=True)
+                    sub_col.label(text=(
+                        f'{len(binding_cache)} bindings, '
+                        f'{binding_cache.nbytes / (1024 * 1024):.1f} MB'
+                    ))
+                    sub_col.label(text=(
+                        f'Hits: {binding_cache.hits}  Misses: {binding_cache.misses}  '
+                        f'Evicted: {binding_cache.evictions}'
+                    ))
+                    cache_box.operator(SKW_OT_clear_binding_cache.bl_idname, text='Clear Cache', icon='TRASH')
+                else:
+                    col.prop(skw, 'use_binding_cache', text='Cache Bindings')
+
+                files_box = col.box()
+                files_box.prop(skw, 'use_binding_files', text='Use Binding Files')
+                files_box.prop(skw, 'binding_dir', text='')
+                files_box.operator(SKW_OT_export_bindings.bl_idname, text='Export Bindings', icon='EXPORT')
                     
             col.separator()
             col.label(text='Additional Parameters')    
             col.prop(skw, 'bind_drivers', text='Add Drivers')
             
             col.prop(skw, 'overwrite_shape_keys', text='!Overwrite Shape Keys')
+
+            if skw.incremental_transfer:
+                sync_box = col.box()
+                sync_box.prop(skw, 'incremental_transfer', text='Only Changed Keys')
+                sync_box.operator(SKW_OT_report_changed_shape_keys.bl_idname, text='Report Changes', icon='INFO')
+            else:
+                col.prop(skw, 'incremental_transfer', text='Only Changed Keys')
+
+            if skw.farm_workers > 1:
+                farm_box = col.box()
+                farm_box.prop(skw, 'farm_workers', text='Worker Processes')
+                sub_col = farm_box.column(align=True)
+                sub_col.prop(skw, 'farm_keys_per_job', text='Keys Per Job')
+                sub_col.prop(skw, 'farm_retries', text='Retries')
+            else:
+                col.prop(skw, 'farm_workers', text='Worker Processes')
             
             if skw.remove_empty_shape_keys:
                 
@@ -208,6 +260,18 @@ class SKW_PT_object_mode(bpy.types.Panel):
             sub_col.operator(SKW_OT_validate_edges.bl_idname, text='Check Edges (3+ linked faces)', icon='EDGESEL')
             sub_col.operator(SKW_OT_validate_faces.bl_idname, text='Check Faces (Concave)', icon='FACESEL')
 
+            # Profiling block
+            sub_box = box.box()
+            sub_box.label(text='Profiling:', icon='TIME')
+            sub_box.prop(skw, 'profile_stages', text='Profile Stages')
+            if skw.profile_stages:
+                sub_box.prop(skw, 'profile_memory', text='Trace Memory')
+                sub_box.prop(skw, 'profile_report_path', text='')
+                if profiling.last_report is not None:
+                    sub_col = sub_box.column(align=True)
+                    for line in profiling.format_report(profiling.last_report):
+                        sub_col.label(text=line)
+
 
         
         box = layout.box()
@@ -7,6 +7,11 @@ SMOOTH_TYPES = [
     ('LENGTH_WEIGHTED', 'Length Weight', 'Use the average of adjacent edge-vertices weighted by their length', 2)
 ]
 
+NEAREST_SEARCH_METHODS = [
+    ('BVH', 'BVH Tree', "Blender's BVH tree queried vertex by vertex (reference implementation)", 1),
+    ('GRID', 'NumPy Grid', 'Uniform grid over the source triangles queried for all vertices at once', 2)
+]
+
 SURFACE_DEFORM_METHODS = [
     ('BLENDER', 'Blender', "Standard Blender's Surface Deform Modifier", 1),
     ('SQUEEZY_PIXELS', 'Squeezy Pixels', "Custom Surface Deform Modifier by Squeezy Pixels (Mykyta Petrenko)", 2)
@@ -134,6 +139,33 @@ class SKW_Property(bpy.types.PropertyGroup):
         default=False
     )
 
+    farm_workers: bpy.props.IntProperty(
+        name='Worker Processes',
+        description=(
+            'Transfer to the target objects in this many background Blender processes at once '
+            '(the scene is saved to a temporary copy for them). 1 transfers in this Blender'
+        ),
+        default=1, min=1, max=64
+    )
+    farm_keys_per_job: bpy.props.IntProperty(
+        name='Keys Per Job',
+        description='Split the shape keys of every target between worker jobs of this size (0 to not split)',
+        default=0, min=0
+    )
+    farm_retries: bpy.props.IntProperty(
+        name='Retries',
+        description='Number of times a failed worker job is restarted',
+        default=1, min=0, max=10
+    )
+    incremental_transfer: bpy.props.BoolProperty(
+        name='Only Changed Keys',
+        description=(
+            'Transfer only the shape keys that are new or changed since the last transfer to each '
+            'target object. Changed keys are overwritten in place, unchanged keys are left untouched'
+        ),
+        default=False
+    )
+
     smooth_shape_keys: bpy.props.BoolProperty(
         name='Smooth Shape Keys',
         description=(
@@ -141,6 +173,73 @@ class SKW_Property(bpy.types.PropertyGroup):
         ),
         default=False
     )
+    sp_nearest_search: bpy.props.EnumProperty(
+        items=NEAREST_SEARCH_METHODS,
+        name='Nearest Search',
+        description='Spatial index used by the Squeezy Pixels method to find the nearest source triangle',
+        default='BVH'
+    )
+    sp_bind_workers: bpy.props.IntProperty(
+        name='Bind Workers',
+        description=(
+            'Number of processes binding the target vertices with the NumPy Grid search. '
+            'Results are identical to binding in a single process. '
+            'Only used with the Grid search, the BVH search always binds in one process'
+        ),
+        default=1, min=1, max=256
+    )
+    sp_key_block_size: bpy.props.IntProperty(
+        name='Key Block Size',
+        description=(
+            'Number of shape keys deformed at once by the Squeezy Pixels method. '
+            'Bigger blocks are faster but use more memory'
+        ),
+        default=32, min=1, max=1024
+    )
+    use_binding_cache: bpy.props.BoolProperty(
+        name='Cache Bindings',
+        description=(
+            'Keep Squeezy Pixels bindings in memory and reuse them while the source '
+            'and target basis shapes do not change'
+        ),
+        default=True
+    )
+    binding_cache_size: bpy.props.IntProperty(
+        name='Cache Size (MB)',
+        description='Memory budget of the binding cache. Least recently used bindings are evicted first',
+        default=512, min=1, max=65536
+    )
+    use_binding_files: bpy.props.BoolProperty(
+        name='Use Binding Files',
+        description=(
+            'Load Squeezy Pixels bindings exported to the binding directory instead of binding '
+            'from scratch. Files saved before the source or the target rest shape changed are ignored'
+        ),
+        default=False
+    )
+    binding_dir: bpy.props.StringProperty(
+        name='Binding Directory',
+        description='Directory the Squeezy Pixels bindings are exported to and loaded from',
+        subtype='DIR_PATH',
+        default='//skw_bindings/'
+    )
+    sp_deform_threads: bpy.props.IntProperty(
+        name='Deform Threads',
+        description=(
+            'Number of threads deforming shape keys with the Squeezy Pixels method. '
+            'Shape keys are still written into the target objects one by one'
+        ),
+        default=1, min=1, max=256
+    )
+    sp_sparse_update: bpy.props.BoolProperty(
+        name='Sparse Update',
+        description=(
+            'Recalculate only the target vertices bound to the source vertices each shape key moves. '
+            'Faster for shape keys that move a small part of the mesh. '
+            'Shape keys that move none of them are not created (existing ones are removed when overwriting)'
+        ),
+        default=False
+    )
     sd_falloff: bpy.props.FloatProperty(
         name='Interpolation Falloff',
         description='Sets the interpolation falloff for the Surface Deform modifier',
@@ -152,6 +251,23 @@ class SKW_Property(bpy.types.PropertyGroup):
         description='Controls the overall strength of the Surface Deform modifier',
         default=1, min=-100, max=100
     )
+    sd_keep_bound_modifiers: bpy.props.BoolProperty(
+        name='Keep Bound Modifiers',
+        description=(
+            'Keep the bound Surface Deform modifier of every target disabled after the transfer '
+            'and reuse it next time. It is rebound only when the source or the target basis or their placement changes'
+        ),
+        default=False
+    )
+    sd_merge_targets: bpy.props.BoolProperty(
+        name='Merge Targets',
+        description=(
+            'Join the target objects into one temporary mesh, so the Surface Deform modifier '
+            'is bound once and every shape key is evaluated once for all the targets. '
+            'Targets with a non-uniform or negative scale are bound one by one'
+        ),
+        default=False
+    )
 
     cs_factor: bpy.props.FloatProperty(
         name='Factor',
@@ -211,6 +327,27 @@ class SKW_Property(bpy.types.PropertyGroup):
         default='Group'
     )
 
+    profile_stages: bpy.props.BoolProperty(
+        name='Profile Stages',
+        description=(
+            'Record the wall time, calls and per key averages of every stage of the operators '
+            '(binding, deformation, writing, empty key removal, smoothing, drivers) '
+            'and print the report to the system console'
+        ),
+        default=False
+    )
+    profile_memory: bpy.props.BoolProperty(
+        name='Trace Memory',
+        description='Record the peak memory of every stage with tracemalloc (slows the operators down)',
+        default=False
+    )
+    profile_report_path: bpy.props.StringProperty(
+        name='Profile Report File',
+        description='JSON file the stage report is written to after every profiled run (nothing is written if empty)',
+        subtype='FILE_PATH',
+        default=''
+    )
+
 
 classes = [SKW_ListItem, SKW_Property, SKW_ShapeKeyList]
 
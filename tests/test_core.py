@@ -0,0 +1,124 @@
+"""
+Tests of the bpy-free array engine (core package), run with pytest outside Blender.
+"""
+import os
+import sys
+import importlib
+import numpy as np
+import pytest
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The add-on is imported by its folder name, which need not be an identifier (e.g. ShapeKeyWrap-main)
+sys.path.insert(0, os.path.dirname(ADDON_DIR))
+core = importlib.import_module(f'{os.path.basename(ADDON_DIR)}.core')
+synthetic_meshes = importlib.import_module(f'{os.path.basename(ADDON_DIR)}.core.synthetic_meshes')
+
+
+def triangulate(corner_verts: np.ndarray, face_sizes: np.ndarray) -> np.ndarray:
+    """
+    Fan triangulation of (corner_verts, face_sizes) faces.
+    """
+    tris = []
+    start = 0
+    for size in face_sizes:
+        face = corner_verts[start:start + size]
+        tris.extend((face[0], face[i], face[i + 1]) for i in range(1, size - 1))
+        start += size
+    return np.array(tris, dtype=np.int32)
+
+
+@pytest.fixture(scope='module')
+def garment():
+    """
+    Triangulated source sphere, a band around it and sparse source shape keys.
+    """
+    (src_co, src_corners, src_sizes), (tgt_co, _, _) = synthetic_meshes.mesh_pair('GARMENT', 3000)
+    keys = np.array(list(synthetic_meshes.sparse_shape_keys(src_co, 6, seed=3)))
+    # A key that moves nothing
+    keys[2] = src_co
+    return src_co, triangulate(src_corners, src_sizes), tgt_co, keys
+
+
+def test_grid_nearest_matches_brute_force(garment):
+    verts, tris, _, _ = garment
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-1.3, 1.3, size=(300, 3))
+
+    grid = core.TriangleGrid.build(verts, tris)
+    tri_indices, closest, distances = grid.find_nearest(points)
+
+    # Distance of every point to every triangle
+    a, b, c = (np.asarray(verts[tris[:, i]], dtype=np.float64) for i in range(3))
+    brute = np.empty((len(points), len(tris)))
+    for i, point in enumerate(points):
+        nearest = core.closest_points_on_triangles(np.broadcast_to(point, a.shape), a, b, c)
+        brute[i] = np.linalg.norm(nearest - point, axis=1)
+
+    np.testing.assert_allclose(distances, brute.min(axis=1), rtol=0.0, atol=1e-6)
+    # Ties between triangles may pick another index at the same distance
+    np.testing.assert_allclose(brute[np.arange(len(points)), tri_indices], distances, rtol=0.0, atol=1e-6)
+    np.testing.assert_allclose(np.linalg.norm(closest - points, axis=1), distances, rtol=0.0, atol=1e-6)
+
+
+def test_parallel_bind_matches_serial(garment):
+    verts, tris, tgt_co, _ = garment
+    grid = core.TriangleGrid.build(verts, tris)
+    normals = core.triangle_normals(verts, tris)
+
+    tri_indices, _, _ = grid.find_nearest(tgt_co)
+    serial = core.compute_binding(verts, tris, tgt_co, tri_indices, normals=normals)
+    parallel_bind = importlib.import_module(f'{os.path.basename(ADDON_DIR)}.core.parallel_bind')
+    parallel = parallel_bind.bind_points_parallel(grid, normals, tgt_co, workers=2, chunk_size=256)
+
+    for name in core.SurfaceBinding.ARRAYS:
+        np.testing.assert_array_equal(getattr(parallel, name), getattr(serial, name), err_msg=name)
+
+
+def test_deform_paths_match(garment):
+    verts, tris, tgt_co, keys = garment
+    binding = core.bind_points(verts, tris, tgt_co)
+
+    dense = core.deform_key_block(binding, binding.to_matrix(len(verts)), keys)
+    sparse, touched = core.deform_key_block_sparse(binding, keys, verts, tgt_co)
+    for k, key in enumerate(keys):
+        reference = core.calc_surface_deform(binding, key)
+        np.testing.assert_allclose(dense[:, k], reference, rtol=0.0, atol=1e-5)
+        np.testing.assert_allclose(sparse[:, k], reference, rtol=0.0, atol=1e-5)
+    # Keys that move no bound source vertex (some move the sphere away from the band) keep the basis
+    assert touched.any() and not touched[2]
+    np.testing.assert_array_equal(sparse[:, ~touched], np.broadcast_to(tgt_co[:, None], sparse[:, ~touched].shape))
+
+
+def test_binding_file_round_trip(garment, tmp_path):
+    verts, tris, tgt_co, _ = garment
+    binding = core.bind_points(verts, tris, tgt_co)
+    filepath = str(tmp_path / 'garment.skwb')
+    topology_hash = 'topology'
+    core.save_binding(
+        filepath, binding.arrays(),
+        source_vertex_count=len(verts),
+        source_topology_hash=topology_hash,
+        source_content_hash='source',
+        target_content_hash='target'
+    )
+
+    arrays = core.load_binding(
+        filepath,
+        source_vertex_count=len(verts),
+        target_vertex_count=len(tgt_co),
+        source_topology_hash=topology_hash,
+        source_content_hash='source',
+        target_content_hash='target'
+    )
+    for name in core.SurfaceBinding.ARRAYS:
+        assert arrays[name].dtype == getattr(binding, name).dtype
+        np.testing.assert_array_equal(arrays[name], getattr(binding, name), err_msg=name)
+
+    with pytest.raises(core.BindingFileError):
+        core.load_binding(filepath, len(verts), len(tgt_co) + 1, topology_hash)
+    with pytest.raises(core.BindingFileError):
+        core.load_binding(filepath, len(verts), len(tgt_co), topology_hash, target_content_hash='edited')
+
+
+def test_core_does_not_import_bpy():
+    assert 'bpy' not in sys.modules and 'mathutils' not in sys.modules